@@ -1,27 +1,90 @@
-import json
-import re
+import os
+import uuid
+from concurrent.futures import wait as futures_wait
 import streamlit as st
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-# OpenAI (최신 SDK 기준)
-from openai import OpenAI
+from startup import start_warmup, startup_profiler
+
+# pipeline(OpenAI SDK, NumPy 포함)은 1페이지에서 쓰지 않으므로 쓰는 함수 안에서 import한다.
+# 첫 화면을 보낸 뒤 start_warmup()이 백그라운드에서 미리 로드해 둔다.
+from background_jobs import Job, Overloaded, job_runner
+from llm_metrics import METRICS_PORT, llm_metrics, start_metrics_server
+from llm_scheduler import UpstreamBusyError, retry_after_seconds
+from profile_log import log_profile
+from questions import EDUCATION_DEFAULT_INDEX, FORM_QUESTIONS, OPTION_LABELS, option_index
+from roadmap_prefetch import PREFETCH_ENABLED, PREFETCH_TOP_N, answers_fingerprint, prefetch_key, roadmap_prefetcher
+from session_store import new_token, session_store
+
+startup_profiler.mark("app import")
 
 
 # =========================================================
 # 기본 설정
 # =========================================================
 st.set_page_config(page_title="이제뭐하지", layout="wide")
+startup_profiler.mark("set_page_config")
 
 APP_TITLE = "이제뭐하지"
 
+# 스트리밍 모드: 직무 카드/로드맵 카드를 생성되는 대로 바로 표시
+STREAMING_ENABLED = os.environ.get("LLM_STREAMING", "1") not in ("0", "false", "no")
+
+# 직무 추천 방식
+# - hybrid: 로컬 점수 엔진이 후보를 고르고 OpenAI는 why_fit 문구만 작성 (기본)
+# - fast:   로컬 점수 엔진만 사용 (OpenAI 호출 없음)
+# - llm:    OpenAI가 직무 리스트 전체를 생성 (기존 방식)
+RECO_MODE = os.environ.get("RECO_MODE", "hybrid")
+
+# 사이드바에 최근 OpenAI 호출 계측(시간/토큰/재시도/파싱 경로)을 표시
+DEBUG_PANEL = os.environ.get("LLM_DEBUG_PANEL", "0") in ("1", "true", "yes")
+
+# 3페이지 추천 직무 카드를 한 번에 그리는 개수 ("더 보기"로 늘림)
+JOB_LIST_PAGE_SIZE = int(os.environ.get("JOB_LIST_PAGE_SIZE", "6"))
+
+# 백그라운드 작업(추천/로드맵) 진행 상황을 다시 확인하는 간격(초)
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "0.5"))
+# 제출 직후 이 시간(초) 안에 끝나는 작업은 폴링 없이 같은 실행에서 바로 결과를 반영
+JOB_INLINE_WAIT = float(os.environ.get("JOB_INLINE_WAIT", "0.3"))
+
+# LLM_METRICS_PORT 가 설정되어 있으면 /metrics 엔드포인트를 프로세스당 한 번 띄운다
+start_metrics_server(METRICS_PORT)
+
 
 # =========================================================
 # 세션 상태 초기화
 # =========================================================
+def restore_session():
+    """
+    새 Streamlit 세션(새로고침/재접속)이면 URL의 복원 토큰(?s=...)으로 이전 스냅샷을 불러온다.
+    없거나 만료됐으면 새 토큰을 URL에 싣는다. LLM 결과까지 복원되므로 다시 호출하지 않는다.
+    """
+    token = st.query_params.get("s")
+    snapshot = session_store.load(token)
+    if snapshot is None:
+        token = new_token()
+        st.query_params["s"] = token
+    else:
+        for key, value in snapshot.items():
+            st.session_state[key] = value
+    st.session_state.resume_token = token
+
+
+def save_session():
+    # 바뀐 경우에만 실제로 저장된다 (session_store.save)
+    session_store.save(st.session_state.resume_token, st.session_state)
+
+
 def init_session():
+    if "resume_token" not in st.session_state:
+        restore_session()
+
     if "page" not in st.session_state:
         st.session_state.page = 1
 
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+
     if "api_key" not in st.session_state:
         st.session_state.api_key = ""
 
@@ -46,8 +109,19 @@ def init_session():
     if "roadmap" not in st.session_state:
         st.session_state.roadmap = None
 
+    if "job_list_shown" not in st.session_state:
+        st.session_state.job_list_shown = JOB_LIST_PAGE_SIZE
+
+    # 진행 중인 백그라운드 작업 id (background_jobs.job_runner)
+    if "reco_job_id" not in st.session_state:
+        st.session_state.reco_job_id = None
+
+    if "roadmap_job_id" not in st.session_state:
+        st.session_state.roadmap_job_id = None
+
 
 init_session()
+startup_profiler.mark("init_session")
 
 
 # =========================================================
@@ -57,188 +131,42 @@ def go(page_num: int):
     st.session_state.page = page_num
 
 
-# =========================================================
-# OpenAI 유틸
-# =========================================================
-def get_client() -> OpenAI:
-    return OpenAI(api_key=st.session_state.api_key)
-
-
-def safe_json_extract(text: str) -> dict:
-    """
-    모델이 JSON만 반환하라고 해도 가끔 설명이 섞임.
-    JSON 블록만 추출해서 파싱하려는 안전장치.
-    """
-    text = text.strip()
-
-    # 1) 완전 JSON이면 바로 파싱
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-
-    # 2) ```json ... ``` 형태 추출
-    codeblock = re.search(r"```json\s*(\{.*?\})\s*```", text, re.DOTALL)
-    if codeblock:
-        try:
-            return json.loads(codeblock.group(1))
-        except Exception:
-            pass
-
-    # 3) 첫 { ~ 마지막 } 추출
-    brace = re.search(r"(\{.*\})", text, re.DOTALL)
-    if brace:
-        try:
-            return json.loads(brace.group(1))
-        except Exception:
-            pass
-
-    return {}
-
-
-def openai_chat_json(system: str, user: str, model: str = "gpt-4o-mini") -> dict:
-    client = get_client()
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=0.6,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-    )
-    content = resp.choices[0].message.content
-    return safe_json_extract(content)
-
-
 # =========================================================
 # 2페이지 질문 리스트 (요구사항 반영)
 # =========================================================
 def render_user_questions_form() -> Dict[str, Any]:
     """
     요구된 질문 리스트 그대로 UI로 구성.
+    (질문/선택지 표는 questions.py 에 모듈 수준으로 미리 계산되어 있음)
     반환: user_answers dict
     """
     answers = st.session_state.user_answers
 
-    st.subheader("돈은 얼마나 벌고 싶나요?")
-    answers["money"] = st.radio(
-        "money",
-        ["상관없음", "평균 정도면 만족", "많이 벌고 싶음", "최대한 많이 벌고 싶음"],
-        index=0 if "money" not in answers else ["상관없음", "평균 정도면 만족", "많이 벌고 싶음", "최대한 많이 벌고 싶음"].index(answers["money"]),
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-
-    st.subheader("어디에서 일하고 싶나요?")
-    answers["location"] = st.radio(
-        "location",
-        ["서울", "수도권", "지방 광역시", "세종", "농어촌"],
-        index=0 if "location" not in answers else ["서울", "수도권", "지방 광역시", "세종", "농어촌"].index(answers["location"]),
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-
-    st.subheader("직업의 형태는 무엇이 좋나요?")
-    answers["job_type"] = st.radio(
-        "job_type",
-        ["직장인", "프리랜서", "전문직"],
-        index=0 if "job_type" not in answers else ["직장인", "프리랜서", "전문직"].index(answers["job_type"]),
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-
-    st.subheader("통근시간은 최대 얼마 이하였으면 좋겠나요?")
-    answers["commute"] = st.radio(
-        "commute",
-        ["30분", "1시간", "1시간 반", "2시간", "2시간 반"],
-        index=1 if "commute" not in answers else ["30분", "1시간", "1시간 반", "2시간", "2시간 반"].index(answers["commute"]),
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-
-    st.subheader("조직 문화는 어땠으면 좋겠나요?")
-    answers["culture"] = st.radio(
-        "culture",
-        [
-            "명확하지 않은 지시사항+창의적 분위기",
-            "상명하복의 권위적 분위기",
-            "처음엔 텃세가 있을 수 있으나 친해지면 단단한 결속",
-            "개인주의의 차가운 분위기",
-            "회식, 술자리 등 뭐든지 함께 분위기",
-        ],
-        index=0 if "culture" not in answers else [
-            "명확하지 않은 지시사항+창의적 분위기",
-            "상명하복의 권위적 분위기",
-            "처음엔 텃세가 있을 수 있으나 친해지면 단단한 결속",
-            "개인주의의 차가운 분위기",
-            "회식, 술자리 등 뭐든지 함께 분위기",
-        ].index(answers["culture"]),
-        label_visibility="collapsed",
-    )
-
-    st.subheader("조직 성비는 어땠으면 좋겠나요?")
-    answers["gender_ratio"] = st.radio(
-        "gender_ratio",
-        ["남 다수", "여 다수", "반반", "상관없음"],
-        index=3 if "gender_ratio" not in answers else ["남 다수", "여 다수", "반반", "상관없음"].index(answers["gender_ratio"]),
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-
-    st.subheader("건강상 약점이 있나요?")
-    answers["health"] = st.multiselect(
-        "health",
-        ["없음", "눈의 피로", "허리, 목", "호흡기", "근육 및 운동능력", "두통", "스트레스 취약"],
-        default=answers.get("health", ["없음"]),
-        label_visibility="collapsed",
-    )
-
-    st.subheader("무조건 지켜져야 하는 것은?")
-    answers["must_have"] = st.radio(
-        "must_have",
-        [
-            "따박따박 나오는 월급",
-            "세상의 인정",
-            "몸 상하지 않는 것",
-            "칼퇴 등 개인 시간 확보",
-            "일의 재미 및 자아실현",
-            "안정된 고용",
-        ],
-        index=0 if "must_have" not in answers else [
-            "따박따박 나오는 월급",
-            "세상의 인정",
-            "몸 상하지 않는 것",
-            "칼퇴 등 개인 시간 확보",
-            "일의 재미 및 자아실현",
-            "안정된 고용",
-        ].index(answers["must_have"]),
-        label_visibility="collapsed",
-    )
-
-    st.subheader("내가 절대 못하겠는 것은? (복수응답)")
-    answers["cant_do"] = st.multiselect(
-        "cant_do",
-        ["음악", "미술", "체육", "국어", "외국어", "일반사회", "수학", "과학", "공학"],
-        default=answers.get("cant_do", []),
-        label_visibility="collapsed",
-    )
-
-    st.subheader("내가 잘하는 것에 결합될 수 있는 행동 중 끌리는 것은?")
-    answers["preferred_action"] = st.radio(
-        "preferred_action",
-        ["~를 가르치기", "~를 고치기", "~를 지적하기", "~를 연구하기"],
-        index=0 if "preferred_action" not in answers else ["~를 가르치기", "~를 고치기", "~를 지적하기", "~를 연구하기"].index(answers["preferred_action"]),
-        horizontal=True,
-        label_visibility="collapsed",
-    )
+    for key, title, widget, horizontal, default in FORM_QUESTIONS:
+        st.subheader(title)
+        if widget == "multiselect":
+            answers[key] = st.multiselect(
+                key,
+                OPTION_LABELS[key],
+                default=answers.get(key, default),
+                label_visibility="collapsed",
+            )
+        else:
+            answers[key] = st.radio(
+                key,
+                OPTION_LABELS[key],
+                index=option_index(key, answers.get(key), default),
+                horizontal=horizontal,
+                label_visibility="collapsed",
+            )
 
     # 추가(현실적 추천을 위해)
     st.markdown("---")
     st.subheader("추가 정보 (추천 정확도를 위해)")
     answers["education"] = st.radio(
         "학력",
-        ["고졸 이하", "대학 재학", "대학 졸업", "대학원 재학/졸업"],
-        index=1 if "education" not in answers else ["고졸 이하", "대학 재학", "대학 졸업", "대학원 재학/졸업"].index(answers["education"]),
+        OPTION_LABELS["education"],
+        index=option_index("education", answers.get("education"), EDUCATION_DEFAULT_INDEX),
         horizontal=True,
         label_visibility="collapsed",
     )
@@ -253,208 +181,204 @@ def render_user_questions_form() -> Dict[str, Any]:
 
 
 # =========================================================
-# 2 -> 3: OpenAI로 추천 직무 리스트 생성
+# 3페이지 -> 4페이지: 로드맵 선행 생성 (백그라운드)
 # =========================================================
-def generate_job_recommendations(user_answers: Dict[str, Any]) -> List[Dict[str, Any]]:
-    system = """
-너는 취업/진로 상담 AI다.
-사용자의 성향/조건을 보고 '초기 취준생'에게 현실적인 추천 직무 리스트를 만든다.
-
-반드시 아래 JSON 형식으로만 출력하라.
-"""
-
-    user = f"""
-사용자 입력 정보는 다음과 같다:
-{json.dumps(user_answers, ensure_ascii=False, indent=2)}
-
-요구사항:
-- 추천 직무 10~15개
-- 각 직무는 한국 기준으로 현실적인 직무여야 함
-- 직무는 너무 거창하지 않게 (예: "CEO" 같은 것 금지)
-- 직무별로 다음 정보를 포함:
-  - job_title: 직무명
-  - category: (예: 마케팅/기획/교육/디자인/개발/공공/전문직/콘텐츠 등)
-  - why_fit: 왜 이 사용자에게 맞는지 1~2문장
-  - requirements_hint: 해당 직무에 일반적으로 필요한 조건(학력/자격/전공 등)을 짧게
-
-출력 JSON 스키마:
-{{
-  "jobs": [
-    {{
-      "job_title": "...",
-      "category": "...",
-      "why_fit": "...",
-      "requirements_hint": "..."
-    }}
-  ]
-}}
-"""
-
-    data = openai_chat_json(system=system, user=user)
-    jobs = data.get("jobs", [])
-
-    # 최소 안전장치
-    cleaned = []
-    for j in jobs:
-        if isinstance(j, dict) and j.get("job_title"):
-            cleaned.append(j)
-
-    return cleaned
+def prefetch_roadmaps(selected_job: Optional[str], final_jobs: List[Dict[str, Any]]):
+    """
+    사용자가 3페이지에서 고민하는 동안 선택된 직무(+ 상위 N개)의 로드맵을 미리 생성.
+    선택에서 빠진 직무의 대기 중 작업은 취소한다.
+    """
+    # 작업 실행 자리가 다 찼거나 대기열이 있으면 추측성 선행 생성은 하지 않는다 (사용자가 누른 작업이 우선)
+    if not PREFETCH_ENABLED or job_runner.saturated():
+        return
+    from pipeline import generate_roadmap
+
+    wanted = []
+    if selected_job:
+        wanted.append(selected_job)
+    for j in final_jobs[:PREFETCH_TOP_N]:
+        if j["job_title"] not in wanted:
+            wanted.append(j["job_title"])
+
+    session_id = st.session_state.session_id
+    # 세션 상태는 백그라운드 스레드에서 읽을 수 없으므로 값을 미리 복사해 둔다.
+    api_key = st.session_state.api_key
+    answers = dict(st.session_state.user_answers)
+
+    roadmap_prefetcher.cancel_except(session_id, keep=[prefetch_key(t, answers) for t in wanted])
+    for title in wanted:
+        roadmap_prefetcher.prefetch(
+            session_id,
+            title,
+            answers,
+            lambda title=title: generate_roadmap(title, answers, api_key=api_key),
+        )
 
 
 # =========================================================
-# 3페이지: 필터링 질문 생성 (OpenAI)
+# 백그라운드 작업 (스크립트 스레드를 막지 않음)
+# - 작업 함수는 다른 스레드에서 돌므로 st.* / st.session_state를 쓰지 않는다
+# - 스트리밍으로 먼저 온 조각은 job.partial에 쌓고 폴링 fragment가 그린다
 # =========================================================
-def generate_filter_questions(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    system = """
-너는 진로추천 앱의 '필터링 질문 생성기'다.
-
-입력으로 추천 직무 리스트가 주어진다.
-여기서 일부 직무는 특정 조건이 반드시 필요하다(예: 의사, 변호사, 약사, 교사 등).
-
-너의 목표는:
-- 사용자가 '해당 직무가 현실적으로 가능한지' 판단하기 위한 질문을 자동 생성하는 것.
-
-반드시 JSON 형식으로만 출력하라.
-"""
-
-    user = f"""
-추천 직무 리스트:
-{json.dumps(jobs, ensure_ascii=False, indent=2)}
-
-요구사항:
-- 질문은 3~7개 정도 (너무 많으면 안 됨)
-- 질문은 직무 리스트에 기반해서만 생성
-- 질문마다 아래 정보를 포함:
-  - id: 짧은 식별자(영문)
-  - question: 질문 문장
-  - type: "yesno" 또는 "choice"
-  - options: type이 choice면 선택지 리스트, yesno면 ["예","아니오"]
-  - affects_jobs: 이 질문이 영향을 주는 직무명 리스트
-
-예시:
-의사가 있으면 -> "의대 졸업(또는 재학) 여부" 같은 질문 생성
-
-출력 JSON 스키마:
-{{
-  "questions": [
-    {{
-      "id": "medical_school",
-      "question": "의대 졸업(또는 재학) 여부가 있나요?",
-      "type": "yesno",
-      "options": ["예","아니오"],
-      "affects_jobs": ["의사"]
-    }}
-  ]
-}}
-"""
-
-    data = openai_chat_json(system=system, user=user)
-    qs = data.get("questions", [])
-
-    cleaned = []
-    for q in qs:
-        if isinstance(q, dict) and q.get("id") and q.get("question"):
-            if q.get("type") not in ["yesno", "choice"]:
-                continue
-            if "options" not in q or not isinstance(q["options"], list):
-                continue
-            if "affects_jobs" not in q or not isinstance(q["affects_jobs"], list):
-                continue
-            cleaned.append(q)
-
-    return cleaned
+def run_recommend_job(job: Job, user_answers: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    from pipeline import generate_filter_questions, generate_job_recommendations_stream, generate_jobs
+
+    job.report("사용자 정보를 분석 중...")
+    if RECO_MODE == "llm" and STREAMING_ENABLED:
+        jobs = []
+        for j in generate_job_recommendations_stream(user_answers, api_key=api_key):
+            job.report(item=j)
+            jobs.append(j)
+    else:
+        jobs = generate_jobs(user_answers, RECO_MODE, api_key=api_key)
 
+    job.report("필터 질문을 만드는 중...")
+    filter_qs = generate_filter_questions(jobs, api_key=api_key)
+    return {"jobs": jobs, "filter_questions": filter_qs}
 
-# =========================================================
-# 3페이지: 필터링 적용
-# =========================================================
-def apply_filtering(
-    jobs: List[Dict[str, Any]],
-    filter_questions: List[Dict[str, Any]],
-    filter_answers: Dict[str, Any]
-) -> List[Dict[str, Any]]:
+
+def run_roadmap_job(job: Job, job_title: str, user_answers: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    """
+    선행 생성 중(또는 완료)인 작업이 있으면 그 결과를 기다려 쓰고,
+    없거나 실패했으면 직접 생성.
+    """
+    from pipeline import generate_roadmap, generate_roadmap_stream
+
+    fut = roadmap_prefetcher.lookup(job_title, user_answers)
+    if fut is not None:
+        job.report("미리 만들던 로드맵을 마무리하는 중...")
+        while not fut.done():
+            job.check()
+            futures_wait([fut], timeout=JOB_POLL_INTERVAL)
+        if not fut.cancelled() and fut.exception() is None and fut.result():
+            return fut.result()
+
+    job.report("로드맵을 생성 중...")
+    if not STREAMING_ENABLED:
+        return generate_roadmap(job_title, user_answers, api_key=api_key)
+
+    # 기간명/마일스톤이 도착하는 대로 (path, value)를 쌓아 화면에 먼저 보여준다
+    for path, value in generate_roadmap_stream(job_title, user_answers, api_key=api_key):
+        if not path:
+            return value
+        if path[0] == "timeline":
+            job.report(item=(path, value))
+    return {}
+
+
+def render_job_card(j: Dict[str, Any]):
+    with st.container(border=True):
+        st.markdown(f"### {j['job_title']}")
+        st.write(f"**분야:** {j.get('category', '-')}")
+        st.write(j.get("why_fit", ""))
+        st.caption(f"요구조건 힌트: {j.get('requirements_hint', '-')}")
+
+
+def render_roadmap_partial(events: List[Any]):
+    """
+    도착한 (path, value) 이벤트로 기간 카드를 그린다. 구간별 동시 생성(ROADMAP_FANOUT)에서는
+    뒤 구간이 먼저 끝날 수 있으므로 도착 순서가 아니라 구간 순서대로 그린다.
     """
-    매우 단순한 필터링 규칙:
-    - 질문이 yesno이고, 답이 "아니오"면
-      affects_jobs에 포함된 직무를 제거
+    cards: Dict[int, Dict[str, Any]] = {}
+    for path, value in events:
+        card = cards.setdefault(path[1], {"period": "", "milestones": []})
+        if path[2] == "period":
+            card["period"] = value
+        else:
+            card["milestones"].append(value)
+
+    for idx in sorted(cards):
+        with st.container(border=True):
+            st.subheader(cards[idx]["period"] or "...")
+            for m in cards[idx]["milestones"]:
+                st.write(f"🔘 {m}")
+
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def render_job_progress(state_key: str, what: str):
+    """
+    진행 중인 작업 상태를 JOB_POLL_INTERVAL마다 이 영역만 다시 그린다.
+    끝나면 앱 전체를 다시 실행해 페이지 쪽에서 결과를 반영한다 (finished_job).
     """
-    removed_titles = set()
+    job = job_runner.get(st.session_state[state_key])
+    if job is None or not job.active:
+        st.rerun()
+        return
 
-    for q in filter_questions:
-        qid = q["id"]
-        ans = filter_answers.get(qid)
+    position, wait = job_runner.estimate_wait(job)
+    if position:
+        st.info(f"요청이 많아 순서를 기다리고 있어요. 대기 {position}번째, 약 {max(int(wait), 1)}초 예상")
+    else:
+        st.info(f"{what} {job.progress}")
 
-        if q["type"] == "yesno":
-            if ans == "아니오":
-                for jt in q["affects_jobs"]:
-                    removed_titles.add(jt)
+    partial = list(job.partial)
+    if job.kind == "recommend":
+        for j in partial:
+            render_job_card(j)
+    elif job.kind == "roadmap":
+        render_roadmap_partial(partial)
 
-        # choice형은 단순 MVP에서는 제거하지 않고,
-        # 이후 확장 가능하도록 둠.
+    if st.button("취소", key=f"{state_key}_cancel"):
+        job_runner.cancel(job.id)
+        st.session_state[state_key] = None
+        st.rerun()
 
-    final = []
-    for j in jobs:
-        if j["job_title"] not in removed_titles:
-            final.append(j)
 
-    return final
+def finished_job(state_key: str) -> Optional[Job]:
+    """
+    세션에 걸린 작업이 끝났으면 id를 비우고 작업을 돌려준다 (결과는 한 번만 반영).
+    """
+    job = job_runner.get(st.session_state[state_key])
+    if job is None:
+        st.session_state[state_key] = None
+        return None
+    if job.active:
+        return None
+    st.session_state[state_key] = None
+    return job
 
 
 # =========================================================
-# 4페이지: 로드맵 생성 (OpenAI 기반, 웹검색 없이)
+# 디버그 패널 (LLM_DEBUG_PANEL=1)
 # =========================================================
-def generate_roadmap(job_title: str, user_answers: Dict[str, Any]) -> Dict[str, Any]:
-    system = """
-너는 커리어 로드맵 설계 AI다.
-사용자가 선택한 직무를 기준으로,
-한국 취업 시장에서 현실적인 2년 로드맵을 만든다.
-
-주의:
-- 웹 검색을 하지 않는다.
-- 대신 일반적으로 알려진 업계 상식 수준에서 현실적인 계획을 제시한다.
-- 너무 단정하지 말고, "예시"임을 분명히 한다.
-
-반드시 JSON으로만 출력하라.
-"""
-
-    user = f"""
-사용자가 선택한 직무: {job_title}
-사용자 정보:
-{json.dumps(user_answers, ensure_ascii=False, indent=2)}
-
-요구사항:
-- 시간축 3구간으로 나누기:
-  1) 지금~3개월
-  2) 3~12개월
-  3) 1~2년
-- 각 구간마다 해야 할 행동 4~6개 (현실적으로)
-- 결과는 "로드맵 카드"처럼 보여줄 수 있게 구성
-
-출력 JSON 스키마:
-{{
-  "headline": "예비 OO의 이제뭐하지",
-  "disclaimer": "이 로드맵은 예시이며 ...",
-  "timeline": [
-    {{
-      "period": "지금~3개월",
-      "milestones": ["...", "..."]
-    }},
-    {{
-      "period": "3~12개월",
-      "milestones": ["...", "..."]
-    }},
-    {{
-      "period": "1~2년",
-      "milestones": ["...", "..."]
-    }}
-  ],
-  "recommended_resources": ["추천 리소스 1", "추천 리소스 2", "추천 리소스 3"]
-}}
-"""
-
-    data = openai_chat_json(system=system, user=user)
-    return data
+def render_debug_panel():
+    with st.sidebar:
+        st.subheader("LLM 호출 계측")
+        summary = llm_metrics.summary()
+        if not summary:
+            st.caption("아직 기록된 호출이 없어요.")
+            return
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        st.caption("최근 호출")
+        st.dataframe(llm_metrics.recent_calls(), use_container_width=True, hide_index=True)
+        st.caption("백그라운드 작업 (대기열 / 거절)")
+        st.dataframe([job_runner.stats()], use_container_width=True, hide_index=True)
+        st.caption("프로세스 시작 (첫 실행 / 예열)")
+        st.dataframe(startup_profiler.report(), use_container_width=True, hide_index=True)
+
+
+# =========================================================
+# LLM 호출 오류 안내
+# =========================================================
+def show_llm_error(what: str, e: Exception):
+    """
+    한도 초과/업스트림 장애는 스케줄러가 이미 재시도한 뒤이므로 잠시 뒤 다시 누르라고 안내하고,
+    그 밖의 오류만 예외 내용을 보여준다.
+    """
+    from openai import RateLimitError
+
+    if isinstance(e, Overloaded):
+        st.warning(f"지금 사용자가 많아 {what} 요청을 받지 못했어요. 약 {max(int(e.retry_after), 1)}초 뒤 다시 눌러 주세요.")
+        return
+    if isinstance(e, UpstreamBusyError):
+        wait = e.retry_after
+    elif isinstance(e, RateLimitError):
+        wait = retry_after_seconds(e) or 10.0
+    else:
+        st.error(f"{what} 생성 중 오류가 발생했어요.")
+        st.exception(e)
+        return
+    st.warning(f"지금 요청이 몰려 {what}을 만들지 못했어요. 약 {max(int(wait), 1)}초 뒤 다시 눌러 주세요.")
 
 
 # =========================================================
@@ -507,32 +431,167 @@ def render_page_2():
             st.error("API 키가 필요해요. 1페이지에서 입력해 주세요.")
             return
 
-        with st.spinner("사용자 정보를 분석 중... (OpenAI 호출)"):
-            try:
-                jobs = generate_job_recommendations(st.session_state.user_answers)
-                st.session_state.job_reco = jobs
-
-                filter_qs = generate_filter_questions(jobs)
-                st.session_state.filter_questions = filter_qs
-
-                # 필터 답변 초기화
-                st.session_state.filter_answers = {}
-                go(3)
+        log_profile(st.session_state.user_answers)
+
+        # 작업 스레드에는 세션 상태 대신 값의 복사본을 넘긴다.
+        # 같은 답변으로 다시 누르면 진행 중인 작업에 붙고, 답변을 바꿔 누르면 이전 작업은 취소된다.
+        answers = dict(st.session_state.user_answers)
+        api_key = st.session_state.api_key
+        job = job_runner.submit(
+            "recommend",
+            f"{RECO_MODE}:{answers_fingerprint(answers)}",
+            st.session_state.session_id,
+            lambda job: run_recommend_job(job, answers, api_key),
+        )
+        st.session_state.reco_job_id = job.id
+        job.wait(JOB_INLINE_WAIT)
 
-            except Exception as e:
-                st.error("추천 생성 중 오류가 발생했어요.")
-                st.exception(e)
+    job = finished_job("reco_job_id")
+    if job is not None:
+        if job.status == "done":
+            st.session_state.job_reco = job.result["jobs"]
+            st.session_state.filter_questions = job.result["filter_questions"]
 
+            # 필터 답변/이전 결과 초기화
+            st.session_state.filter_answers = {}
+            st.session_state.final_jobs = []
+            st.session_state.selected_job = None
+            st.session_state.job_list_shown = JOB_LIST_PAGE_SIZE
+            go(3)
+            st.rerun()
+        elif job.status == "error":
+            show_llm_error("추천", job.error)
+        else:
+            st.info("추천 생성을 취소했어요.")
+    elif st.session_state.reco_job_id:
+        render_job_progress("reco_job_id", "추천:")
 
     col_a, col_b, col_c = st.columns([1, 1, 1])
     with col_a:
         if st.button("← 이전", use_container_width=True):
+            job_runner.cancel(st.session_state.reco_job_id)
+            st.session_state.reco_job_id = None
             go(1)
 
 
 # =========================================================
 # 페이지 3: 추천 직무 + 필터링 질문 + 최종 선택
 # =========================================================
+def show_more_jobs():
+    st.session_state.job_list_shown += JOB_LIST_PAGE_SIZE
+
+
+@st.fragment
+def render_job_list():
+    """
+    추천 직무 카드. "더 보기"는 이 영역만 다시 그린다.
+    """
+    jobs = st.session_state.job_reco
+    shown = st.session_state.job_list_shown
+
+    for j in jobs[:shown]:
+        render_job_card(j)
+
+    if len(jobs) > shown:
+        st.button(
+            f"더 보기 ({shown}/{len(jobs)})",
+            on_click=show_more_jobs,
+            use_container_width=True,
+        )
+
+
+@st.fragment
+def render_filter_form():
+    """
+    필터 질문 폼. 필터 적용은 제출할 때만 계산하고,
+    최종 선택 영역도 새 결과로 그려야 하므로 앱 전체를 한 번 다시 실행한다.
+    """
+    if not st.session_state.filter_questions:
+        st.info("현재 직무 리스트에서 특별한 조건 질문이 필요하지 않아 보입니다.")
+    else:
+        st.write("아래 질문에 답하면, 현실적으로 불가능한 직무는 자동으로 제외돼요.")
+
+    with st.form("filter_form"):
+        for q in st.session_state.filter_questions:
+            st.markdown(f"**{q['question']}**")
+
+            if q["type"] == "yesno":
+                ans = st.radio(
+                    q["id"],
+                    q["options"],
+                    horizontal=True,
+                    label_visibility="collapsed",
+                    index=0
+                )
+            else:
+                ans = st.selectbox(
+                    q["id"],
+                    q["options"],
+                    label_visibility="collapsed",
+                )
+
+            st.session_state.filter_answers[q["id"]] = ans
+            st.caption(f"영향 직무: {', '.join(q['affects_jobs'])}")
+
+            st.write("")
+
+        submitted = st.form_submit_button("필터 적용하기", use_container_width=True)
+
+    if submitted:
+        from pipeline import apply_filtering
+
+        st.session_state.final_jobs = apply_filtering(
+            jobs=st.session_state.job_reco,
+            filter_questions=st.session_state.filter_questions,
+            filter_answers=st.session_state.filter_answers,
+        )
+        st.rerun()
+
+
+@st.fragment
+def render_final_selection():
+    """
+    최종 직무 선택. 라디오를 바꿔도 이 영역만 다시 그린다 (직무 카드/필터 폼은 그대로).
+    """
+    if st.session_state.final_jobs:
+        st.success("최종 추천 직무 리스트가 완성됐어요. 아래에서 하나를 선택해 주세요.")
+
+        job_titles = [j["job_title"] for j in st.session_state.final_jobs]
+        selected = st.session_state.selected_job
+        # index는 위젯이 처음 만들어질 때만 쓰인다 (새로고침 후 복원된 선택을 보여줌)
+        st.session_state.selected_job = st.radio(
+            "최종 직무 선택",
+            options=job_titles,
+            index=job_titles.index(selected) if selected in job_titles else 0,
+            key="final_job_choice",
+            label_visibility="collapsed",
+        )
+
+        prefetch_roadmaps(st.session_state.selected_job, st.session_state.final_jobs)
+        save_session()
+
+        st.markdown("---")
+
+        col_a, col_b, col_c = st.columns([1, 1, 1])
+        with col_a:
+            if st.button("← 이전", use_container_width=True):
+                go(2)
+                st.rerun()
+        with col_c:
+            if st.button("다음 →", use_container_width=True, disabled=(st.session_state.selected_job is None)):
+                go(4)
+                st.rerun()
+
+    else:
+        st.info("아직 필터 적용 결과가 없어요. 위 질문에 답하고 필터를 적용해 주세요.")
+
+        col_a, col_b, col_c = st.columns([1, 1, 1])
+        with col_a:
+            if st.button("← 이전", use_container_width=True):
+                go(2)
+                st.rerun()
+
+
 def render_page_3():
     st.title("3. 사용자 정보 분석 및 제안")
 
@@ -548,86 +607,16 @@ def render_page_3():
     with left:
         st.subheader("추천 직무 리스트")
         st.caption("OpenAI가 사용자 입력 기반으로 생성한 추천입니다.")
-
-        for j in st.session_state.job_reco:
-            with st.container(border=True):
-                st.markdown(f"### {j['job_title']}")
-                st.write(f"**분야:** {j.get('category', '-')}")
-                st.write(j.get("why_fit", ""))
-                st.caption(f"요구조건 힌트: {j.get('requirements_hint', '-')}")
-
+        render_job_list()
 
     # 우측: 필터 질문 + 최종 추천
     with right:
         st.subheader("추천 직무 중, 내가 가능한 직무만 남기기")
-
-        if not st.session_state.filter_questions:
-            st.info("현재 직무 리스트에서 특별한 조건 질문이 필요하지 않아 보입니다.")
-        else:
-            st.write("아래 질문에 답하면, 현실적으로 불가능한 직무는 자동으로 제외돼요.")
-
-        with st.form("filter_form"):
-            for q in st.session_state.filter_questions:
-                st.markdown(f"**{q['question']}**")
-
-                if q["type"] == "yesno":
-                    ans = st.radio(
-                        q["id"],
-                        q["options"],
-                        horizontal=True,
-                        label_visibility="collapsed",
-                        index=0
-                    )
-                else:
-                    ans = st.selectbox(
-                        q["id"],
-                        q["options"],
-                        label_visibility="collapsed",
-                    )
-
-                st.session_state.filter_answers[q["id"]] = ans
-                st.caption(f"영향 직무: {', '.join(q['affects_jobs'])}")
-
-                st.write("")
-
-            submitted = st.form_submit_button("필터 적용하기", use_container_width=True)
-
-        if submitted or st.session_state.final_jobs:
-            st.session_state.final_jobs = apply_filtering(
-                jobs=st.session_state.job_reco,
-                filter_questions=st.session_state.filter_questions,
-                filter_answers=st.session_state.filter_answers,
-            )
+        render_filter_form()
 
         st.markdown("---")
 
-        if st.session_state.final_jobs:
-            st.success("최종 추천 직무 리스트가 완성됐어요. 아래에서 하나를 선택해 주세요.")
-
-            job_titles = [j["job_title"] for j in st.session_state.final_jobs]
-            st.session_state.selected_job = st.radio(
-                "최종 직무 선택",
-                options=job_titles,
-                label_visibility="collapsed",
-            )
-
-            st.markdown("---")
-
-            col_a, col_b, col_c = st.columns([1, 1, 1])
-            with col_a:
-                if st.button("← 이전", use_container_width=True):
-                    go(2)
-            with col_c:
-                if st.button("다음 →", use_container_width=True, disabled=(st.session_state.selected_job is None)):
-                    go(4)
-
-        else:
-            st.info("아직 필터 적용 결과가 없어요. 위 질문에 답하고 필터를 적용해 주세요.")
-
-            col_a, col_b, col_c = st.columns([1, 1, 1])
-            with col_a:
-                if st.button("← 이전", use_container_width=True):
-                    go(2)
+        render_final_selection()
 
 
 # =========================================================
@@ -649,22 +638,41 @@ def render_page_4():
 
     st.markdown("---")
 
+    # 3페이지에서 미리 만들어 둔 로드맵이 있으면 바로 표시
+    if not st.session_state.roadmap:
+        st.session_state.roadmap = roadmap_prefetcher.result_if_ready(job, st.session_state.user_answers)
+
     # 로드맵 생성 버튼
     col_a, col_b = st.columns([1, 1])
     with col_a:
         if st.button("로드맵 생성하기 (OpenAI)", use_container_width=True):
-            with st.spinner("로드맵을 생성 중..."):
-                try:
-                    st.session_state.roadmap = generate_roadmap(job, st.session_state.user_answers)
-                except Exception as e:
-                    st.error("로드맵 생성 중 오류가 발생했어요.")
-                    st.exception(e)
+            answers = dict(st.session_state.user_answers)
+            api_key = st.session_state.api_key
+            roadmap_job = job_runner.submit(
+                "roadmap",
+                "{}:{}".format(*prefetch_key(job, answers)),
+                st.session_state.session_id,
+                lambda j: run_roadmap_job(j, job, answers, api_key),
+            )
+            st.session_state.roadmap_job_id = roadmap_job.id
+            roadmap_job.wait(JOB_INLINE_WAIT)
 
     with col_b:
         if st.button("다른 직무 다시 고르기", use_container_width=True):
+            job_runner.cancel(st.session_state.roadmap_job_id)
+            st.session_state.roadmap_job_id = None
             st.session_state.roadmap = None
             go(3)
 
+    roadmap_job = finished_job("roadmap_job_id")
+    if roadmap_job is not None:
+        if roadmap_job.status == "done":
+            st.session_state.roadmap = roadmap_job.result
+        elif roadmap_job.status == "error":
+            show_llm_error("로드맵", roadmap_job.error)
+    elif st.session_state.roadmap_job_id:
+        render_job_progress("roadmap_job_id", "로드맵:")
+
     st.markdown("---")
 
     if st.session_state.roadmap:
@@ -690,10 +698,16 @@ def render_page_4():
     col1, col2, col3 = st.columns([1, 1, 1])
     with col1:
         if st.button("← 이전", use_container_width=True):
+            job_runner.cancel(st.session_state.roadmap_job_id)
+            st.session_state.roadmap_job_id = None
             go(3)
     with col3:
         if st.button("처음으로", use_container_width=True):
             # 초기화 느낌
+            roadmap_prefetcher.reset_session(st.session_state.session_id)
+            job_runner.cancel_session(st.session_state.session_id)
+            st.session_state.reco_job_id = None
+            st.session_state.roadmap_job_id = None
             st.session_state.page = 1
             st.session_state.user_answers = {}
             st.session_state.job_reco = []
@@ -705,10 +719,27 @@ def render_page_4():
             go(1)
 
 
+# =========================================================
+# 복원된 세션의 API 키 (키는 저장하지 않으므로 새로고침 후 다시 받음)
+# =========================================================
+def render_api_key_prompt():
+    if st.session_state.page == 1 or st.session_state.api_key.strip():
+        return
+    with st.sidebar:
+        st.session_state.api_key = st.text_input(
+            "API 키 다시 입력",
+            type="password",
+            placeholder="OpenAI API Key를 입력하세요",
+        )
+        st.caption("이전 진행 상황은 그대로 복원했어요. 새로 생성하려면 키를 다시 입력해 주세요.")
+
+
 # =========================================================
 # 라우터
 # =========================================================
 def render_router():
+    render_api_key_prompt()
+
     if st.session_state.page == 1:
         render_page_1()
     elif st.session_state.page == 2:
@@ -723,6 +754,13 @@ def render_router():
 
 
 render_router()
+startup_profiler.mark(f"{st.session_state.page}페이지 렌더링")
+save_session()
+startup_profiler.mark("save_session")
+startup_profiler.finish_run()
 
+if DEBUG_PANEL:
+    render_debug_panel()
 
-
+# 첫 화면을 보낸 뒤 시작하므로 첫 렌더링과 CPU를 다투지 않는다 (프로세스당 한 번)
+start_warmup()
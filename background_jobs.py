@@ -0,0 +1,357 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+# 프로세스 전체에서 동시에 돌리는 작업 수 (나머지는 대기열)
+JOB_WORKERS = int(os.environ.get("BACKGROUND_JOB_WORKERS", "16"))
+# 대기열에 둘 수 있는 작업 수. 넘치면 새 작업은 바로 거절 (0이면 제한 없음)
+JOB_QUEUE_MAX = int(os.environ.get("BACKGROUND_JOB_QUEUE_MAX", "64"))
+# 예상 대기 시간 계산에 쓰는 작업 시간 초깃값(초). 작업이 끝날 때마다 이동 평균으로 갱신
+JOB_DURATION_GUESS = float(os.environ.get("BACKGROUND_JOB_DURATION_GUESS", "8"))
+# 끝난 작업을 결과 조회용으로 남겨 두는 시간(초)
+JOB_RETENTION = float(os.environ.get("BACKGROUND_JOB_RETENTION", "600"))
+
+ACTIVE = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    """
+    작업 함수 안에서 job.report()/job.check()가 취소를 감지하면 던진다.
+    """
+
+
+_current = threading.local()
+
+
+def current_job() -> Optional["Job"]:
+    """
+    이 스레드에서 실행 중인 작업 (작업 스레드가 아니면 None).
+    """
+    return getattr(_current, "job", None)
+
+
+def check_cancelled():
+    """
+    작업 스레드에서 부르면 그 작업이 취소됐을 때 JobCancelled. 작업 밖(일괄 실행/예열)에서는 아무 일도 안 함.
+    pipeline처럼 Job을 받지 않는 코드가 오래 기다리는 동안 취소를 확인할 때 쓴다.
+    """
+    job = current_job()
+    if job is not None:
+        job.check()
+
+
+def bind_current_job(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    지금 스레드의 작업을 fn이 실행될 스레드에도 걸어 준다 (다른 풀에 나눠 보낸 하위 호출용).
+    그래야 그 스레드의 check_cancelled()도 작업 취소를 본다.
+    """
+    job = current_job()
+    if job is None:
+        return fn
+
+    def run(*args, **kwargs):
+        previous = current_job()
+        _current.job = job
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.job = previous
+
+    return run
+
+
+class Overloaded(RuntimeError):
+    """
+    대기열이 가득 차 작업을 받지 않음 (Job.error로 전달). retry_after: 다시 눌러 볼 만한 시점까지 초.
+    """
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# =========================================================
+# 작업 하나
+# =========================================================
+class Job:
+    """
+    status: queued -> running -> done / error / cancelled
+    progress: 화면에 보여줄 진행 문구
+    partial:  스트리밍으로 먼저 도착한 조각 (직무 카드, 로드맵 마일스톤 등)
+
+    작업 함수는 백그라운드 스레드에서 돌므로 st.session_state에 접근하지 않는다.
+    필요한 값은 제출할 때 인자로 복사해 넘긴다.
+    """
+
+    def __init__(self, kind: str, key: str, session_id: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.session_id = session_id
+        self.status = "queued"
+        self.progress = "대기 중"
+        self.partial: List[Any] = []
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.created = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._fn: Optional[Callable[["Job"], Any]] = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def report(self, progress: Optional[str] = None, item: Any = None):
+        """
+        작업 함수가 단계마다 부르는 체크포인트: 진행 문구/조각을 남기고, 취소됐으면 멈춘다.
+        """
+        self.check()
+        if progress is not None:
+            self.progress = progress
+        if item is not None:
+            self.partial.append(item)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _finish(self, status: str, result: Any = None, error: Optional[BaseException] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self._done.set()
+
+
+# =========================================================
+# 공유 실행기
+# =========================================================
+class JobRunner:
+    """
+    - 프로세스 전역 스레드 풀 하나로 모든 세션의 작업을 돌린다 (동시 실행 수 = JOB_WORKERS)
+    - 실행 자리가 없으면 세션별 FIFO 대기열에 넣고, 자리가 나면 세션을 돌아가며 하나씩 꺼낸다
+      (한 세션이 여러 작업을 넣어도 다른 세션이 그 뒤에 밀리지 않음)
+    - 대기열이 JOB_QUEUE_MAX를 넘으면 새 작업은 Overloaded로 바로 끝낸다 (받은 작업의 대기 시간 상한)
+    - 같은 key(세션 + 종류 + 입력)로 다시 제출하면 진행 중인 작업에 붙는다 (중복 클릭 방지)
+    - 같은 세션의 같은 종류 작업을 새 입력으로 제출하면 이전 작업은 취소한다 (새 작업이 받아들여진 뒤에만)
+    - 상한은 "작업" 수다. 작업 하나가 여러 LLM 호출을 동시에 낼 수 있고(로드맵 구간 동시 생성, 헤지),
+      로드맵 선행 생성은 이 실행기 밖에서 돈다 (llm_calls_outside_job_cap_total로 집계)
+    - 취소는 협조적: 대기 중이면 바로 빠지고, 실행 중이면 다음 report()/check()에서 멈춘다
+    """
+
+    def __init__(
+        self,
+        max_workers: int = JOB_WORKERS,
+        retention: float = JOB_RETENTION,
+        queue_max: int = JOB_QUEUE_MAX,
+    ):
+        self.retention = retention
+        self.max_workers = max_workers
+        self.queue_max = queue_max
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bg-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, str] = {}
+        # 세션 id -> 대기 중인 작업. 맨 앞 세션이 다음 차례, 꺼낸 세션은 맨 뒤로
+        self._queues: "OrderedDict[str, Deque[Job]]" = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._avg_duration = JOB_DURATION_GUESS
+
+        self.submitted = 0
+        self.attached = 0
+        self.cancelled = 0
+        self.shed = 0
+
+    def submit(self, kind: str, key: str, session_id: str, fn: Callable[[Job], Any]) -> Job:
+        """
+        fn(job) -> 결과. 반환된 Job의 id를 세션 상태에 넣어 두고 get()으로 상태를 본다.
+        대기열이 가득 차면 이미 끝난(status=error, error=Overloaded) 작업을 돌려준다.
+        """
+        full_key = f"{session_id}:{kind}:{key}"
+        with self._lock:
+            self._gc(time.time())
+            existing = self._jobs.get(self._by_key.get(full_key, ""))
+            if existing is not None and (existing.active or existing.status == "done"):
+                self.attached += 1
+                return existing
+
+            replaced = [
+                job for job in self._jobs.values()
+                if job.session_id == session_id and job.kind == kind and job.active
+            ]
+            # 대체될 이전 작업이 대기 중이면 그 자리는 새 작업이 쓴다
+            queued_after = self._queued - sum(1 for job in replaced if job.status == "queued")
+
+            job = Job(kind, full_key, session_id)
+            self._jobs[job.id] = job
+            if self._running >= self.max_workers and self.queue_max and queued_after >= self.queue_max:
+                # 거절할 때는 이전 작업을 그대로 둔다 (사용자에게 아무것도 안 남는 일이 없도록)
+                # key로 찾지 못하게 두어 다시 누르면 새로 제출된다
+                self.shed += 1
+                retry_after = self._avg_duration * self._queued / self.max_workers
+                job._finish("error", error=Overloaded(f"대기열 가득 참 ({self._queued})", retry_after))
+                return job
+
+            for old in replaced:
+                self._cancel(old)
+            self._by_key[full_key] = job.id
+            self.submitted += 1
+            job._fn = fn
+            self._queues.setdefault(session_id, deque()).append(job)
+            self._queued += 1
+            self._dispatch()
+            return job
+
+    def _dispatch(self):
+        # lock 안에서만 호출: 빈 자리만큼 세션을 돌아가며 대기 작업을 꺼내 실행
+        while self._running < self.max_workers and self._queues:
+            session_id, queue = next(iter(self._queues.items()))
+            job = queue.popleft()
+            if queue:
+                self._queues.move_to_end(session_id)
+            else:
+                del self._queues[session_id]
+            self._queued -= 1
+            self._running += 1
+            job.status = "running"
+            job.progress = "진행 중"
+            job.started_at = time.time()
+            self._executor.submit(self._run, job, job._fn)
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        _current.job = job
+        try:
+            result = fn(job)
+        except JobCancelled:
+            job._finish("cancelled")
+        except Exception as e:
+            job._finish("cancelled" if job.cancelled else "error", error=e)
+        except BaseException as e:
+            # SystemExit 등: 작업을 끝난 상태로 남겨 폴링하는 화면이 멈추지 않게 하고 그대로 올려 보낸다
+            job._finish("error", error=e)
+            raise
+        else:
+            # 끝나기 직전에 취소됐으면 결과를 버린다
+            job._finish("cancelled" if job.cancelled else "done", result=result)
+        finally:
+            _current.job = None
+            with self._lock:
+                self._running -= 1
+                if job.status != "cancelled":
+                    self._avg_duration += 0.2 * (job.finished_at - job.started_at - self._avg_duration)
+                self._dispatch()
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        if not job_id:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: Optional[str]):
+        with self._lock:
+            job = self._jobs.get(job_id or "")
+            if job is not None and job.active:
+                self._cancel(job)
+
+    def cancel_session(self, session_id: str):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.session_id == session_id and job.active:
+                    self._cancel(job)
+
+    def _cancel(self, job: Job):
+        # lock 안에서만 호출
+        job._cancel.set()
+        self.cancelled += 1
+        if job.status == "queued":
+            queue = self._queues[job.session_id]
+            queue.remove(job)
+            if not queue:
+                del self._queues[job.session_id]
+            self._queued -= 1
+            job._finish("cancelled")
+
+    def queue_position(self, job: Job) -> int:
+        """
+        대기 중인 작업이면 꺼내질 순서 (1이면 다음 차례), 아니면 0.
+        세션을 돌아가며 꺼내므로 k번째로 기다리는 작업 앞에는 세션마다 최대 k개
+        (+ 차례가 앞선 세션은 하나 더)가 있다.
+        """
+        with self._lock:
+            if job.status != "queued":
+                return 0
+            mine = self._queues[job.session_id]
+            k = mine.index(job)
+            ahead = 0
+            before = True
+            for session_id, queue in self._queues.items():
+                if session_id == job.session_id:
+                    before = False
+                    ahead += k
+                    continue
+                ahead += min(len(queue), k + 1 if before else k)
+            return ahead + 1
+
+    def estimate_wait(self, job: Job) -> Tuple[int, float]:
+        """
+        (대기 순서, 예상 대기 시간(초)). 대기 중이 아니면 (0, 0).
+        예상 시간 = 앞선 작업 + 자기 몫을 실행 자리 수로 나눈 만큼의 평균 작업 시간.
+        """
+        position = self.queue_position(job)
+        if not position:
+            return 0, 0.0
+        return position, position / self.max_workers * self._avg_duration
+
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def saturated(self) -> bool:
+        """
+        지금 제출하면 대기열로 갈지 (실행 자리가 없거나 이미 기다리는 작업이 있음).
+        추측성 작업(로드맵 선행 생성)은 이때 내지 않는다.
+        """
+        return self._queued > 0 or self._running >= self.max_workers
+
+    def _gc(self, now: float):
+        # lock 안에서만 호출
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and now - job.finished_at > self.retention:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) == job_id:
+                    del self._by_key[job.key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "attached": self.attached,
+                "cancelled": self.cancelled,
+                "shed": self.shed,
+                "queued": self._queued,
+                "running": self._running,
+                "avg_job_ms": int(self._avg_duration * 1000),
+                "tracked": len(self._jobs),
+            }
+
+
+# 프로세스 전역 실행기 (app.py는 rerun마다 다시 실행되지만 이 모듈은 한 번만 로드됨)
+job_runner = JobRunner()
@@ -0,0 +1,262 @@
+"""
+답변 프로필 일괄 실행 (Streamlit 없이)
+
+진로센터 등에서 받은 답변 프로필 파일을 추천 -> 필터 질문 -> 필터링 -> 로드맵까지
+앱과 같은 pipeline 함수(run_profile)로 돌려 결과를 JSONL로 쓴다.
+응답 캐시/single-flight/스케줄러(키당 속도 조절)는 앱과 똑같이 적용된다.
+
+입력 (--input):
+  .jsonl  한 줄에 프로필 하나. 답변 dict 그대로이거나
+          {"id": "...", "answers": {...}, "filter_answers": {...}} (id/filter_answers는 선택)
+  .csv    첫 줄이 답변 키(2페이지 문항 키 + education, major), 선택으로 id 열.
+          복수 선택 문항(multiselect)은 "|"로 구분 (예: health 열에 눈의 피로|두통)
+          선택지 문구는 questions.OPTION_LABELS와 글자까지 같아야 한다.
+  id가 없으면 입력 파일의 몇 번째 프로필인지(1부터)를 id로 쓴다.
+  파일은 한 줄씩 읽으며, 동시에 처리 중인 프로필은 --concurrency의 2배까지만 메모리에 둔다.
+
+출력 (--out, JSONL): 프로필이 끝나는 순서대로 한 줄씩
+  {"id", "answers", "jobs", "filter_questions", "filter_answers", "final_jobs", "roadmaps", "elapsed_s"}
+
+체크포인트 (--checkpoint, 기본 <out>.progress): 프로필마다 {"id", "status": ok/error, "ts", "error"}.
+다시 실행하면 ok로 끝난 id는 건너뛰고 실패한 것만 다시 돈다 (같은 입력 파일 기준).
+
+사용법 (프로젝트 루트에서, 앱과 같은 OPENAI_* / LLM_* 환경변수로):
+    python batch_run.py --input cohort.csv --out .cache/cohort_results.jsonl --concurrency 8
+    python batch_run.py --input cohort.jsonl --out results.jsonl --mode llm --roadmaps 3 --limit 100
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, Set
+
+from pipeline import RECO_MODES, run_profile
+from profile_log import print_request_counts
+from questions import FORM_QUESTIONS
+
+MULTISELECT_KEYS = {q[0] for q in FORM_QUESTIONS if q[2] == "multiselect"}
+REPORT_INTERVAL = 10.0
+
+
+# =========================================================
+# 입력
+# =========================================================
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        n = 0
+        for line in f:
+            if not line.strip():
+                continue
+            n += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"  건너뜀: {n}번째 줄이 JSON이 아님", file=sys.stderr)
+                continue
+            if not isinstance(record, dict):
+                continue
+            if isinstance(record.get("answers"), dict):
+                yield {
+                    "id": str(record.get("id") or n),
+                    "answers": record["answers"],
+                    "filter_answers": record.get("filter_answers"),
+                }
+            else:
+                yield {"id": str(record.pop("id", None) or n), "answers": record, "filter_answers": None}
+
+
+def read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for n, row in enumerate(csv.DictReader(f), start=1):
+            answers: Dict[str, Any] = {}
+            for key, value in row.items():
+                if key is None or key == "id":
+                    continue
+                value = (value or "").strip()
+                if key in MULTISELECT_KEYS:
+                    answers[key] = [v.strip() for v in value.split("|") if v.strip()]
+                else:
+                    answers[key] = value
+            yield {"id": (row.get("id") or "").strip() or str(n), "answers": answers, "filter_answers": None}
+
+
+def read_profiles(path: str) -> Iterator[Dict[str, Any]]:
+    return read_csv(path) if path.lower().endswith(".csv") else read_jsonl(path)
+
+
+# =========================================================
+# 체크포인트 / 출력
+# =========================================================
+class Checkpoint:
+    """
+    한 줄에 프로필 하나: {"id", "status": ok/error, "ts", "error"}.
+    같은 id가 여러 줄이면 마지막 줄이 유효. 쓰다 끊긴 줄은 읽을 때 건너뛴다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        status, profile_id = record["status"], record["id"]
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if status == "ok":
+                        self.done.add(profile_id)
+                    else:
+                        self.done.discard(profile_id)
+
+    def write(self, profile_id: str, status: str, error: str = ""):
+        record = {"id": profile_id, "status": status, "ts": round(time.time(), 3), "error": error}
+        with self._lock:
+            if status == "ok":
+                self.done.add(profile_id)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class ResultWriter:
+    """
+    결과 JSONL에 한 줄씩 추가하고 바로 flush (중간에 끊겨도 끝난 프로필은 남음).
+    체크포인트는 결과를 쓴 뒤에 남기므로, 체크포인트에 ok인 id는 결과 파일에 반드시 있다.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._f = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+# =========================================================
+# 실행
+# =========================================================
+class Throughput:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ok = 0
+        self.failed = 0
+        self.skipped = 0
+        self._last_report = self.started
+
+    def per_minute(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return (self.ok + self.failed) / elapsed * 60 if elapsed > 0 else 0.0
+
+    def line(self) -> str:
+        return (
+            f"완료 {self.ok}, 실패 {self.failed}, 건너뜀 {self.skipped} | "
+            f"{time.perf_counter() - self.started:.1f}s, {self.per_minute():.1f} 프로필/분"
+        )
+
+    def maybe_report(self):
+        now = time.perf_counter()
+        if now - self._last_report >= REPORT_INTERVAL:
+            self._last_report = now
+            print(f"  {self.line()}", flush=True)
+
+
+def run_one(profile: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    result = run_profile(
+        profile["answers"],
+        args.mode,
+        filter_answers=profile["filter_answers"],
+        roadmaps=args.roadmaps,
+    )
+    return {
+        "id": profile["id"],
+        "answers": profile["answers"],
+        **result,
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
+
+
+def run_batch(args: argparse.Namespace) -> Throughput:
+    checkpoint = Checkpoint(args.checkpoint)
+    writer = ResultWriter(args.out)
+    stats = Throughput()
+    inflight: Dict[Future, str] = {}
+
+    def collect(done: Set[Future]):
+        for fut in done:
+            profile_id = inflight.pop(fut)
+            try:
+                record = fut.result()
+            except Exception as e:
+                stats.failed += 1
+                checkpoint.write(profile_id, "error", f"{type(e).__name__}: {e}")
+                print(f"  실패 {profile_id}: {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            writer.write(record)
+            checkpoint.write(profile_id, "ok")
+            stats.ok += 1
+
+    submitted = 0
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="batch") as pool:
+            for profile in read_profiles(args.input):
+                if profile["id"] in checkpoint.done:
+                    stats.skipped += 1
+                    continue
+                if args.limit and submitted >= args.limit:
+                    break
+                # 입력을 한꺼번에 제출하지 않는다: 처리 중인 프로필이 상한이면 하나 끝날 때까지 대기
+                while len(inflight) >= args.concurrency * 2:
+                    done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+                    collect(done)
+                    stats.maybe_report()
+                inflight[pool.submit(run_one, profile, args)] = profile["id"]
+                submitted += 1
+            while inflight:
+                done, _ = wait(list(inflight), timeout=REPORT_INTERVAL, return_when=FIRST_COMPLETED)
+                collect(done)
+                stats.maybe_report()
+    finally:
+        writer.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="답변 프로필 파일 (.jsonl 또는 .csv)")
+    parser.add_argument("--out", required=True, help="결과 JSONL (이어 쓰기)")
+    parser.add_argument("--checkpoint", default=None, help="진행 기록 파일 (기본 <out>.progress)")
+    parser.add_argument("--mode", choices=RECO_MODES, default=os.environ.get("RECO_MODE", "hybrid"))
+    parser.add_argument("--roadmaps", type=int, default=1, help="프로필마다 만들 로드맵 수 (최종 리스트 상위)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 처리할 프로필 수")
+    parser.add_argument("--limit", type=int, default=0, help="이번 실행에서 처리할 최대 프로필 수 (0: 전부)")
+    args = parser.parse_args()
+    args.checkpoint = args.checkpoint or f"{args.out}.progress"
+
+    for path in (args.out, args.checkpoint):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    print(f"입력 {args.input} -> {args.out} (mode={args.mode}, roadmaps={args.roadmaps}, concurrency={args.concurrency})")
+    stats = run_batch(args)
+    print(f"\n{stats.line()}")
+
+    print_request_counts()
+    if stats.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
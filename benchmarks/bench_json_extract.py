@@ -0,0 +1,116 @@
+"""
+safe_json_extract 벤치마크: 기존 정규식 방식 vs 선형 스캐너(json_extract)
+
+지저분한 모델 출력(설명 섞임, ```json 펜스, 뒤쪽 설명 속 중괄호, 잘린 응답)을
+크기별로 만들어 두 함수의 처리 시간과 성공률을 비교한다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_json_extract --sizes 10 100 1000 --repeat 20
+"""
+import argparse
+import json
+import re
+import time
+from typing import Callable, Dict, List, Tuple
+
+from json_extract import extract_json_object
+
+
+# =========================================================
+# 기존 구현 (비교 기준, 변경 전 app.py 그대로)
+# =========================================================
+def legacy_safe_json_extract(text: str) -> dict:
+    text = text.strip()
+
+    try:
+        return json.loads(text)
+    except Exception:
+        pass
+
+    codeblock = re.search(r"```json\s*(\{.*?\})\s*```", text, re.DOTALL)
+    if codeblock:
+        try:
+            return json.loads(codeblock.group(1))
+        except Exception:
+            pass
+
+    brace = re.search(r"(\{.*\})", text, re.DOTALL)
+    if brace:
+        try:
+            return json.loads(brace.group(1))
+        except Exception:
+            pass
+
+    return {}
+
+
+def new_safe_json_extract(text: str) -> dict:
+    data, _ = extract_json_object(text)
+    return data
+
+
+# =========================================================
+# 지저분한 출력 코퍼스
+# =========================================================
+def make_payload(n_jobs: int) -> dict:
+    return {
+        "jobs": [
+            {
+                "job_title": f"직무 {i}",
+                "category": "기획",
+                "why_fit": f"사용자 성향과 잘 맞습니다 {{예시 {i}}} \"따옴표\" 포함",
+                "requirements_hint": "학사 이상",
+            }
+            for i in range(n_jobs)
+        ]
+    }
+
+
+def make_corpus(n_jobs: int) -> Dict[str, str]:
+    body = json.dumps(make_payload(n_jobs), ensure_ascii=False, indent=2)
+    prose = "아래는 요청하신 추천 결과입니다. 참고로 {중괄호 예시}도 있습니다.\n" * max(1, n_jobs // 10)
+    return {
+        "clean": body,
+        "fenced": f"{prose}```json\n{body}\n```\n도움이 되었길 바랍니다.",
+        "prose_around": f"{prose}{body}\n끝.",
+        "trailing_braces": f"{body}\n\n참고: {{이 부분은}} JSON이 아닙니다 {{x}}",
+        "truncated": body[: int(len(body) * 0.9)],
+        # 모델이 배열을 끝없이 여는 출력: 파서가 RecursionError를 내도 실패({})로 끝나야 함
+        "deep_nesting": '{"jobs":' + "[" * 5000,
+    }
+
+
+def bench(fn: Callable[[str], dict], text: str, repeat: int) -> Tuple[float, bool]:
+    ok = bool(fn(text))
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - t0) / repeat, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'case':<16}{'jobs':>6}{'chars':>10}{'legacy ms':>12}{'ok':>4}{'new ms':>10}{'ok':>4}  path")
+    rows: List[Tuple] = []
+    for size in args.sizes:
+        for case, text in make_corpus(size).items():
+            legacy_t, legacy_ok = bench(legacy_safe_json_extract, text, args.repeat)
+            new_t, new_ok = bench(new_safe_json_extract, text, args.repeat)
+            _, path = extract_json_object(text)
+            rows.append((case, size, len(text), legacy_t, legacy_ok, new_t, new_ok, path))
+            print(
+                f"{case:<16}{size:>6}{len(text):>10}{legacy_t * 1000:>12.3f}{'Y' if legacy_ok else 'N':>4}"
+                f"{new_t * 1000:>10.3f}{'Y' if new_ok else 'N':>4}  {path}"
+            )
+
+    legacy_fail = sum(1 for r in rows if not r[4])
+    new_fail = sum(1 for r in rows if not r[6])
+    print(f"\n실패: legacy {legacy_fail}/{len(rows)}, new {new_fail}/{len(rows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+전공 정규화(major_index) 벤치마크 / 키 카디널리티 보고
+
+자유 입력 전공 표본을 만들어(또는 --log 프로필 기록에서 읽어)
+- 입력 그대로 / 문자열 정규화만 / 표준 전공으로 매핑했을 때 서로 다른 키 수
+- 정확 매칭 / 근사(n-gram) 매칭 / 못 찾음 비율
+- 조회 시간 (캐시 없이 인덱스 조회, lru_cache 적중)
+을 보고한다. 키 수가 줄어든 만큼 같은 프롬프트(응답 캐시/single-flight 키)가 늘어난다.
+
+표본: 사전의 표준 이름/별칭에 학과·학부·전공 꼬리, 띄어쓰기, 대소문자, 한 글자 누락 같은
+실제 입력에서 흔한 변형을 섞고, 일부는 사전에 없는 자유 입력으로 채운다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_majors --samples 5000
+    python -m benchmarks.bench_majors --log .cache/profiles.jsonl
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from major_index import MAJORS_PATH, canonical_major, get_major_index, match_major, normalize_major
+from roadmap_prefetch import answers_fingerprint
+
+UNKNOWN_INPUTS = ["미정", "없음", "자유전공", "교양학부", "무전공", "고등학교 졸업", "학점은행제", "독학", "해당 없음"]
+
+
+def perturb(text: str, rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.25 and len(text) > 2 and not text.isascii():
+        i = rng.randrange(1, len(text))
+        return text[:i] + " " + text[i:]
+    if roll < 0.35 and len(text) > 3:
+        i = rng.randrange(len(text))
+        return text[:i] + text[i + 1:]
+    if roll < 0.45 and text.isascii():
+        return text.upper() if rng.random() < 0.5 else text.lower()
+    return text
+
+
+def sample_inputs(n: int, rng: random.Random, unknown_rate: float) -> List[str]:
+    with open(MAJORS_PATH, encoding="utf-8") as f:
+        majors = json.load(f)["majors"]
+    # 인기 전공일수록 자주 나오도록 순서를 섞은 뒤 Zipf 비슷한 가중치
+    rng.shuffle(majors)
+    weights = [1 / (i + 1) ** 0.8 for i in range(len(majors))]
+
+    inputs = []
+    for _ in range(n):
+        if rng.random() < unknown_rate:
+            inputs.append(rng.choice(UNKNOWN_INPUTS))
+            continue
+        major = rng.choices(majors, weights)[0]
+        text = rng.choice([major["name"]] * 3 + major.get("aliases", []))
+        if not text.isascii():
+            text += rng.choice(["", "", "과", "학과", "학부", " 전공"])
+        inputs.append(perturb(text, rng))
+    return inputs
+
+
+def timing(fn: Any, inputs: List[str]) -> List[float]:
+    samples = []
+    for text in inputs:
+        t0 = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def pct(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def report_inputs(inputs: List[str]):
+    index = get_major_index()
+    raw = {t.strip() for t in inputs}
+    normalized = {normalize_major(t) for t in inputs}
+    canonical = {canonical_major(t) for t in inputs}
+
+    methods: Dict[str, int] = {"exact": 0, "fuzzy": 0, "none": 0}
+    for t in inputs:
+        match = match_major(t.strip())
+        methods[match["method"] if match else "none"] += 1
+
+    print(f"사전: 표준 전공 {len(index.majors)}개, 조회 키 {len(index._by_key)}개")
+    print(f"입력 {len(inputs)}개")
+    print(f"{'키':<24}{'서로 다른 수':>12}{'감소':>10}")
+    for name, keys in [("입력 그대로", raw), ("문자열 정규화만", normalized), ("표준 전공 매핑", canonical)]:
+        print(f"{name:<24}{len(keys):>12}{(1 - len(keys) / len(raw)) * 100:>9.1f}%")
+    print(
+        "매칭: " + ", ".join(f"{m} {n / len(inputs) * 100:.1f}%" for m, n in methods.items())
+    )
+
+    fresh = list(dict.fromkeys(t.strip() for t in inputs))
+    uncached = timing(index.lookup, fresh)
+    cached = timing(match_major, fresh)
+    print(f"\n{'조회':<24}{'p50':>10}{'p99':>10}{'max':>10}  (us)")
+    for name, values in [("인덱스 (캐시 없음)", uncached), ("match_major (캐시 적중)", cached)]:
+        print(f"{name:<24}{statistics.median(values):>10.1f}{pct(values, 0.99):>10.1f}{max(values):>10.1f}")
+
+
+def report_profiles(path: str):
+    """
+    기록된 프로필 전체 기준 감소: 전공 표기만 다르고 나머지 답이 같은 요청이 합쳐지는 정도.
+    (read_profiles는 이미 표준 전공 기준으로 묶으므로 원본 줄을 직접 읽는다)
+    """
+    answers: List[Dict[str, Any]] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)["answers"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if isinstance(record, dict):
+                answers.append(record)
+
+    raw = {json.dumps(a, ensure_ascii=False, sort_keys=True) for a in answers}
+    canonical = {answers_fingerprint(a) for a in answers}
+    print(f"프로필 기록 {len(answers)}건: 서로 다른 답변 {len(raw)}개 -> 표준 전공 기준 {len(canonical)}개 "
+          f"({(1 - len(canonical) / max(len(raw), 1)) * 100:.1f}% 감소)\n")
+    report_inputs([str(a.get("major", "")) for a in answers])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5000, help="만들 입력 표본 수")
+    parser.add_argument("--unknown-rate", type=float, default=0.05, help="사전에 없는 자유 입력 비율")
+    parser.add_argument("--log", default=None, help="앱이 남긴 프로필 기록 파일 (PROFILE_LOG_PATH)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.log:
+        report_profiles(args.log)
+        return
+    report_inputs(sample_inputs(args.samples, random.Random(args.seed), args.unknown_rate))
+
+
+if __name__ == "__main__":
+    main()
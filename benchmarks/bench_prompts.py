@@ -0,0 +1,314 @@
+"""
+프롬프트 압축 측정: 기존 프롬프트 vs prompt_compact 적용 프롬프트
+
+단계별(recommend / why_fit / filter / roadmap) 입력 토큰을 비교하고,
+--live 를 주면 실제(또는 목) 서버에 두 버전을 번갈아 보내
+지연 시간과 입력/출력 토큰(usage)을 함께 보고한다.
+토큰 수는 tiktoken(o200k_base)이 있으면 그것으로, 없으면 근사치로 센다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_prompts --profiles 200
+    python -m benchmarks.bench_prompts --live --profiles 5                 # 내장 목 서버
+    python -m benchmarks.bench_prompts --live --base-url https://api.openai.com/v1 --profiles 5
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.loadtest import sample_profile
+from benchmarks.mock_openai_server import add_config_args, config_from_args, serve
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except ImportError:
+    _ENCODING = None
+
+_APPROX_TOKEN = re.compile(r" ?[A-Za-z]+| ?\d+|\s+|[^\sA-Za-z\d]")
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    # 근사: 앞 공백을 포함한 영문 단어/숫자 덩어리, 공백 덩어리, 그 외 글자(한글 포함) 각각 1토큰
+    return len(_APPROX_TOKEN.findall(text))
+
+
+# =========================================================
+# 기존 프롬프트 (비교 기준, 압축 전 pipeline.py 그대로)
+# =========================================================
+def legacy_job_recommendation_prompt(user_answers: Dict[str, Any]) -> Tuple[str, str]:
+    system = """
+너는 취업/진로 상담 AI다.
+사용자의 성향/조건을 보고 '초기 취준생'에게 현실적인 추천 직무 리스트를 만든다.
+
+반드시 아래 JSON 형식으로만 출력하라.
+"""
+
+    user = f"""
+사용자 입력 정보는 다음과 같다:
+{json.dumps(user_answers, ensure_ascii=False, indent=2)}
+
+요구사항:
+- 추천 직무 10~15개
+- 각 직무는 한국 기준으로 현실적인 직무여야 함
+- 직무는 너무 거창하지 않게 (예: "CEO" 같은 것 금지)
+- 직무별로 다음 정보를 포함:
+  - job_title: 직무명
+  - category: (예: 마케팅/기획/교육/디자인/개발/공공/전문직/콘텐츠 등)
+  - why_fit: 왜 이 사용자에게 맞는지 1~2문장
+  - requirements_hint: 해당 직무에 일반적으로 필요한 조건(학력/자격/전공 등)을 짧게
+
+출력 JSON 스키마:
+{{
+  "jobs": [
+    {{
+      "job_title": "...",
+      "category": "...",
+      "why_fit": "...",
+      "requirements_hint": "..."
+    }}
+  ]
+}}
+"""
+
+    return system, user
+
+
+def legacy_why_fit_prompt(user_answers: Dict[str, Any], jobs: List[Dict[str, Any]]) -> Tuple[str, str]:
+    system = """
+너는 취업/진로 상담 AI다.
+이미 정해진 추천 직무 각각에 대해, 왜 이 사용자에게 맞는지 설명만 쓴다.
+
+반드시 JSON 형식으로만 출력하라.
+"""
+
+    user = f"""
+사용자 입력 정보:
+{json.dumps(user_answers, ensure_ascii=False)}
+
+추천 직무: {json.dumps([j["job_title"] for j in jobs], ensure_ascii=False)}
+
+요구사항:
+- 직무마다 왜 이 사용자에게 맞는지 1~2문장
+- 직무명은 그대로 키로 사용
+
+출력 JSON 스키마:
+{{
+  "why_fit": {{"직무명": "설명"}}
+}}
+"""
+    return system, user
+
+
+
+def legacy_filter_question_prompt(jobs: List[Dict[str, Any]]) -> Tuple[str, str]:
+    system = """
+너는 진로추천 앱의 '필터링 질문 생성기'다.
+
+입력으로 추천 직무 리스트가 주어진다.
+여기서 일부 직무는 특정 조건이 반드시 필요하다(예: 의사, 변호사, 약사, 교사 등).
+
+너의 목표는:
+- 사용자가 '해당 직무가 현실적으로 가능한지' 판단하기 위한 질문을 자동 생성하는 것.
+
+반드시 JSON 형식으로만 출력하라.
+"""
+
+    user = f"""
+추천 직무 리스트:
+{json.dumps(jobs, ensure_ascii=False, indent=2)}
+
+요구사항:
+- 질문은 3~7개 정도 (너무 많으면 안 됨)
+- 질문은 직무 리스트에 기반해서만 생성
+- 질문마다 아래 정보를 포함:
+  - id: 짧은 식별자(영문)
+  - question: 질문 문장
+  - type: "yesno" 또는 "choice"
+  - options: type이 choice면 선택지 리스트, yesno면 ["예","아니오"]
+  - affects_jobs: 이 질문이 영향을 주는 직무명 리스트
+
+예시:
+의사가 있으면 -> "의대 졸업(또는 재학) 여부" 같은 질문 생성
+
+출력 JSON 스키마:
+{{
+  "questions": [
+    {{
+      "id": "medical_school",
+      "question": "의대 졸업(또는 재학) 여부가 있나요?",
+      "type": "yesno",
+      "options": ["예","아니오"],
+      "affects_jobs": ["의사"]
+    }}
+  ]
+}}
+"""
+
+    return system, user
+
+
+def legacy_roadmap_prompt(job_title: str, user_answers: Dict[str, Any]) -> Tuple[str, str]:
+    system = """
+너는 커리어 로드맵 설계 AI다.
+사용자가 선택한 직무를 기준으로,
+한국 취업 시장에서 현실적인 2년 로드맵을 만든다.
+
+주의:
+- 웹 검색을 하지 않는다.
+- 대신 일반적으로 알려진 업계 상식 수준에서 현실적인 계획을 제시한다.
+- 너무 단정하지 말고, "예시"임을 분명히 한다.
+
+반드시 JSON으로만 출력하라.
+"""
+
+    user = f"""
+사용자가 선택한 직무: {job_title}
+사용자 정보:
+{json.dumps(user_answers, ensure_ascii=False, indent=2)}
+
+요구사항:
+- 시간축 3구간으로 나누기:
+  1) 지금~3개월
+  2) 3~12개월
+  3) 1~2년
+- 각 구간마다 해야 할 행동 4~6개 (현실적으로)
+- 결과는 "로드맵 카드"처럼 보여줄 수 있게 구성
+
+출력 JSON 스키마:
+{{
+  "headline": "예비 OO의 이제뭐하지",
+  "disclaimer": "이 로드맵은 예시이며 ...",
+  "timeline": [
+    {{
+      "period": "지금~3개월",
+      "milestones": ["...", "..."]
+    }},
+    {{
+      "period": "3~12개월",
+      "milestones": ["...", "..."]
+    }},
+    {{
+      "period": "1~2년",
+      "milestones": ["...", "..."]
+    }}
+  ],
+  "recommended_resources": ["추천 리소스 1", "추천 리소스 2", "추천 리소스 3"]
+}}
+"""
+
+    return system, user
+
+
+# =========================================================
+# 단계별 (기존, 압축) 프롬프트 쌍
+# =========================================================
+def prompt_pairs(answers: Dict[str, Any]) -> Dict[str, Tuple[Tuple[str, str], Tuple[str, str]]]:
+    from job_scoring import recommend_jobs
+    from pipeline import (
+        build_filter_question_prompt,
+        build_job_recommendation_prompt,
+        build_roadmap_prompt,
+        build_why_fit_prompt,
+    )
+
+    # 기존 필터 프롬프트는 LLM이 만든 직무 카드 전체(why_fit 포함)를 그대로 넣었다
+    jobs = [{k: v for k, v in j.items() if k != "score"} for j in recommend_jobs(answers)]
+    job_title = jobs[0]["job_title"]
+    return {
+        "recommend": (legacy_job_recommendation_prompt(answers), build_job_recommendation_prompt(answers)),
+        "why_fit": (legacy_why_fit_prompt(answers, jobs), build_why_fit_prompt(answers, jobs)),
+        "filter": (legacy_filter_question_prompt(jobs), build_filter_question_prompt(jobs)),
+        "roadmap": (legacy_roadmap_prompt(job_title, answers), build_roadmap_prompt(job_title, answers)),
+    }
+
+
+def live_call(system: str, user: str, max_tokens: Optional[int], api_key: Optional[str]) -> Tuple[float, int, int]:
+    """
+    반환: (지연 초, 입력 토큰, 출력 토큰). 캐시를 거치지 않고 항상 새로 호출한다.
+    """
+    from openai import NOT_GIVEN
+
+    from client_pool import client_pool
+
+    t0 = time.perf_counter()
+    resp = client_pool.get(api_key).chat.completions.create(
+        model="gpt-4o-mini",
+        temperature=0.6,
+        max_tokens=max_tokens or NOT_GIVEN,
+        messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+    )
+    elapsed = time.perf_counter() - t0
+    usage = resp.usage
+    return elapsed, getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+def mean(values: List[float]) -> float:
+    return statistics.mean(values) if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=200, help="샘플 사용자 수")
+    parser.add_argument("--live", action="store_true", help="서버에 실제로 보내 지연/usage 측정")
+    parser.add_argument("--base-url", default=None, help="--live 대상 (없으면 목 서버 내장 실행)")
+    parser.add_argument("--port", type=int, default=8766, help="내장 목 서버 포트")
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.live:
+        if args.base_url is None:
+            server = serve("127.0.0.1", args.port, config_from_args(args))
+            args.base_url = f"http://127.0.0.1:{args.port}/v1"
+        # client_pool 을 import 하기 전에 설정해야 반영된다.
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+    from prompt_compact import max_tokens_for
+
+    rng = random.Random(args.seed)
+    profiles = [sample_profile(rng) for _ in range(args.profiles)]
+
+    tokens: Dict[str, Dict[str, List[int]]] = {}
+    live: Dict[str, Dict[str, List[Tuple[float, int, int]]]] = {}
+    for answers in profiles:
+        for step, (legacy, compact) in prompt_pairs(answers).items():
+            for version, (system, user) in (("legacy", legacy), ("compact", compact)):
+                tokens.setdefault(step, {}).setdefault(version, []).append(count_tokens(system) + count_tokens(user))
+                if args.live:
+                    budget = max_tokens_for(step) if version == "compact" else None
+                    result = live_call(system, user, budget, os.environ.get("OPENAI_API_KEY"))
+                    live.setdefault(step, {}).setdefault(version, []).append(result)
+
+    counter = "tiktoken o200k_base" if _ENCODING is not None else "근사치 (tiktoken 없음)"
+    print(f"입력 토큰 ({counter}, 사용자 {args.profiles}명 평균)")
+    print(f"{'step':<12}{'legacy':>10}{'compact':>10}{'saved':>9}{'budget':>9}")
+    for step, by_version in tokens.items():
+        before, after = mean(by_version["legacy"]), mean(by_version["compact"])
+        saved = (1 - after / before) * 100 if before else 0.0
+        print(f"{step:<12}{before:>10.0f}{after:>10.0f}{saved:>8.1f}%{str(max_tokens_for(step)):>9}")
+
+    if live:
+        print(f"\n실측 ({args.base_url})")
+        print(f"{'step':<12}{'version':<9}{'latency':>9}{'in tok':>9}{'out tok':>9}")
+        for step, by_version in live.items():
+            for version, results in by_version.items():
+                print(
+                    f"{step:<12}{version:<9}{mean([r[0] for r in results]):>9.3f}"
+                    f"{mean([r[1] for r in results]):>9.0f}{mean([r[2] for r in results]):>9.0f}"
+                )
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+3페이지 상호작용당 재실행 시간 / 웹소켓 전송량 벤치마크
+
+실제 `streamlit run` 서버를 띄우고, 브라우저 대신 웹소켓으로 BackMsg를 보내
+1 -> 3페이지까지 진행한 뒤 2페이지 질문 화면 렌더링과 3페이지 상호작용(필터 적용,
+최종 직무 라디오 변경, "더 보기")마다 스크립트 실행이 끝날 때까지의 시간과 받은 ForwardMsg 바이트 수를 잰다.
+fragment 안의 위젯은 브라우저처럼 fragment_id를 실어 보내므로 fragment 단위 재실행이 측정된다.
+
+OpenAI 호출 없이 돌 수 있도록 RECO_MODE=fast, ROADMAP_PREFETCH=0 으로 실행한다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_rerun                        # 현재 작업 트리만
+    python -m benchmarks.bench_rerun --baseline HEAD~1      # git 리비전(변경 전)과 비교
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.sync.client import connect
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# =========================================================
+# 최소한의 Streamlit 웹소켓 클라이언트
+# =========================================================
+class StreamlitSession:
+    """
+    widgets: 위젯 라벨 -> (위젯 id, fragment_id, 선택지)
+    states:  지금까지 바꾼 위젯 값 (브라우저처럼 매 재실행마다 함께 보냄)
+    """
+
+    def __init__(self, ws: Any):
+        self.ws = ws
+        self.widgets: Dict[str, Tuple[str, str, List[str]]] = {}
+        self.states: Dict[str, WidgetState] = {}
+        self.page_hash = ""
+
+    def rerun(self, triggers: Optional[List[WidgetState]] = None, fragment_id: str = "") -> Tuple[float, int, int]:
+        """
+        반환: (스크립트가 끝날 때까지 걸린 초, 받은 바이트, 받은 메시지 수)
+        st.rerun()으로 이어지는 재실행까지 모두 끝나야 완료로 본다.
+        """
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self.page_hash
+        state.fragment_id = fragment_id
+        state.widget_states.widgets.extend(list(self.states.values()) + (triggers or []))
+
+        if not fragment_id:
+            self.widgets = {}
+
+        t0 = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        received = 0
+        count = 0
+        while True:
+            data = self.ws.recv(timeout=60)
+            received += len(data)
+            count += 1
+            fwd = ForwardMsg()
+            fwd.ParseFromString(data)
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = fwd.new_session.main_script_hash
+            elif kind == "delta":
+                self._register(fwd)
+            elif kind == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        return time.perf_counter() - t0, received, count
+
+    def _register(self, fwd: ForwardMsg):
+        delta = fwd.delta
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        proto = getattr(element, kind) if kind else None
+        widget_id = getattr(proto, "id", "")
+        label = getattr(proto, "label", "")
+        if widget_id and label:
+            options = list(getattr(proto, "options", []))
+            self.widgets[label] = (widget_id, delta.fragment_id, [str(o) for o in options])
+
+    def find(self, prefix: str) -> Optional[Tuple[str, str, List[str]]]:
+        for label, info in self.widgets.items():
+            if label.startswith(prefix):
+                return info
+        return None
+
+    def click(self, prefix: str) -> Tuple[float, int, int]:
+        widget_id, fragment_id, _ = self.find(prefix)
+        return self.rerun([WidgetState(id=widget_id, trigger_value=True)], fragment_id)
+
+    def set_string(self, prefix: str, value: str) -> Tuple[float, int, int]:
+        widget_id, fragment_id, _ = self.find(prefix)
+        self.states[widget_id] = WidgetState(id=widget_id, string_value=value)
+        return self.rerun(fragment_id=fragment_id)
+
+
+# =========================================================
+# 서버 실행 + 시나리오
+# =========================================================
+def start_server(app_path: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "RECO_MODE": "fast",
+        "ROADMAP_PREFETCH": "0",
+        "LLM_CACHE_PATH": "",
+        "SESSION_STORE": "memory",
+        "LLM_DEBUG_PANEL": "0",
+    })
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", app_path,
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=os.path.dirname(app_path),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.3)
+    proc.kill()
+    raise RuntimeError(f"streamlit 서버가 뜨지 않았습니다: {app_path}")
+
+
+def run_scenario(port: int, repeat: int) -> Dict[str, List[Tuple[float, int, int]]]:
+    results: Dict[str, List[Tuple[float, int, int]]] = {}
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=30) as ws:
+        session = StreamlitSession(ws)
+        # 1 -> 3페이지 (버튼으로 페이지를 바꾼 뒤 한 번 더 실행해야 새 페이지가 그려짐)
+        session.rerun()
+        session.set_string("api 키", "sk-bench")
+        session.click("시작하기")
+        results["page2_render"] = [session.rerun()]
+        session.click("추천 받기")
+        # 추천은 백그라운드 작업으로 돈다. 브라우저의 폴링(run_every) 대신 끝날 때까지 다시 실행
+        session.rerun()
+        deadline = time.time() + 60
+        while not session.find("필터 적용하기") and time.time() < deadline:
+            time.sleep(0.2)
+            session.rerun()
+
+        results["filter_submit"] = [session.click("필터 적용하기")]
+
+        _, _, options = session.find("최종 직무 선택")
+        for i in range(repeat):
+            value = options[(i + 1) % min(2, len(options))]
+            results.setdefault("select_job", []).append(session.set_string("최종 직무 선택", value))
+
+        if session.find("더 보기"):
+            results["show_more"] = [session.click("더 보기")]
+    return results
+
+
+def export_revision(rev: str, directory: str) -> str:
+    archive = subprocess.run(["git", "archive", rev], cwd=PROJECT_ROOT, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+    return os.path.join(directory, "app.py")
+
+
+def summarize(name: str, results: Dict[str, List[Tuple[float, int, int]]]):
+    for interaction, samples in results.items():
+        print(
+            f"{name:<10}{interaction:<16}{len(samples):>4}"
+            f"{statistics.mean(s[0] for s in samples) * 1000:>11.1f}"
+            f"{statistics.mean(s[1] for s in samples) / 1024:>11.1f}"
+            f"{statistics.mean(s[2] for s in samples):>8.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=None, help="비교할 git 리비전 (예: HEAD~1)")
+    parser.add_argument("--repeat", type=int, default=10, help="라디오 변경 반복 횟수")
+    parser.add_argument("--port", type=int, default=8599)
+    args = parser.parse_args()
+
+    targets = [("current", os.path.join(PROJECT_ROOT, "app.py"))]
+    tmp = None
+    if args.baseline:
+        tmp = tempfile.TemporaryDirectory()
+        targets.insert(0, (args.baseline, export_revision(args.baseline, tmp.name)))
+
+    print(f"{'app':<10}{'interaction':<16}{'n':>4}{'rerun ms':>11}{'KB recv':>11}{'msgs':>8}")
+    for name, app_path in targets:
+        proc = start_server(app_path, args.port)
+        try:
+            summarize(name, run_scenario(args.port, args.repeat))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
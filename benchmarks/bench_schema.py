@@ -0,0 +1,193 @@
+"""
+응답 스키마(json_schema) 벤치마크
+
+1) 검증기 시간: 컴파일된 스키마 검증기(json_schema.compile_schema)와
+   이전의 손으로 짠 검사(직무명만 확인 / 필터 질문 루프), (설치돼 있으면) jsonschema 패키지를
+   같은 입력으로 비교. jsonschema는 통과 여부만 보고 고치지 않는다.
+2) 실제 흐름: 목 서버가 --malformed-rate 비율로 스키마에 어긋난 JSON을 돌려줄 때
+   response_format 설정(off / json_object / json_schema)별로
+     - 단계별 검증 결과 (valid / repaired / invalid)
+     - 빠진 부분만 다시 요청한 횟수 (llm_schema_followups_total)
+     - 완전한 결과 하나당 API 요청 수, 끝내 불완전한 결과 수
+   를 보고한다. json_schema를 받은 요청은 목 서버가 어기지 않으므로(실제 API와 같음)
+   재요청이 사라지는 만큼이 strict 모드의 효과다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_schema --users 20 --malformed-rate 0.3
+    python -m benchmarks.bench_schema --only micro
+"""
+import argparse
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from benchmarks.suite import format_seconds, make_jobs, make_questions, per_call_samples
+
+MODES = ("off", "json_object", "json_schema")
+STEPS = ("recommend", "filter", "roadmap")
+
+
+# =========================================================
+# 1) 검증기 시간
+# =========================================================
+def legacy_jobs(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # 이전 generate_job_recommendations의 검사
+    return [j for j in data.get("jobs", []) if isinstance(j, dict) and bool(j.get("job_title"))]
+
+
+def legacy_questions(qs: Any) -> List[Dict[str, Any]]:
+    # 이전 clean_filter_questions
+    cleaned = []
+    for q in qs if isinstance(qs, list) else []:
+        if isinstance(q, dict) and q.get("id") and q.get("question"):
+            if q.get("type") not in ["yesno", "choice"]:
+                continue
+            if "options" not in q or not isinstance(q["options"], list):
+                continue
+            if "affects_jobs" not in q or not isinstance(q["affects_jobs"], list):
+                continue
+            cleaned.append(q)
+    return cleaned
+
+
+def run_micro(repeat: int, rounds: int):
+    from benchmarks.mock_openai_server import fake_payload
+    from pipeline import FILTER_SCHEMA, RECOMMEND_SCHEMA, ROADMAP_SCHEMA
+
+    rng = random.Random(0)
+    jobs = {"jobs": make_jobs(12)}
+    questions = make_questions(jobs["jobs"], 5, rng)
+    for i, q in enumerate(questions):
+        q["question"] = f"질문 {i}"
+    roadmap = fake_payload("roadmap", rng)
+    filters = {"questions": questions}
+
+    try:
+        import jsonschema
+    except ImportError:
+        jsonschema = None
+
+    def reference(schema: Any, data: Any) -> Any:
+        if jsonschema is None:
+            return None
+        validator = jsonschema.Draft7Validator(schema.schema)
+        return lambda: validator.is_valid(data)
+
+    cases = [
+        ("recommend (12 jobs)", lambda: legacy_jobs(jobs), lambda: RECOMMEND_SCHEMA.validate(jobs),
+         reference(RECOMMEND_SCHEMA, jobs)),
+        ("filter (5 questions)", lambda: legacy_questions(questions), lambda: FILTER_SCHEMA.validate(filters),
+         reference(FILTER_SCHEMA, filters)),
+        ("roadmap", None, lambda: ROADMAP_SCHEMA.validate(roadmap), reference(ROADMAP_SCHEMA, roadmap)),
+    ]
+
+    def timed(fn: Any) -> str:
+        return format_seconds(min(per_call_samples(fn, repeat, rounds))) if fn else "-"
+
+    print(f"{'입력':<24}{'이전 검사':>14}{'스키마 검증':>14}{'jsonschema':>14}   (호출당 최솟값)")
+    for name, legacy, schema, ref in cases:
+        print(f"{name:<24}{timed(legacy):>14}{timed(schema):>14}{timed(ref):>14}")
+
+
+# =========================================================
+# 2) 실제 흐름 (목 서버)
+# =========================================================
+def run_mode(mode: str, users: int) -> Dict[str, Dict[str, float]]:
+    import json_schema
+    from benchmarks.loadtest import sample_profile
+    from llm_metrics import llm_metrics
+    from pipeline import (
+        RECOMMEND_SCHEMA,
+        ROADMAP_SCHEMA,
+        generate_filter_questions_llm,
+        generate_job_recommendations,
+        generate_roadmap,
+    )
+
+    json_schema.RESPONSE_FORMAT = mode
+    llm_metrics.reset()
+    rng = random.Random(0)
+    incomplete = {step: 0 for step in STEPS}
+
+    for _ in range(users):
+        answers = sample_profile(rng)
+        jobs = generate_job_recommendations(answers)
+        if not RECOMMEND_SCHEMA.validate({"jobs": jobs}).ok:
+            incomplete["recommend"] += 1
+        # 번들 인덱스를 거치지 않고 LLM 질문 생성만 잰다
+        generate_filter_questions_llm(jobs or make_jobs(3))
+        title = rng.choice(jobs)["job_title"] if jobs else "데이터 분석가"
+        if not ROADMAP_SCHEMA.validate(generate_roadmap(title, answers)).ok:
+            incomplete["roadmap"] += 1
+
+    counts = llm_metrics.request_counts()
+    rows = {}
+    for step in STEPS:
+        requests = counts.get((step, "api"), 0)
+        rows[step] = {
+            "requests": requests,
+            "followups": llm_metrics.counter_total("llm_schema_followups_total", step=step),
+            "incomplete": incomplete[step],
+            "per_result": requests / max(users - incomplete[step], 1),
+            **{
+                outcome: llm_metrics.counter_total("llm_schema_results_total", step=step, outcome=outcome)
+                for outcome in ("valid", "repaired", "invalid")
+            },
+        }
+    return rows
+
+
+def run_live(users: int, malformed_rate: float, latency: float, port: int):
+    from benchmarks.mock_openai_server import MockConfig, serve
+
+    config = MockConfig(latency=latency, jitter=0.0, seed=0, malformed_rate=malformed_rate)
+    server = serve("127.0.0.1", port, config)
+    try:
+        print(f"\n사용자 {users}명, 스키마 위반 응답 비율 {malformed_rate:.0%}")
+        print(f"{'모드':<13}{'단계':<11}{'요청':>6}{'결과당':>8}{'valid':>7}{'repaired':>10}{'invalid':>9}"
+              f"{'재요청':>8}{'불완전':>8}{'시간':>9}")
+        for mode in MODES:
+            t0 = time.perf_counter()
+            rows = run_mode(mode, users)
+            elapsed = time.perf_counter() - t0
+            for i, (step, r) in enumerate(rows.items()):
+                print(
+                    f"{mode if i == 0 else '':<13}{step:<11}{r['requests']:>6}{r['per_result']:>8.2f}"
+                    f"{r['valid']:>7.0f}{r['repaired']:>10.0f}{r['invalid']:>9.0f}"
+                    f"{r['followups']:>8.0f}{r['incomplete']:>8}"
+                    + (f"{elapsed:>8.1f}s" if i == 0 else "")
+                )
+        print(f"\n목 서버: {config.counts}")
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", choices=["micro", "live"], default=None)
+    parser.add_argument("--repeat", type=int, default=2000, help="micro: 라운드당 호출 수")
+    parser.add_argument("--rounds", type=int, default=7, help="micro: 라운드 수")
+    parser.add_argument("--users", type=int, default=20, help="live: 추천 -> 필터 질문 -> 로드맵을 진행할 사용자 수")
+    parser.add_argument("--malformed-rate", type=float, default=0.3, help="live: 스키마에 어긋난 응답 비율")
+    parser.add_argument("--latency", type=float, default=0.05, help="live: 목 서버 고정 지연(초)")
+    parser.add_argument("--port", type=int, default=8793)
+    args = parser.parse_args()
+
+    # pipeline/client_pool 을 import 하기 전에 설정해야 반영된다 (캐시는 끄고 매번 API까지)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ["LLM_CACHE_DISABLED"] = "1"
+    os.environ["LLM_CACHE_PATH"] = ""
+    os.environ["LLM_METRICS_PATH"] = ""
+    os.environ["LLM_KEY_RPM"] = "0"
+    os.environ["LLM_KEY_TPM"] = "0"
+
+    if args.only in (None, "micro"):
+        run_micro(args.repeat, args.rounds)
+    if args.only in (None, "live"):
+        run_live(args.users, args.malformed_rate, args.latency, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+로컬 추천 엔진(job_scoring) 벤치마크
+
+답변 인코딩, 단일 사용자 점수 계산(행렬-벡터 곱), 상위 N개 카드 생성,
+여러 사용자 일괄 점수 계산(행렬-행렬 곱)의 호출당 시간을 잰다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_scoring --profiles 1000 --repeat 2000
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from benchmarks.loadtest import sample_profile
+from job_scoring import encode_answers, get_job_index, recommend_jobs
+
+
+def per_call(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=1000, help="일괄 계산에 쓸 가상 사용자 수")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    profiles = [sample_profile(rng) for _ in range(args.profiles)]
+    answers = profiles[0]
+
+    t0 = time.perf_counter()
+    index = get_job_index()
+    load_t = time.perf_counter() - t0
+    u, edu = encode_answers(answers)
+
+    encoded = [encode_answers(p) for p in profiles]
+    users = np.stack([e[0] for e in encoded])
+    edus = np.array([e[1] for e in encoded])
+
+    print(f"catalog: {len(index.titles)} jobs x {index.matrix.shape[1]} features (load {load_t * 1000:.2f} ms)")
+    print(f"{'step':<28}{'per call':>14}")
+    rows = [
+        ("encode_answers", per_call(lambda: encode_answers(answers), args.repeat), 1e6, "us"),
+        ("score (1 user)", per_call(lambda: index.score(u, edu), args.repeat), 1e6, "us"),
+        ("recommend_jobs (top 12)", per_call(lambda: recommend_jobs(answers), args.repeat), 1e6, "us"),
+        (f"score_many ({args.profiles} users)", per_call(lambda: index.score_many(users, edus), max(1, args.repeat // 20)), 1e3, "ms"),
+    ]
+    for name, t, scale, unit in rows:
+        print(f"{name:<28}{t * scale:>11.1f} {unit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+콜드 스타트 벤치마크: 새 프로세스에서 첫 화면까지 / 첫 LLM 단계까지의 시간
+
+샘플마다 새 파이썬 프로세스를 띄워 (오토스케일로 막 뜬 레플리카와 같은 상태)
+  spawn_to_page1   프로세스 생성 -> 1페이지 첫 렌더링 완료 (인터프리터 + streamlit + app import)
+  page1_load       AppTest 첫 실행 (app.py import + 첫 렌더링)
+  page1_start      "시작하기"
+  page2_recommend  --think 초 뒤 "추천 받기" -> 3페이지 (pipeline/SDK를 처음 쓰는 단계)
+를 잰다. OpenAI 대신 내장 목 서버(--latency)를 쓴다.
+
+현재 작업 트리는 예열(APP_WARMUP) 끔/켬 두 가지로, --baseline을 주면 그 git 리비전도 함께 잰다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_startup --samples 5 --think 3
+    python -m benchmarks.bench_startup --baseline HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS = ("spawn_to_page1", "page1_load", "page1_start", "page2_recommend")
+
+
+def child(app_dir: str, spawned_at: float, think: float):
+    """
+    워커 프로세스: app_dir의 app.py를 AppTest로 실행하며 단계별 시간을 JSON 한 줄로 출력.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(app_dir, "app.py"), default_timeout=300)
+    result: Dict[str, float] = {}
+
+    def click(label: str):
+        next(b for b in at.button if b.label.startswith(label)).click().run()
+        at.run()
+
+    t0 = time.perf_counter()
+    at.run()
+    result["page1_load"] = time.perf_counter() - t0
+    result["spawn_to_page1"] = time.time() - spawned_at
+
+    time.sleep(think)
+    at.text_input[0].set_value("sk-bench").run()
+    t0 = time.perf_counter()
+    click("시작하기")
+    result["page1_start"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    click("추천 받기")
+    while at.session_state.page != 3:
+        if at.exception or at.error:
+            raise RuntimeError("추천 받기 실패")
+        time.sleep(0.05)
+        at.run()
+    result["page2_recommend"] = time.perf_counter() - t0
+    print(json.dumps(result))
+
+
+def run_sample(app_dir: str, think: float, port: int, warmup: bool) -> Optional[Dict[str, float]]:
+    env = dict(
+        os.environ,
+        PYTHONPATH=app_dir,
+        OPENAI_BASE_URL=f"http://127.0.0.1:{port}/v1",
+        OPENAI_API_KEY="sk-bench",
+        APP_WARMUP="1" if warmup else "0",
+        LLM_CACHE_DISABLED="1",
+        LLM_CACHE_PATH="",
+        SESSION_STORE="memory",
+        PROFILE_LOG_PATH="",
+        ROADMAP_PREFETCH="0",
+    )
+    spawned_at = time.time()
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", app_dir, str(spawned_at), str(think)],
+        cwd=app_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        print(proc.stderr[-2000:], file=sys.stderr)
+        return None
+    return json.loads(lines[-1])
+
+
+def export_revision(rev: str, directory: str) -> str:
+    archive = subprocess.run(["git", "archive", rev], cwd=PROJECT_ROOT, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+    return directory
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], float(sys.argv[3]), float(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5, help="대상마다 띄울 새 프로세스 수")
+    parser.add_argument("--think", type=float, default=3.0, help="1페이지를 보고 시작하기를 누르기까지(초)")
+    parser.add_argument("--latency", type=float, default=0.1, help="목 서버 고정 지연(초)")
+    parser.add_argument("--baseline", default=None, help="비교할 git 리비전 (예: HEAD~1)")
+    parser.add_argument("--port", type=int, default=8792)
+    args = parser.parse_args()
+
+    sys.path.insert(0, PROJECT_ROOT)
+    from benchmarks.mock_openai_server import MockConfig, serve
+
+    targets = [("warmup=off", PROJECT_ROOT, False), ("warmup=on", PROJECT_ROOT, True)]
+    tmp = None
+    if args.baseline:
+        tmp = tempfile.TemporaryDirectory()
+        targets.insert(0, (args.baseline, export_revision(args.baseline, tmp.name), False))
+
+    server = serve("127.0.0.1", args.port, MockConfig(latency=args.latency, jitter=0.0, seed=0))
+    try:
+        print(f"{'target':<16}{'n':>4}" + "".join(f"{m:>18}" for m in METRICS) + "   (median s)")
+        for name, app_dir, warmup in targets:
+            samples: List[Dict[str, float]] = []
+            for _ in range(args.samples):
+                r = run_sample(app_dir, args.think, args.port, warmup)
+                if r is not None:
+                    samples.append(r)
+            if not samples:
+                print(f"{name:<16}   실패")
+                continue
+            print(
+                f"{name:<16}{len(samples):>4}"
+                + "".join(f"{statistics.median(s[m] for s in samples):>18.3f}" for m in METRICS)
+            )
+    finally:
+        server.shutdown()
+        if tmp is not None:
+            tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
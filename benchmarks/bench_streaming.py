@@ -0,0 +1,88 @@
+"""
+스트리밍 vs 기존(블로킹) 경로 비교: 첫 카드까지 걸린 시간 / 전체 시간
+
+사용법 (프로젝트 루트에서):
+    OPENAI_API_KEY=sk-... python -m benchmarks.bench_streaming --runs 3
+
+OPENAI_BASE_URL 을 지정하면 OpenAI 호환 서버(로컬 목 서버 등)로 보낸다.
+캐시는 측정을 왜곡하므로 자동으로 끈다.
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ["LLM_CACHE_DISABLED"] = "1"
+
+from pipeline import (  # noqa: E402
+    generate_job_recommendations,
+    generate_job_recommendations_stream,
+    generate_roadmap,
+    generate_roadmap_stream,
+)
+
+SAMPLE_ANSWERS = {
+    "money": "평균 정도면 만족",
+    "location": "수도권",
+    "job_type": "직장인",
+    "commute": "1시간",
+    "culture": "개인주의의 차가운 분위기",
+    "gender_ratio": "상관없음",
+    "health": ["없음"],
+    "must_have": "칼퇴 등 개인 시간 확보",
+    "cant_do": ["체육"],
+    "preferred_action": "~를 연구하기",
+    "education": "대학 졸업",
+    "major": "경영학",
+}
+
+
+def measure_blocking(fn) -> dict:
+    t0 = time.perf_counter()
+    fn()
+    total = time.perf_counter() - t0
+    # 블로킹 경로는 전체가 끝나야 첫 카드가 보인다.
+    return {"first": total, "total": total}
+
+
+def measure_stream(gen, is_card=lambda event: True) -> dict:
+    t0 = time.perf_counter()
+    first = None
+    for event in gen:
+        if first is None and is_card(event):
+            first = time.perf_counter() - t0
+    total = time.perf_counter() - t0
+    return {"first": first if first is not None else total, "total": total}
+
+
+def summarize(name: str, rows: list):
+    firsts = [r["first"] for r in rows]
+    totals = [r["total"] for r in rows]
+    print(
+        f"{name:<22} first card p50={statistics.median(firsts):6.2f}s"
+        f"  total p50={statistics.median(totals):6.2f}s  (n={len(rows)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--job", default="마케터")
+    args = parser.parse_args()
+
+    results = {"reco/blocking": [], "reco/stream": [], "roadmap/blocking": [], "roadmap/stream": []}
+    for _ in range(args.runs):
+        results["reco/blocking"].append(measure_blocking(lambda: generate_job_recommendations(SAMPLE_ANSWERS)))
+        results["reco/stream"].append(measure_stream(generate_job_recommendations_stream(SAMPLE_ANSWERS)))
+        results["roadmap/blocking"].append(measure_blocking(lambda: generate_roadmap(args.job, SAMPLE_ANSWERS)))
+        results["roadmap/stream"].append(measure_stream(
+            generate_roadmap_stream(args.job, SAMPLE_ANSWERS),
+            is_card=lambda event: bool(event[0]) and event[0][0] == "timeline",
+        ))
+
+    for name, rows in results.items():
+        summarize(name, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+다중 세션 부하 테스트 드라이버
+
+가상 사용자 여러 명이 동시에 1 -> 4페이지를 진행하는 상황을 흉내 내고,
+단계별(추천 / 필터 질문 / 필터 적용 / 로드맵) 지연의 p50/p95/p99를 보고한다.
+--base-url 을 주지 않으면 로컬 목 서버를 같은 프로세스에 띄운다.
+
+드라이버:
+  pipeline : pipeline.py 함수를 직접 호출 (가볍고 수백 명도 가능)
+  app      : streamlit.testing AppTest로 app.py를 실제로 실행하며 버튼 클릭
+             (AppTest는 프로세스당 한 번만 돌 수 있어 사용자마다 새 워커 프로세스를 씀)
+  jobs     : 앱처럼 추천/로드맵을 백그라운드 작업 실행기(background_jobs)에 제출하고 기다림
+             (실행 자리/대기열 상한/거절 효과 측정, 거절된 사용자는 err로 집계)
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.loadtest --users 200 --concurrency 200 --latency 1.0 --rate-429 0.02
+    python -m benchmarks.loadtest --driver app --users 20
+
+스케줄러(llm_scheduler) 효과 비교 — 목 서버에 키당 분당 한도를 걸고 켜고/끈 채로:
+    python -m benchmarks.loadtest --users 60 --ramp 20 --rpm 120 --latency 0.5 --scheduler off --manual-retries 5
+    python -m benchmarks.loadtest --users 60 --ramp 20 --rpm 120 --latency 0.5 --scheduler on --key-rpm 120
+
+대기열 상한(부하 차단) 비교 — 처리 능력보다 빨리 들어오는 사용자에서 받은 사용자의 p95:
+    python -m benchmarks.loadtest --driver jobs --users 300 --concurrency 300 --ramp 30 --latency 1.0 --job-workers 8 --job-queue-max 0
+    python -m benchmarks.loadtest --driver jobs --users 300 --concurrency 300 --ramp 30 --latency 1.0 --job-workers 8 --job-queue-max 16
+
+헤지 효과 비교 — 요청 5%만 8초 늦게 오는 꼬리 지연에서 roadmap p99:
+    python -m benchmarks.loadtest --users 200 --concurrency 20 --latency 0.5 --slow-rate 0.05 --slow-latency 8 --hedge ""
+    python -m benchmarks.loadtest --users 200 --concurrency 20 --latency 0.5 --slow-rate 0.05 --slow-latency 8 --hedge roadmap
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.mock_openai_server import add_config_args, config_from_args, serve
+
+
+# 프로필 샘플링용 선택지 (2페이지 질문과 동일)
+ANSWER_CHOICES: Dict[str, List[Any]] = {
+    "money": ["상관없음", "평균 정도면 만족", "많이 벌고 싶음", "최대한 많이 벌고 싶음"],
+    "location": ["서울", "수도권", "지방 광역시", "세종", "농어촌"],
+    "job_type": ["직장인", "프리랜서", "전문직"],
+    "commute": ["30분", "1시간", "1시간 반", "2시간", "2시간 반"],
+    "culture": [
+        "명확하지 않은 지시사항+창의적 분위기",
+        "상명하복의 권위적 분위기",
+        "처음엔 텃세가 있을 수 있으나 친해지면 단단한 결속",
+        "개인주의의 차가운 분위기",
+        "회식, 술자리 등 뭐든지 함께 분위기",
+    ],
+    "gender_ratio": ["남 다수", "여 다수", "반반", "상관없음"],
+    "health": [["없음"], ["눈의 피로"], ["허리, 목"], ["스트레스 취약"]],
+    "must_have": [
+        "따박따박 나오는 월급",
+        "세상의 인정",
+        "몸 상하지 않는 것",
+        "칼퇴 등 개인 시간 확보",
+        "일의 재미 및 자아실현",
+        "안정된 고용",
+    ],
+    "cant_do": [[], ["체육"], ["수학"], ["외국어", "미술"]],
+    "preferred_action": ["~를 가르치기", "~를 고치기", "~를 지적하기", "~를 연구하기"],
+    "education": ["고졸 이하", "대학 재학", "대학 졸업", "대학원 재학/졸업"],
+    "major": ["경영학", "컴퓨터공학", "국어국문학", "시각디자인", "간호학", ""],
+}
+
+
+def sample_profile(rng: random.Random) -> Dict[str, Any]:
+    return {k: rng.choice(v) for k, v in ANSWER_CHOICES.items()}
+
+
+class StepTimer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def merge(self, samples: Dict[str, List[float]], errors: Dict[str, int]):
+        with self.lock:
+            for step, values in samples.items():
+                self.samples.setdefault(step, []).extend(values)
+            for step, n in errors.items():
+                self.errors[step] = self.errors.get(step, 0) + n
+
+    def run(self, step: str, fn: Callable[[], Any]) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return fn()
+        except Exception:
+            with self.lock:
+                self.errors[step] = self.errors.get(step, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self.lock:
+                self.samples.setdefault(step, []).append(elapsed)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+# =========================================================
+# 드라이버
+# =========================================================
+def run_pipeline_user(timer: StepTimer, rng: random.Random, think: float, retries: int = 0, retry_delay: float = 2.0):
+    from pipeline import apply_filtering, generate_filter_questions, generate_job_recommendations, generate_roadmap
+
+    def step(name: str, fn: Callable[[], Any]) -> Any:
+        # 오류가 나면 사용자가 잠시 뒤 버튼을 다시 누르는 것을 흉내 (--manual-retries)
+        for i in range(retries + 1):
+            try:
+                return timer.run(name, fn)
+            except Exception:
+                if i == retries:
+                    raise
+                time.sleep(retry_delay)
+
+    answers = sample_profile(rng)
+    jobs = step("recommend", lambda: generate_job_recommendations(answers))
+    time.sleep(think)
+    questions = step("filter_questions", lambda: generate_filter_questions(jobs))
+    time.sleep(think)
+    filter_answers = {q["id"]: rng.choice(q["options"]) for q in questions}
+    final = step("apply_filtering", lambda: apply_filtering(jobs, questions, filter_answers))
+    time.sleep(think)
+    if final:
+        step("roadmap", lambda: generate_roadmap(rng.choice(final)["job_title"], answers))
+
+
+def run_jobs_user(timer: StepTimer, rng: random.Random, think: float):
+    from background_jobs import job_runner
+    from pipeline import apply_filtering, generate_filter_questions, generate_jobs, generate_roadmap
+
+    session_id = f"load-{rng.random()}"
+
+    def step(name: str, fn: Callable[[Any], Any]) -> Any:
+        # 제출 -> 끝날 때까지 (대기열 시간 포함). 거절/실패는 오류로 세고 사용자는 멈춘다
+        t0 = time.perf_counter()
+        job = job_runner.submit(name, name, session_id, fn)
+        job.wait()
+        if job.status != "done":
+            with timer.lock:
+                timer.errors[name] = timer.errors.get(name, 0) + 1
+            raise RuntimeError(f"{name}: {job.status}")
+        with timer.lock:
+            timer.samples.setdefault(name, []).append(time.perf_counter() - t0)
+        return job.result
+
+    def recommend(job: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        jobs = generate_jobs(answers, "llm")
+        return jobs, generate_filter_questions(jobs)
+
+    answers = sample_profile(rng)
+    jobs, questions = step("recommend", recommend)
+    time.sleep(think)
+    final = apply_filtering(jobs, questions, {q["id"]: rng.choice(q["options"]) for q in questions})
+    time.sleep(think)
+    if final:
+        step("roadmap", lambda job: generate_roadmap(rng.choice(final)["job_title"], answers))
+
+
+def run_app_user(timer: StepTimer, rng: random.Random, think: float):
+    from streamlit.testing.v1 import AppTest
+
+    app_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+    at = AppTest.from_file(app_path, default_timeout=300)
+
+    def click(label: str):
+        next(b for b in at.button if b.label.startswith(label)).click().run()
+        # go()로 페이지가 바뀐 뒤 화면을 다시 그린다
+        at.run()
+
+    def click_and_wait(label: str, done: Any):
+        # 추천/로드맵은 백그라운드 작업으로 돈다. 브라우저의 폴링 대신 끝날 때까지 다시 실행
+        click(label)
+        while not done():
+            if at.exception or at.error or at.warning:
+                raise RuntimeError(f"{label}: 작업 실패")
+            time.sleep(0.2)
+            at.run()
+
+    timer.run("page1_load", at.run)
+    at.text_input[0].set_value("sk-loadtest").run()
+    timer.run("page1_start", lambda: click("시작하기"))
+    time.sleep(think)
+
+    answers = sample_profile(rng)
+    for r in at.radio:
+        if r.label in answers and answers[r.label] in r.options:
+            r.set_value(answers[r.label])
+    timer.run("page2_recommend", lambda: click_and_wait("추천 받기", lambda: at.session_state.page == 3))
+    time.sleep(think)
+
+    timer.run("page3_filter", lambda: click("필터 적용하기"))
+    time.sleep(think)
+    timer.run("page3_next", lambda: click("다음"))
+
+    if not at.session_state.roadmap:
+        timer.run("page4_roadmap", lambda: click_and_wait("로드맵 생성하기", lambda: at.session_state.roadmap))
+
+
+def run_one_user(
+    driver: str, seed: float, think: float, delay: float, retries: int = 0, retry_delay: float = 2.0
+) -> Tuple[Dict[str, List[float]], Dict[str, int], bool]:
+    """
+    사용자 한 명을 끝까지 진행하고 (단계별 시간, 단계별 오류 수, 성공 여부)를 반환.
+    app 드라이버에서는 워커 프로세스 안에서 실행된다.
+    """
+    time.sleep(delay)
+    timer = StepTimer()
+    try:
+        if driver == "pipeline":
+            run_pipeline_user(timer, random.Random(seed), think, retries, retry_delay)
+        elif driver == "jobs":
+            run_jobs_user(timer, random.Random(seed), think)
+        else:
+            run_app_user(timer, random.Random(seed), think)
+        ok = True
+    except Exception:
+        ok = False
+    return timer.samples, timer.errors, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--driver", choices=["pipeline", "jobs", "app"], default="pipeline")
+    parser.add_argument("--users", type=int, default=100, help="가상 사용자 수")
+    parser.add_argument("--concurrency", type=int, default=100, help="동시에 진행하는 사용자 수")
+    parser.add_argument("--ramp", type=float, default=0.0, help="전체 사용자 시작을 이 시간(초)에 걸쳐 분산")
+    parser.add_argument("--think", type=float, default=0.0, help="단계 사이 사용자 생각 시간(초)")
+    parser.add_argument("--base-url", default=None, help="이미 떠 있는 OpenAI 호환 서버 (없으면 목 서버 내장 실행)")
+    parser.add_argument("--port", type=int, default=8765, help="내장 목 서버 포트")
+    parser.add_argument("--cache", action="store_true", help="응답 캐시 사용 (기본: 끔)")
+    parser.add_argument("--scheduler", choices=["on", "off"], default="on", help="off: 재시도/속도 조절 없이 한 번만 호출")
+    parser.add_argument("--hedge", default=None, help="헤지할 단계 목록 (LLM_HEDGE_STEPS, 예: roadmap / 빈 문자열이면 끔)")
+    parser.add_argument("--roadmap-fanout", choices=["on", "off"], default=None, help="로드맵 구간별 동시 생성 (ROADMAP_FANOUT)")
+    parser.add_argument("--manual-retries", type=int, default=0, help="pipeline 드라이버: 단계 실패 시 사용자가 다시 누르는 횟수")
+    parser.add_argument("--retry-delay", type=float, default=2.0, help="사용자가 다시 누르기까지 시간(초)")
+    parser.add_argument("--key-rpm", type=float, default=0, help="스케줄러의 키당 분당 요청 수 (LLM_KEY_RPM, 0: 제한 없음)")
+    parser.add_argument("--key-tpm", type=float, default=0, help="스케줄러의 키당 분당 토큰 수 (LLM_KEY_TPM, 0: 제한 없음)")
+    parser.add_argument("--job-workers", type=int, default=None, help="jobs 드라이버: 동시 실행 작업 수 (BACKGROUND_JOB_WORKERS)")
+    parser.add_argument("--job-queue-max", type=int, default=None, help="jobs 드라이버: 대기열 상한, 0이면 제한 없음 (BACKGROUND_JOB_QUEUE_MAX)")
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url is None:
+        server = serve("127.0.0.1", args.port, config_from_args(args))
+        args.base_url = f"http://127.0.0.1:{args.port}/v1"
+
+    # pipeline/client_pool 을 import 하기 전에 설정해야 반영된다.
+    os.environ["OPENAI_BASE_URL"] = args.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+    os.environ["LLM_CACHE_PATH"] = ""
+    os.environ["SESSION_STORE"] = "memory"
+    if not args.cache:
+        os.environ["LLM_CACHE_DISABLED"] = "1"
+    if args.scheduler == "off":
+        os.environ["LLM_SCHEDULER_DISABLED"] = "1"
+    if args.hedge is not None:
+        os.environ["LLM_HEDGE_STEPS"] = args.hedge
+    if args.roadmap_fanout is not None:
+        os.environ["ROADMAP_FANOUT"] = "1" if args.roadmap_fanout == "on" else "0"
+    # 목 서버에는 토큰 한도가 없으므로 기본은 스케줄러의 선제 속도 조절도 끈다 (429 대응만)
+    os.environ["LLM_KEY_RPM"] = str(args.key_rpm)
+    os.environ["LLM_KEY_TPM"] = str(args.key_tpm)
+    if args.job_workers is not None:
+        os.environ["BACKGROUND_JOB_WORKERS"] = str(args.job_workers)
+    if args.job_queue_max is not None:
+        os.environ["BACKGROUND_JOB_QUEUE_MAX"] = str(args.job_queue_max)
+
+    timer = StepTimer()
+    failed = 0
+    master = random.Random(args.seed)
+    if args.driver in ("pipeline", "jobs"):
+        pool = ThreadPoolExecutor(max_workers=args.concurrency)
+    else:
+        # AppTest 런타임은 프로세스 전역이라 사용자마다 새 프로세스에서 실행
+        pool = ProcessPoolExecutor(
+            max_workers=args.concurrency,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=1,
+        )
+
+    t0 = time.perf_counter()
+    with pool:
+        futures = [
+            pool.submit(
+                run_one_user, args.driver, master.random(), args.think, args.ramp * i / max(1, args.users),
+                args.manual_retries, args.retry_delay,
+            )
+            for i in range(args.users)
+        ]
+        for f in futures:
+            samples, errors, ok = f.result()
+            timer.merge(samples, errors)
+            if not ok:
+                failed += 1
+    wall = time.perf_counter() - t0
+
+    print(
+        f"driver={args.driver} users={args.users} concurrency={args.concurrency} scheduler={args.scheduler} "
+        f"wall={wall:.1f}s completed={args.users - failed}/{args.users}"
+    )
+    print(f"{'step':<18}{'n':>6}{'err':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    for step, values in timer.samples.items():
+        print(
+            f"{step:<18}{len(values):>6}{timer.errors.get(step, 0):>6}"
+            f"{percentile(values, 50):>9.3f}{percentile(values, 95):>9.3f}"
+            f"{percentile(values, 99):>9.3f}{statistics.mean(values):>9.3f}"
+        )
+    if args.driver == "jobs":
+        from background_jobs import job_runner
+
+        print(f"job runner: {job_runner.stats()}")
+    if server is not None:
+        counts = server.RequestHandlerClass.config.counts
+        print(f"mock server: {counts}")
+        print(f"upstream goodput: {counts['ok'] / max(counts['requests'], 1) * 100:.1f}% of requests succeeded")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
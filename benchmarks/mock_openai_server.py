@@ -0,0 +1,461 @@
+"""
+로컬 OpenAI 호환 목(mock) 서버 — 실제 과금 없이 부하 테스트용
+
+chat.completions API(스트리밍 포함)를 흉내 내고, 프롬프트 종류(직무 추천 / why_fit /
+필터 질문 / 로드맵)를 알아보고 스키마에 맞는 JSON을 돌려준다.
+지연, 지터, 꼬리 지연, 오류율, 429 비율, API 키별 분당 요청 한도(--rpm)를 설정할 수 있다.
+--malformed-rate를 주면 그 비율만큼 스키마에 어긋난 JSON(필드 누락/배열 부족/잘못된 타입)을 돌려준다.
+단, 요청에 response_format json_schema가 있으면 실제 API처럼 항상 스키마대로 답한다
+(--no-response-format이면 json_schema 요청을 400으로 거절: 지원하지 않는 모델 흉내).
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.mock_openai_server --port 8000 --latency 1.5 --jitter 0.5 --rate-429 0.05
+    python -m benchmarks.mock_openai_server --port 8000 --rpm 60      # 실제 한도처럼 키당 분당 60건
+    python -m benchmarks.mock_openai_server --port 8000 --malformed-rate 0.3 --no-response-format
+    OPENAI_BASE_URL=http://127.0.0.1:8000/v1 streamlit run app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+# =========================================================
+# 스키마에 맞는 가짜 응답
+# =========================================================
+SAMPLE_JOBS = [
+    ("콘텐츠 마케터", "마케팅", "학력 무관, 포트폴리오"),
+    ("서비스 기획자", "기획", "학사 이상 우대"),
+    ("초등학교 교사", "교육", "교육대학 졸업 및 교원자격증"),
+    ("UX 디자이너", "디자인", "디자인 전공 또는 포트폴리오"),
+    ("백엔드 개발자", "개발", "컴퓨터공학 전공 우대"),
+    ("9급 공무원", "공공", "공무원 시험 합격"),
+    ("약사", "전문직", "약학대학 졸업 및 약사 면허"),
+    ("데이터 분석가", "개발", "통계/컴퓨터 관련 전공 우대"),
+    ("영상 편집자", "콘텐츠", "툴 활용 능력"),
+    ("HR 담당자", "경영지원", "학사 이상"),
+    ("의사", "전문직", "의과대학 졸업 및 의사 면허"),
+    ("영업 관리", "영업", "학력 무관"),
+]
+
+FILTER_QUESTIONS = [
+    {
+        "id": "medical_school",
+        "question": "의대 졸업(또는 재학) 여부가 있나요?",
+        "type": "yesno",
+        "options": ["예", "아니오"],
+        "affects_jobs": ["의사"],
+    },
+    {
+        "id": "pharmacy_school",
+        "question": "약학대학 졸업(또는 재학) 여부가 있나요?",
+        "type": "yesno",
+        "options": ["예", "아니오"],
+        "affects_jobs": ["약사"],
+    },
+    {
+        "id": "teacher_license",
+        "question": "교원자격증이 있거나 취득 예정인가요?",
+        "type": "yesno",
+        "options": ["예", "아니오"],
+        "affects_jobs": ["초등학교 교사"],
+    },
+]
+
+
+def classify_prompt(messages: List[Dict[str, Any]]) -> str:
+    text = "\n".join(str(m.get("content", "")) for m in messages)
+    if "로드맵" in text:
+        return "roadmap"
+    if "설명만 쓴다" in text:
+        return "why_fit"
+    if "필터링 질문" in text:
+        return "filter"
+    return "recommend"
+
+
+def fake_payload(kind: str, rng: random.Random, text: str = "") -> Dict[str, Any]:
+    if kind == "why_fit":
+        # "추천 직무: [...]" 줄에서 직무명 목록을 읽는다
+        titles: List[str] = []
+        for line in text.splitlines():
+            if line.startswith("추천 직무:"):
+                try:
+                    titles = json.loads(line.split(":", 1)[1])
+                except ValueError:
+                    pass
+        return {"why_fit": {t: f"입력한 성향을 볼 때 {t} 직무가 잘 맞을 수 있습니다." for t in titles}}
+    if kind == "filter":
+        return {"questions": FILTER_QUESTIONS}
+    if kind == "roadmap":
+        periods = ["지금~3개월", "3~12개월", "1~2년"]
+        # 구간별 동시 생성(ROADMAP_FANOUT)의 부분 요청
+        if "이번 부분: 로드맵 전체 요약" in text:
+            return {
+                "headline": "예비 직무인의 이제뭐하지",
+                "disclaimer": "이 로드맵은 예시이며 개인 상황에 따라 달라질 수 있습니다.",
+                "recommended_resources": ["워크넷 직업정보", "관련 온라인 강의", "현직자 인터뷰"],
+            }
+        for p in periods:
+            if f'이번 부분: "{p}" 구간' in text:
+                return {"milestones": [f"{p} 할 일 {i + 1}" for i in range(rng.randint(4, 6))]}
+        return {
+            "headline": "예비 직무인의 이제뭐하지",
+            "disclaimer": "이 로드맵은 예시이며 개인 상황에 따라 달라질 수 있습니다.",
+            "timeline": [
+                {"period": p, "milestones": [f"{p} 할 일 {i + 1}" for i in range(rng.randint(4, 6))]}
+                for p in periods
+            ],
+            "recommended_resources": ["워크넷 직업정보", "관련 온라인 강의", "현직자 인터뷰"],
+        }
+    # 보충 요청("이미 추천한 직무: [...]")이면 그 직무는 빼고 고른다
+    have: List[str] = []
+    for line in text.splitlines():
+        if line.startswith("이미 추천한 직무"):
+            try:
+                have = json.loads(line.split(":", 1)[1])
+            except ValueError:
+                pass
+    pool = [j for j in SAMPLE_JOBS if j[0] not in have]
+    jobs = rng.sample(pool, k=min(len(pool), rng.randint(10, 12)))
+    return {
+        "jobs": [
+            {
+                "job_title": title,
+                "category": category,
+                "why_fit": f"입력한 성향과 조건을 볼 때 {title} 직무가 현실적으로 잘 맞을 수 있습니다.",
+                "requirements_hint": hint,
+            }
+            for title, category, hint in jobs
+        ]
+    }
+
+
+def corrupt_payload(kind: str, payload: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """
+    JSON 문법은 맞지만 스키마에 어긋난 응답 (JSON 모드만 켰을 때 실제로 나오는 유형).
+    """
+    roll = rng.random()
+    if kind == "recommend":
+        jobs = payload["jobs"]
+        if roll < 0.5:
+            # 몇 개만 쓰다 만 경우
+            return {"jobs": jobs[:rng.randint(1, 3)]}
+        # 일부 원소의 직무명이 빠지거나 필드 타입이 틀림
+        for j in jobs[::3]:
+            j.pop("job_title")
+        jobs[1]["why_fit"] = 1
+        return {"jobs": jobs, "note": "extra"}
+    if kind == "roadmap":
+        if "timeline" in payload:
+            if roll < 0.5:
+                payload["timeline"] = payload["timeline"][:rng.randint(1, 2)]
+            else:
+                payload.pop("recommended_resources")
+                payload["timeline"][0]["period"] = " 지금 ~ 3개월 "
+        elif "milestones" in payload:
+            payload["milestones"] = payload["milestones"][0]
+        else:
+            payload.pop("disclaimer")
+        return payload
+    if kind == "filter":
+        return {"questions": [dict(q, type="boolean") if i == 0 else q for i, q in enumerate(payload["questions"])]}
+    return {"why_fit": {t: (len(v) if i % 2 else v) for i, (t, v) in enumerate(payload["why_fit"].items())}}
+
+
+# =========================================================
+# 서버
+# =========================================================
+class MockConfig:
+    def __init__(
+        self,
+        latency: float = 1.0,
+        jitter: float = 0.3,
+        error_rate: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after: float = 1.0,
+        chunk_chars: int = 8,
+        chunk_delay: float = 0.01,
+        seed: Optional[int] = None,
+        rpm: int = 0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 10.0,
+        token_latency: float = 0.0,
+        malformed_rate: float = 0.0,
+        response_format: bool = True,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        self.rpm = rpm
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.token_latency = token_latency
+        self.malformed_rate = malformed_rate
+        self.response_format = response_format
+        self.windows: Dict[str, Deque[float]] = {}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+    def bump(self, name: str):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def over_limit(self, api_key: str) -> Optional[float]:
+        """
+        키별 최근 60초 요청 수가 rpm을 넘으면 가장 오래된 요청이 창을 벗어날 때까지 남은 초.
+        한도에 걸린 요청은 세지 않는다 (OpenAI와 같은 방식).
+        """
+        if self.rpm <= 0:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.setdefault(api_key, deque())
+            while window and now - window[0] >= 60.0:
+                window.popleft()
+            if len(window) >= self.rpm:
+                return 60.0 - (now - window[0])
+            window.append(now)
+            return None
+
+    def draw(self) -> float:
+        with self.lock:
+            return self.rng.random()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: MockConfig = MockConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with self.config.lock:
+                self._send_json(200, dict(self.config.counts))
+            return
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        try:
+            self._handle_post()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 응답 도중 연결을 닫음 (헤지에서 진 요청, 페이지 이동 등)
+            self.config.bump("client_closed")
+            self.close_connection = True
+
+    def _handle_post(self):
+        cfg = self.config
+        length = int(self.headers.get("content-length", 0))
+        req = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        response_format = (req.get("response_format") or {}).get("type")
+        if response_format == "json_schema" and not cfg.response_format:
+            cfg.bump("requests")
+            cfg.bump("format_rejected")
+            self._send_json(400, {"error": {
+                "message": "Invalid parameter: 'response_format' of type 'json_schema' is not supported with this model.",
+                "type": "invalid_request_error",
+                "param": "response_format",
+            }})
+            return
+
+        cfg.bump("requests")
+        wait = cfg.over_limit(self.headers.get("authorization", ""))
+        if wait is not None:
+            cfg.bump("rate_limited")
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached for requests (mock rpm)", "type": "requests"}},
+                headers={"retry-after": f"{wait:.2f}", "retry-after-ms": str(int(wait * 1000))},
+            )
+            return
+        roll = cfg.draw()
+        if roll < cfg.rate_429:
+            cfg.bump("rate_limited")
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+                headers={"retry-after": str(cfg.retry_after)},
+            )
+            return
+        if roll < cfg.rate_429 + cfg.error_rate:
+            cfg.bump("errors")
+            self._send_json(500, {"error": {"message": "Internal error (mock)", "type": "server_error"}})
+            return
+
+        with cfg.lock:
+            delay = max(0.0, cfg.rng.gauss(cfg.latency, cfg.jitter))
+            # 꼬리 지연: 일부 요청만 한참 늦게 (헤지 효과 측정용)
+            if cfg.rng.random() < cfg.slow_rate:
+                delay += cfg.slow_latency
+            payload_rng = random.Random(cfg.rng.random())
+            # json_schema(strict)를 받은 요청은 스키마를 벗어나지 않는다
+            malformed = response_format != "json_schema" and cfg.rng.random() < cfg.malformed_rate
+
+        messages = req.get("messages", [])
+        kind = classify_prompt(messages)
+        text = "\n".join(str(m.get("content", "")) for m in messages)
+        payload = fake_payload(kind, payload_rng, text)
+        if malformed:
+            cfg.bump("malformed")
+            payload = corrupt_payload(kind, payload, payload_rng)
+        content = json.dumps(payload, ensure_ascii=False)
+        # 출력 길이에 비례하는 생성 시간 (실제 API처럼 긴 응답일수록 늦게 끝남)
+        delay += cfg.token_latency * (len(content) // 2)
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 2
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content) // 2,
+            "total_tokens": prompt_tokens + len(content) // 2,
+        }
+        model = req.get("model", "mock")
+        cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        if req.get("stream"):
+            self._stream(cid, model, content, delay, usage, req.get("stream_options") or {})
+        else:
+            time.sleep(delay)
+            self._send_json(200, {
+                "id": cid,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }],
+                "usage": usage,
+            })
+        cfg.bump("ok")
+
+    def _stream(self, cid: str, model: str, content: str, delay: float, usage: Dict[str, int], options: Dict[str, Any]):
+        cfg = self.config
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta: Dict[str, Any], finish: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+            chunk = {
+                "id": cid,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            if extra:
+                chunk.update(extra)
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        # 첫 토큰까지의 지연 = 전체 지연의 일부, 나머지는 청크 사이 간격
+        n_chunks = max(1, len(content) // cfg.chunk_chars)
+        time.sleep(max(0.0, delay - n_chunks * cfg.chunk_delay))
+        event({"role": "assistant", "content": ""})
+        for i in range(0, len(content), cfg.chunk_chars):
+            event({"content": content[i:i + cfg.chunk_chars]})
+            time.sleep(cfg.chunk_delay)
+        event({}, finish="stop")
+        if options.get("include_usage"):
+            chunk = {"id": cid, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(host: str, port: int, config: MockConfig) -> ThreadingHTTPServer:
+    """
+    백그라운드 스레드로 서버를 띄우고 반환 (부하 테스트 드라이버에서 사용).
+    """
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_config_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=1.0, help="평균 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="지연 표준편차(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류 비율 (0~1)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429의 Retry-After(초)")
+    parser.add_argument("--rpm", type=int, default=0, help="API 키별 분당 요청 한도 (0: 없음, 넘으면 429 + 정확한 Retry-After)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="꼬리 지연을 줄 요청 비율 (0~1)")
+    parser.add_argument("--slow-latency", type=float, default=10.0, help="꼬리 지연 요청에 더할 시간(초)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="출력 토큰당 더할 생성 시간(초, 예: 0.02)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="스키마에 어긋난 JSON 응답 비율 (0~1, json_schema 요청 제외)")
+    parser.add_argument(
+        "--no-response-format", dest="response_format", action="store_false",
+        help="response_format json_schema 요청을 400으로 거절 (지원하지 않는 모델 흉내)",
+    )
+    parser.add_argument("--chunk-chars", type=int, default=8, help="스트리밍 청크당 글자 수")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="스트리밍 청크 간격(초)")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        chunk_chars=args.chunk_chars,
+        chunk_delay=args.chunk_delay,
+        seed=args.seed,
+        rpm=args.rpm,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        token_latency=args.token_latency,
+        malformed_rate=args.malformed_rate,
+        response_format=args.response_format,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config_from_args(args)})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    print(f"mock OpenAI server: http://{args.host}:{args.port}/v1  (stats: /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+벤치마크 묶음 실행 + JSON 기준선 저장/비교
+
+두 단계로 잰다.
+  micro  JSON 추출(safe_json_extract), 큰 직무/질문 집합의 apply_filtering,
+         단계별 프롬프트 빌더, 전공 정규화, 로컬 추천, 중복 직무 합치기의 호출당 시간
+  e2e    AppTest로 app.py를 1 -> 4페이지까지 실제로 진행하며 단계별 시간
+         (OpenAI 대신 지연이 고정된 내장 목 서버, 지터 0)
+
+결과는 항목마다 최솟값/중앙값/p95(초)를 담은 JSON으로 저장하고, compare로 두 결과를 비교해
+기준선보다 느려진 항목을 표시한다 (회귀가 있으면 종료 코드 1).
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.suite run --out .bench/baseline.json
+    python -m benchmarks.suite run --out .bench/new.json --only micro
+    python -m benchmarks.suite compare .bench/baseline.json .bench/new.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 회귀로 보지 않는 절대 차이(초): 잡음 수준의 변화는 무시
+NOISE_FLOOR = {"micro": 2e-6, "e2e": 0.02}
+# 비교에 쓰는 값: micro는 라운드 중 최솟값(다른 프로세스 간섭이 가장 적은 값), e2e는 중앙값
+COMPARE_STAT = {"micro": "min", "e2e": "median"}
+
+Results = Dict[str, Dict[str, float]]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "n": len(ordered),
+    }
+
+
+def per_call_samples(fn: Callable[[], Any], repeat: int, rounds: int) -> List[float]:
+    """
+    rounds번 반복해 라운드마다 호출당 평균 시간을 하나씩 남긴다 (라운드 간 흔들림이 곧 잡음).
+    """
+    fn()
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        samples.append((time.perf_counter() - t0) / repeat)
+    return samples
+
+
+# =========================================================
+# micro
+# =========================================================
+def make_jobs(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "job_title": f"직무 {i} ({'주니어' if i % 2 else '신입'})",
+            "category": "기획",
+            "why_fit": "사용자 성향과 잘 맞습니다.",
+            "requirements_hint": "학사 이상",
+        }
+        for i in range(n)
+    ]
+
+
+def make_questions(jobs: List[Dict[str, Any]], n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    questions = []
+    for i in range(n):
+        affects = [j["job_title"] for j in rng.sample(jobs, k=min(len(jobs), 5))]
+        if i % 2:
+            questions.append({"id": f"q{i}", "type": "yesno", "options": ["예", "아니오"], "affects_jobs": affects})
+        else:
+            questions.append({
+                "id": f"q{i}",
+                "type": "choice",
+                "options": ["가능", "어려움", "모름"],
+                "reject_options": ["어려움"],
+                "affects_jobs": affects,
+            })
+    return questions
+
+
+def run_micro(repeat: int, rounds: int) -> Results:
+    from benchmarks.bench_json_extract import make_corpus
+    from benchmarks.loadtest import sample_profile
+    from job_scoring import recommend_jobs
+    from job_similarity import dedupe_jobs, resolve_titles
+    from major_index import get_major_index
+    from pipeline import (
+        apply_filtering,
+        build_filter_question_prompt,
+        build_job_recommendation_prompt,
+        build_roadmap_prompt,
+        build_roadmap_section_prompt,
+        build_why_fit_prompt,
+        safe_json_extract,
+    )
+
+    rng = random.Random(0)
+    answers = sample_profile(rng)
+    answers["major"] = "컴퓨터공학과"
+    results: Results = {}
+
+    def bench(name: str, fn: Callable[[], Any], n: int = repeat):
+        results[f"micro.{name}"] = summarize(per_call_samples(fn, max(1, n), rounds))
+
+    for n_jobs in (12, 200):
+        for kind, text in make_corpus(n_jobs).items():
+            bench(f"safe_json_extract.{kind}.{n_jobs}jobs", lambda text=text: safe_json_extract(text), repeat // 10 if n_jobs > 12 else repeat)
+
+    for n_jobs, n_questions in ((12, 6), (1000, 200)):
+        jobs = make_jobs(n_jobs)
+        questions = make_questions(jobs, n_questions, rng)
+        filter_answers = {q["id"]: rng.choice(q["options"]) for q in questions}
+        bench(
+            f"apply_filtering.{n_jobs}x{n_questions}",
+            lambda jobs=jobs, questions=questions, fa=filter_answers: apply_filtering(jobs, questions, fa),
+            repeat // 50 if n_jobs > 12 else repeat,
+        )
+
+    jobs = make_jobs(12)
+    bench("prompt.recommend", lambda: build_job_recommendation_prompt(answers))
+    bench("prompt.why_fit", lambda: build_why_fit_prompt(answers, jobs))
+    bench("prompt.filter", lambda: build_filter_question_prompt(jobs))
+    bench("prompt.roadmap", lambda: build_roadmap_prompt("데이터 분석가", answers))
+    bench("prompt.roadmap_section", lambda: build_roadmap_section_prompt("데이터 분석가", answers, "3~12개월"))
+
+    index = get_major_index()
+    bench("major_index.lookup", lambda: index.lookup("컴퓨터곻학과"))
+    bench("recommend_jobs", lambda: recommend_jobs(answers), repeat // 10)
+
+    # 추천 결과 몇십 개 규모: 유사도 행렬 한 번 + 군집 (이름별 벡터는 캐시된 상태)
+    catalog = recommend_jobs(answers, top_k=36)
+    dup_jobs = catalog + [{**j, "job_title": j["job_title"] + " 담당자"} for j in catalog[:6]]
+    names = [j["job_title"] + " 직무" for j in catalog[:12]]
+    bench("dedupe_jobs.42", lambda: dedupe_jobs(dup_jobs), repeat // 10)
+    bench("resolve_titles.12x36", lambda: resolve_titles(names, catalog), repeat // 10)
+    return results
+
+
+# =========================================================
+# e2e (AppTest, 목 서버)
+# =========================================================
+def run_e2e(users: int, latency: float, port: int) -> Results:
+    from benchmarks.loadtest import StepTimer, run_app_user
+    from benchmarks.mock_openai_server import MockConfig, serve
+
+    server = serve("127.0.0.1", port, MockConfig(latency=latency, jitter=0.0, seed=0))
+    timer = StepTimer()
+    try:
+        for i in range(users):
+            run_app_user(timer, random.Random(i), think=0.0)
+    finally:
+        server.shutdown()
+
+    results: Results = {}
+    for step, samples in timer.samples.items():
+        results[f"e2e.{step}"] = summarize(samples)
+    errors = sum(timer.errors.values())
+    if errors:
+        print(f"e2e 단계 오류 {errors}건: {timer.errors}", file=sys.stderr)
+    return results
+
+
+# =========================================================
+# 저장 / 비교
+# =========================================================
+def git_revision() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def format_seconds(value: float) -> str:
+    if value < 1e-3:
+        return f"{value * 1e6:.1f} us"
+    if value < 1:
+        return f"{value * 1e3:.2f} ms"
+    return f"{value:.3f} s"
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> int:
+    """
+    (새 값 / 기준선 - 1) > threshold 이고 절대 차이가 잡음 수준보다 크면 회귀.
+    micro는 라운드 최솟값, e2e는 중앙값으로 비교한다 (COMPARE_STAT).
+    반환: 회귀 항목 수
+    """
+    regressions = 0
+    base_results, new_results = base["results"], new["results"]
+    print(f"기준선 {base['meta'].get('git', '?')} vs {new['meta'].get('git', '?')} (threshold {threshold * 100:.0f}%)")
+    print(f"{'항목':<48}{'기준선':>12}{'현재':>12}{'변화':>9}")
+    for name in sorted(set(base_results) | set(new_results)):
+        if name not in base_results or name not in new_results:
+            print(f"{name:<48}{'(한쪽에만 있음)':>33}")
+            continue
+        level = name.split(".", 1)[0]
+        stat = COMPARE_STAT.get(level, "median")
+        b, n = base_results[name][stat], new_results[name][stat]
+        change = n / b - 1 if b > 0 else 0.0
+        floor = NOISE_FLOOR.get(level, 0.0)
+        flag = ""
+        if change > threshold and n - b > floor:
+            flag = "  회귀"
+            regressions += 1
+        elif change < -threshold and b - n > floor:
+            flag = "  개선"
+        print(f"{name:<48}{format_seconds(b):>12}{format_seconds(n):>12}{change * 100:>8.1f}%{flag}")
+    print(f"\n회귀 {regressions}개")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="벤치마크를 돌려 JSON으로 저장")
+    run.add_argument("--out", required=True, help="결과 JSON 경로")
+    run.add_argument("--only", choices=["micro", "e2e"], default=None)
+    run.add_argument("--repeat", type=int, default=2000, help="micro: 라운드당 호출 수 (큰 입력은 자동으로 줄임)")
+    run.add_argument("--rounds", type=int, default=7, help="micro: 라운드 수")
+    run.add_argument("--users", type=int, default=5, help="e2e: 1 -> 4페이지를 진행할 사용자 수 (순차)")
+    run.add_argument("--latency", type=float, default=0.3, help="e2e: 목 서버 고정 지연(초)")
+    run.add_argument("--port", type=int, default=8791, help="e2e: 내장 목 서버 포트")
+
+    cmp_ = sub.add_parser("compare", help="기준선과 비교해 회귀 표시")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.25, help="이 비율 이상 느려지면 회귀 (공유 머신 잡음을 감안한 기본값)")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            new = json.load(f)
+        sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+    # pipeline/client_pool 을 import 하기 전에 설정해야 반영된다 (캐시/저장소는 끄고 매번 같은 조건).
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ["LLM_CACHE_DISABLED"] = "1"
+    os.environ["LLM_CACHE_PATH"] = ""
+    os.environ["SESSION_STORE"] = "memory"
+    os.environ["PROFILE_LOG_PATH"] = ""
+    os.environ["LLM_KEY_RPM"] = "0"
+    os.environ["LLM_KEY_TPM"] = "0"
+
+    results: Results = {}
+    if args.only in (None, "micro"):
+        print("micro ...", file=sys.stderr)
+        results.update(run_micro(args.repeat, args.rounds))
+    if args.only in (None, "e2e"):
+        print("e2e ...", file=sys.stderr)
+        results.update(run_e2e(args.users, args.latency, args.port))
+
+    report = {
+        "meta": {
+            "git": git_revision(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("command", "out")},
+        },
+        "results": results,
+    }
+    folder = os.path.dirname(args.out)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'항목':<48}{'min':>12}{'median':>12}{'p95':>12}")
+    for name, r in results.items():
+        print(f"{name:<48}{format_seconds(r['min']):>12}{format_seconds(r['median']):>12}{format_seconds(r['p95']):>12}")
+    print(f"\n저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    # SDK/httpx import는 무거우므로 실제로는 첫 클라이언트를 만들 때 로드한다 (_build).
+    # hash_api_key만 쓰는 모듈(llm_scheduler → app 첫 페이지)이 이 비용을 내지 않도록.
+    from openai import OpenAI
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+POOL_MAX_CONNECTIONS = int(os.environ.get("OPENAI_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.environ.get("OPENAI_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_POOL_KEEPALIVE_EXPIRY", "60"))
+POOL_CLIENT_IDLE_TTL = float(os.environ.get("OPENAI_POOL_CLIENT_IDLE_TTL", str(30 * 60)))
+OPENAI_TIMEOUT = float(os.environ.get("OPENAI_TIMEOUT", "60"))
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", "10"))
+# SDK 자체 재시도 횟수. 재시도/백오프는 llm_scheduler가 맡으므로 기본 0
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "0"))
+# OpenAI 호환 서버(로컬 목 서버 등)로 보낼 때 지정. 예: http://127.0.0.1:8000/v1
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+
+
+def hash_api_key(api_key: Optional[str]) -> str:
+    # 키 원문은 메모리 dict 키로도 남기지 않는다.
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+
+# =========================================================
+# API 키별 OpenAI 클라이언트 풀
+# =========================================================
+class ClientPool:
+    """
+    API 키(해시)마다 OpenAI 클라이언트 하나를 만들어 프로세스 전체에서 재사용.
+
+    - httpx keep-alive 커넥션 풀을 공유하므로 매 호출마다 TLS 핸드셰이크를 하지 않음
+    - 일정 시간 안 쓰인 클라이언트는 닫고 제거 (idle eviction)
+    - httpx.Client는 스레드 안전하므로 Streamlit 세션 스레드끼리 공유 가능
+    - 새 커넥션 수 / 재사용 요청 수를 집계
+    """
+
+    def __init__(
+        self,
+        max_connections: int = POOL_MAX_CONNECTIONS,
+        max_keepalive: int = POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = POOL_KEEPALIVE_EXPIRY,
+        idle_ttl: float = POOL_CLIENT_IDLE_TTL,
+        timeout: float = OPENAI_TIMEOUT,
+        connect_timeout: float = OPENAI_CONNECT_TIMEOUT,
+        base_url: Optional[str] = OPENAI_BASE_URL,
+        max_retries: int = OPENAI_MAX_RETRIES,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.idle_ttl = idle_ttl
+        self.base_url = base_url
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Tuple["OpenAI", float]] = {}
+
+        self.requests = 0
+        self.new_connections = 0
+        self.clients_created = 0
+        self.clients_evicted = 0
+
+    # -----------------------------------------------------
+    # 커넥션 재사용 집계 (httpcore trace 훅)
+    # -----------------------------------------------------
+    def _trace(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+
+    def _on_request(self, request):
+        request.extensions["trace"] = self._trace
+        with self._lock:
+            self.requests += 1
+
+    def _build(self, api_key: Optional[str]) -> "OpenAI":
+        try:  # openai 3.x SDK는 httpx2 위에서 동작
+            import httpx2 as httpx
+        except ImportError:
+            import httpx
+        from openai import OpenAI
+
+        timeout = httpx.Timeout(self.timeout, connect=self.connect_timeout)
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=timeout,
+            event_hooks={"request": [self._on_request]},
+        )
+        return OpenAI(
+            api_key=api_key,
+            base_url=self.base_url,
+            http_client=http_client,
+            timeout=timeout,
+            max_retries=self.max_retries,
+        )
+
+    # -----------------------------------------------------
+    # 공개 API
+    # -----------------------------------------------------
+    def get(self, api_key: Optional[str]) -> "OpenAI":
+        key = hash_api_key(api_key)
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            item = self._clients.get(key)
+            if item is None:
+                client = self._build(api_key)
+                self.clients_created += 1
+            else:
+                client = item[0]
+            self._clients[key] = (client, now)
+            return client
+
+    def _evict_idle(self, now: float):
+        # lock 안에서만 호출
+        for key, (client, last_used) in list(self._clients.items()):
+            if now - last_used > self.idle_ttl:
+                del self._clients[key]
+                self.clients_evicted += 1
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+    def close_all(self):
+        with self._lock:
+            for client, _ in self._clients.values():
+                try:
+                    client.close()
+                except Exception:
+                    pass
+            self._clients.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "clients_created": self.clients_created,
+                "clients_evicted": self.clients_evicted,
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests - self.new_connections, 0),
+            }
+
+
+# 프로세스 전역 풀
+client_pool = ClientPool()
@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from major_index import match_major
+from questions import QUESTION_OPTIONS, option_code
+
+
+# =========================================================
+# 특징 축 정의 (사용자 벡터와 직무 행렬이 같은 축을 공유)
+# =========================================================
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "job_catalog.json")
+
+
+def _codes(key: str, skip: Tuple[str, ...] = ()) -> List[str]:
+    return [code for _, code in QUESTION_OPTIONS[key] if code not in skip]
+
+
+REGIONS = _codes("location")
+JOB_TYPES = _codes("job_type")
+CULTURES = _codes("culture")
+STRAINS = _codes("health", skip=("none",))
+MUSTS = _codes("must_have")
+SUBJECTS = _codes("cant_do")
+ACTIONS = _codes("preferred_action")
+MAJOR_FIELDS = ["humanities", "social", "education", "engineering", "science", "medical", "arts", "other"]
+
+# 전공 자유 입력 -> 계열 (간단한 키워드 매칭)
+MAJOR_KEYWORDS: Dict[str, List[str]] = {
+    "humanities": ["국문", "국어", "영문", "영어", "사학", "철학", "문헌", "어문", "언어", "중문", "일문", "불문", "독문", "인문"],
+    "social": ["경영", "경제", "행정", "정치", "사회", "법", "회계", "무역", "심리", "미디어", "신문", "광고", "관광"],
+    "education": ["교육", "사범", "유아", "특수교"],
+    "engineering": ["공학", "컴퓨터", "소프트웨어", "전자", "전기", "기계", "건축", "토목", "산업", "화공", "정보", "ai", "it"],
+    "science": ["수학", "물리", "화학", "생명", "생물", "통계", "지구", "천문", "자연", "농"],
+    "medical": ["의학", "의예", "간호", "약학", "치의", "한의", "보건", "물리치료", "임상", "수의"],
+    "arts": ["디자인", "미술", "음악", "체육", "무용", "연극", "영화", "실용", "회화", "조소", "작곡", "성악"],
+}
+
+# (블록 이름, 축 목록, 가중치). 음수 가중치 = 벌점
+BLOCKS: List[Tuple[str, List[str], float]] = [
+    ("pay", ["pay"], 1.0),
+    ("region", REGIONS, 1.0),
+    ("type", JOB_TYPES, 0.8),
+    ("remote", ["remote"], 0.5),
+    ("culture", CULTURES, 0.6),
+    ("strain", STRAINS, -0.7),
+    ("must", MUSTS, 1.2),
+    ("subject", SUBJECTS, -1.5),
+    ("action", ACTIONS, 0.8),
+    ("major", MAJOR_FIELDS, 0.9),
+]
+EDU_GAP_WEIGHT = 2.0
+
+BLOCK_SLICES: Dict[str, slice] = {}
+_offset = 0
+for _name, _axes, _ in BLOCKS:
+    BLOCK_SLICES[_name] = slice(_offset, _offset + len(_axes))
+    _offset += len(_axes)
+VECTOR_SIZE = _offset
+WEIGHTS = np.concatenate([np.full(len(axes), w) for _, axes, w in BLOCKS])
+BLOCK_NAMES = [name for name, _, _ in BLOCKS]
+# [VECTOR_SIZE, 블록 수] : 축별 기여도를 블록별 합으로 묶는 행렬
+BLOCK_SUM = np.zeros((VECTOR_SIZE, len(BLOCKS)))
+for _i, _name in enumerate(BLOCK_NAMES):
+    BLOCK_SUM[BLOCK_SLICES[_name], _i] = 1.0
+
+MONEY_LEVEL = {"any": 0.0, "avg": 1 / 3, "high": 2 / 3, "max": 1.0}
+COMMUTE_TOLERANCE = {"30m": 0.0, "60m": 0.25, "90m": 0.5, "120m": 0.75, "150m": 1.0}
+EDU_LEVEL = {"hs": 0.0, "college": 1 / 3, "bachelor": 2 / 3, "graduate": 1.0}
+
+
+def classify_major(major: str) -> str:
+    text = (major or "").strip().lower().replace(" ", "")
+    if not text:
+        return ""
+    # 전공 사전에 있으면 사전의 계열, 없으면 키워드 매칭
+    match = match_major(major.strip())
+    if match is not None:
+        return match["field"]
+    for field, keywords in MAJOR_KEYWORDS.items():
+        if any(k in text for k in keywords):
+            return field
+    return "other"
+
+
+# =========================================================
+# 사용자 답변 -> 고정 길이 벡터
+# =========================================================
+def encode_answers(answers: Dict[str, Any]) -> Tuple[np.ndarray, float]:
+    """
+    반환: (특징 벡터 [VECTOR_SIZE], 학력 수준 0~1)
+    gender_ratio 는 직무 적합도 계산에 쓰지 않는다.
+    """
+    u = np.zeros(VECTOR_SIZE)
+
+    def hot(block: str, axes: List[str], code: str, value: float = 1.0):
+        if code in axes:
+            u[BLOCK_SLICES[block].start + axes.index(code)] = value
+
+    u[BLOCK_SLICES["pay"].start] = MONEY_LEVEL.get(option_code("money", answers.get("money", "")), 0.0)
+    hot("region", REGIONS, option_code("location", answers.get("location", "")))
+    hot("type", JOB_TYPES, option_code("job_type", answers.get("job_type", "")))
+    # 통근을 짧게 원할수록 재택/유연 근무 가능한 직무를 선호한다고 본다.
+    tolerance = COMMUTE_TOLERANCE.get(option_code("commute", answers.get("commute", "")), 0.25)
+    u[BLOCK_SLICES["remote"].start] = 1.0 - tolerance
+    hot("culture", CULTURES, option_code("culture", answers.get("culture", "")))
+    for label in answers.get("health", []) or []:
+        hot("strain", STRAINS, option_code("health", label))
+    hot("must", MUSTS, option_code("must_have", answers.get("must_have", "")))
+    for label in answers.get("cant_do", []) or []:
+        hot("subject", SUBJECTS, option_code("cant_do", label))
+    hot("action", ACTIONS, option_code("preferred_action", answers.get("preferred_action", "")))
+    hot("major", MAJOR_FIELDS, classify_major(answers.get("major", "")))
+
+    edu = EDU_LEVEL.get(option_code("education", answers.get("education", "")), 1 / 3)
+    return u, edu
+
+
+# =========================================================
+# 번들 직무 카탈로그 -> 직무 속성 행렬
+# =========================================================
+class JobIndex:
+    """
+    matrix: [직무 수, VECTOR_SIZE] 직무 속성
+    edu:    [직무 수] 최소 학력 수준 0~1
+    """
+
+    def __init__(self, catalog: List[Dict[str, Any]]):
+        self.jobs = catalog
+        self.titles = [j["title"] for j in catalog]
+        self.matrix = np.zeros((len(catalog), VECTOR_SIZE))
+        self.edu = np.array([float(j.get("edu", 0.0)) for j in catalog])
+
+        for row, j in enumerate(catalog):
+            def put(block: str, axes: List[str], codes: List[str]):
+                for code in codes:
+                    if code in axes:
+                        self.matrix[row, BLOCK_SLICES[block].start + axes.index(code)] = 1.0
+
+            # 급여는 -1~1 로: 돈을 원할수록 고임금 가산, 저임금 감산
+            self.matrix[row, BLOCK_SLICES["pay"].start] = (float(j.get("pay", 0.5)) - 0.5) * 2
+            regions = j.get("regions", "all")
+            put("region", REGIONS, REGIONS if regions == "all" else regions)
+            put("type", JOB_TYPES, j.get("types", []))
+            self.matrix[row, BLOCK_SLICES["remote"].start] = float(j.get("remote", 0.0))
+            put("culture", CULTURES, j.get("culture", []))
+            put("strain", STRAINS, j.get("strain", []))
+            put("must", MUSTS, j.get("must", []))
+            put("subject", SUBJECTS, j.get("subjects", []))
+            put("action", ACTIONS, j.get("actions", []))
+            put("major", MAJOR_FIELDS, j.get("majors", []))
+
+    def score(self, u: np.ndarray, edu: float) -> np.ndarray:
+        """
+        직무별 점수 [직무 수]. 행렬-벡터 곱 한 번 + 학력 부족 벌점.
+        """
+        return self.matrix @ (WEIGHTS * u) - EDU_GAP_WEIGHT * np.maximum(0.0, self.edu - edu)
+
+    def score_many(self, users: np.ndarray, edus: np.ndarray) -> np.ndarray:
+        """
+        여러 사용자 한 번에: users [사용자 수, VECTOR_SIZE] -> [사용자 수, 직무 수]
+        """
+        gap = np.maximum(0.0, self.edu[None, :] - edus[:, None])
+        return (users * WEIGHTS) @ self.matrix.T - EDU_GAP_WEIGHT * gap
+
+    def block_contributions(self, rows: np.ndarray, u: np.ndarray) -> np.ndarray:
+        """
+        [len(rows), 블록 수] 블록별 점수 기여도 (추천 이유 문구용)
+        """
+        return (self.matrix[rows] * (WEIGHTS * u)) @ BLOCK_SUM
+
+
+_index: Optional[JobIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_job_index() -> JobIndex:
+    """
+    카탈로그는 처음 쓸 때 한 번만 읽는다 (프로세스 전역).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                with open(CATALOG_PATH, encoding="utf-8") as f:
+                    _index = JobIndex(json.load(f))
+    return _index
+
+
+# =========================================================
+# 추천 결과 (카드에 바로 쓸 수 있는 형태)
+# =========================================================
+REASON_TEMPLATES: Dict[str, str] = {
+    "pay": "기대하는 수입 수준과 잘 맞는 편이에요.",
+    "region": "희망 지역({location})에서도 일자리를 찾기 쉬운 직무예요.",
+    "type": "원하는 근무 형태({job_type})로 일할 수 있어요.",
+    "remote": "재택/유연 근무 여지가 있어 통근 부담이 적어요.",
+    "culture": "선호하는 조직 분위기와 비슷한 곳이 많아요.",
+    "must": "'{must_have}'을(를) 지키기 좋은 직무예요.",
+    "action": "'{preferred_action}' 성향을 살릴 수 있어요.",
+    "major": "전공({major})과 자연스럽게 연결돼요.",
+}
+
+
+def explain(contrib: np.ndarray, answers: Dict[str, Any]) -> str:
+    """
+    contrib: 한 직무의 블록별 기여도. 가장 크게 기여한 두 항목으로 문구를 만든다.
+    """
+    order = np.argsort(-contrib)
+    picked = [BLOCK_NAMES[i] for i in order if contrib[i] > 0 and BLOCK_NAMES[i] in REASON_TEMPLATES][:2]
+    if not picked:
+        return "입력한 조건에서 크게 어긋나는 부분이 적은 직무예요."
+    values = {k: answers.get(k, "") for k in ("location", "job_type", "must_have", "preferred_action", "major")}
+    values["preferred_action"] = str(values["preferred_action"]).replace("~를 ", "")
+    return " ".join(REASON_TEMPLATES[k].format(**values) for k in picked)
+
+
+def recommend_jobs(answers: Dict[str, Any], top_k: int = 12) -> List[Dict[str, Any]]:
+    """
+    로컬 추천: 답변 벡터로 번들 직무를 점수화해 상위 top_k개를 카드 형식으로 반환.
+    why_fit 은 점수에 가장 크게 기여한 항목으로 만든 기본 문구.
+    """
+    index = get_job_index()
+    u, edu = encode_answers(answers)
+    scores = index.score(u, edu)
+
+    k = min(top_k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+
+    contrib = index.block_contributions(top, u)
+
+    results = []
+    for row, c in zip(top, contrib):
+        j = index.jobs[row]
+        results.append({
+            "job_title": j["title"],
+            "category": j["category"],
+            "why_fit": explain(c, answers),
+            "requirements_hint": j["requirements_hint"],
+            "score": round(float(scores[row]), 3),
+        })
+    return results
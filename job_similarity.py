@@ -0,0 +1,316 @@
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from requirements_index import REQUIREMENTS_PATH, normalize_title, title_keys
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+# 같은 직무로 합치는 최소 유사도 (글자 n-gram TF-IDF 코사인, 0~1).
+# 잘못 합치면 카드 하나가 사라지므로 보수적으로 둔다 (1이면 정규화한 이름이 같은 것만 합침).
+# 유사도와 별개로 역할 단어(same_role)가 맞아야 합친다
+DEDUP_THRESHOLD = float(os.environ.get("JOB_DEDUP_THRESHOLD", "0.6"))
+
+# affects_jobs 이름 -> 추천 리스트 직무로 인정하는 최소 유사도.
+# 틀리게 대응시키면 사용자가 거절하지 않은 직무가 지워지므로 합치기와 같은 기준에,
+# 가장 비슷한 직무가 두 번째보다 MATCH_MARGIN 이상 높을 때만 인정한다
+MATCH_THRESHOLD = float(os.environ.get("JOB_MATCH_THRESHOLD", "0.6"))
+MATCH_MARGIN = float(os.environ.get("JOB_MATCH_MARGIN", "0.1"))
+
+# 두 직무의 category가 글자 하나 겹치지 않으면 제목 유사도에 곱하는 값
+# ("데이터 분석가"(개발) vs "데이터 분석 강사"(교육) 같은 경우)
+CATEGORY_MISMATCH = 0.8
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "job_catalog.json")
+
+# 이름 앞부분이 같은 것("백엔드 ..." / "프론트엔드 ...")이 더 중요하므로 첫 n-gram에 주는 가중치
+PREFIX_BOOST = 2.0
+# category가 없거나 기본값이면 비교하지 않는다
+_NO_CATEGORY = ("", "기타")
+_WORD_SPLIT = re.compile(r"[^\w]+|_")
+_PAREN = re.compile(r"\([^)]*\)")
+
+# 역할 단어(직무명의 마지막 단어): 앞부분이 같아도 역할이 다르면 다른 직무
+# ("게임 기획자" / "게임 개발자", "간호사" / "간호조무사")
+# 어떤 역할과도 같은 직무일 수 있는 일반적인 꼬리
+_GENERIC_ROLES = frozenset({"담당자", "담당", "전문가", "실무자", "매니저", "직원", "사원"})
+# 같은 역할로 보는 표기
+_ROLE_SYNONYMS = [
+    frozenset({"개발자", "엔지니어", "프로그래머"}),
+    frozenset({"교사", "선생님"}),
+    frozenset({"마케터", "마케팅"}),
+]
+_ROLE_GROUP = {role: i for i, group in enumerate(_ROLE_SYNONYMS) for role in group}
+
+
+# =========================================================
+# 특징: "^정규화한이름$"의 글자 2/3-gram + 단어, 번들 직무명으로 구한 IDF 가중치
+# =========================================================
+def _raw_features(text: str) -> Dict[str, float]:
+    """
+    예) "UX/UI 디자이너" -> {"^u", "ux", ..., "너$", "^ux", ..., "#ux", "#ui", "#디자이너"}
+    """
+    key = normalize_title(text)
+    if not key:
+        return {}
+    padded = f"^{key}$"
+    feats: Dict[str, float] = {}
+    for n in (2, 3):
+        for i in range(len(padded) - n + 1):
+            feats[padded[i:i + n]] = PREFIX_BOOST if i == 0 else 1.0
+    for word in _WORD_SPLIT.split(unicodedata.normalize("NFKC", str(text)).lower()):
+        if word:
+            feats["#" + word] = 1.0
+    return feats
+
+
+def _words(title: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", _PAREN.sub("", str(title or ""))).lower()
+    return [w for w in _WORD_SPLIT.split(text) if w]
+
+
+@lru_cache(maxsize=4096)
+def role_word(title: str) -> str:
+    """
+    예) "UX/UI 디자이너" -> "디자이너", "9급 공무원(행정직)" -> "공무원", "간호조무사" -> "간호조무사"
+    """
+    words = _words(title)
+    return words[-1] if words else normalize_title(title)
+
+
+def same_role(a: str, b: str) -> bool:
+    """
+    두 직무명의 역할 단어가 같은 역할인지. 붙여 쓴 이름은 나머지 단어가 맞는지로 본다
+    ("웹개발자" / "웹 개발자", "사회복지사" / "사회 복지사"). "간호사"와 "간호조무사"는 다르다.
+    """
+    ra, rb = role_word(a), role_word(b)
+    if ra == rb or ra in _GENERIC_ROLES or rb in _GENERIC_ROLES:
+        return True
+    group = _ROLE_GROUP.get(ra)
+    if group is not None and group == _ROLE_GROUP.get(rb):
+        return True
+    if len(ra) > len(rb):
+        a, b, ra, rb = b, a, rb, ra
+    # 이제 ra가 짧은 쪽. "웹개발자" = "웹" + "개발자"이고 다른 쪽에 "웹"이라는 단어가 있어야 같음
+    return rb.endswith(ra) and rb[: -len(ra)] in _words(a)[:-1]
+
+
+class _Idf:
+    """
+    번들 직무 카탈로그 + 면허 직무 인덱스의 이름/별칭으로 만든 문서 빈도.
+    "담당자", "개발자"처럼 흔한 꼬리는 가볍게, 드문 앞부분은 무겁게 본다.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self.n = len(names)
+        self.df: Dict[str, int] = {}
+        for name in names:
+            for gram in _raw_features(name):
+                self.df[gram] = self.df.get(gram, 0) + 1
+        # 코퍼스에 없는 n-gram의 가중치
+        self.unseen = math.log(self.n + 1) + 1
+
+    def weight(self, gram: str) -> float:
+        df = self.df.get(gram)
+        if df is None:
+            return self.unseen
+        return math.log((self.n + 1) / (df + 1)) + 1
+
+
+_idf: Optional[_Idf] = None
+_idf_lock = threading.Lock()
+
+
+def get_idf() -> _Idf:
+    """
+    IDF 표는 처음 쓸 때 한 번만 만든다 (프로세스 전역).
+    """
+    global _idf
+    if _idf is None:
+        with _idf_lock:
+            if _idf is None:
+                with open(CATALOG_PATH, encoding="utf-8") as f:
+                    names = [j["title"] for j in json.load(f)]
+                with open(REQUIREMENTS_PATH, encoding="utf-8") as f:
+                    for job in json.load(f).get("jobs", []):
+                        names.extend([job["title"], *job.get("aliases", [])])
+                _idf = _Idf(list(dict.fromkeys(names)))
+    return _idf
+
+
+# n-gram -> 열 번호 (프로세스 동안 유지, 이름별 벡터 캐시가 같은 번호를 쓴다)
+_vocab: Dict[str, int] = {}
+_vocab_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4096)
+def _vector(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    이름 하나의 희소 벡터 (열 번호, L2 정규화한 TF-IDF 가중치). 빈 이름은 길이 0.
+    """
+    idf = get_idf()
+    feats = _raw_features(text)
+    with _vocab_lock:
+        cols = np.array([_vocab.setdefault(gram, len(_vocab)) for gram in feats], dtype=np.int64)
+    vals = np.array([v * idf.weight(gram) for gram, v in feats.items()], dtype=np.float32)
+    norm = float(np.linalg.norm(vals)) if len(vals) else 0.0
+    return cols, (vals / norm if norm > 0 else vals)
+
+
+def _vectorize(*groups: Sequence[str]) -> List[np.ndarray]:
+    """
+    여러 이름 묶음을 이번 호출에 나온 n-gram 열만 모은 밀집 행렬로 만든다 (행은 L2 정규화돼 있음).
+    두 행렬의 곱 A @ B.T가 곧 코사인 유사도. 이름이 비어 있으면 0 행.
+    """
+    vectors = [[_vector(text) for text in texts] for texts in groups]
+    cols = [c for group in vectors for c, _ in group]
+    if not cols or not sum(len(c) for c in cols):
+        return [np.zeros((len(texts), 1), dtype=np.float32) for texts in groups]
+    # 전역 열 번호 -> 0..k-1 로 압축
+    used, inverse = np.unique(np.concatenate(cols), return_inverse=True)
+
+    matrices = []
+    start = 0
+    for group in vectors:
+        lengths = [len(c) for c, _ in group]
+        end = start + sum(lengths)
+        m = np.zeros((len(group), len(used)), dtype=np.float32)
+        if end > start:
+            rows = np.repeat(np.arange(len(group)), lengths)
+            m[rows, inverse[start:end]] = np.concatenate([v for _, v in group])
+        matrices.append(m)
+        start = end
+    return matrices
+
+
+def similarity(a: Sequence[str], b: Sequence[str]) -> np.ndarray:
+    """
+    이름 목록 두 개의 쌍별 유사도 행렬 (len(a) x len(b), 0~1).
+    """
+    if not a or not b:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    va, vb = _vectorize(a, b)
+    return va @ vb.T
+
+
+def _job_similarity(jobs: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    직무끼리의 유사도 행렬: 제목 유사도에, 둘 다 category가 있는데 전혀 겹치지 않으면 CATEGORY_MISMATCH를 곱한다.
+    """
+    titles = [j["job_title"] for j in jobs]
+    categories = [str(j.get("category") or "").strip() for j in jobs]
+    categories = ["" if c in _NO_CATEGORY else c for c in categories]
+    t, c = _vectorize(titles, categories)
+    sim = t @ t.T
+    known = np.array([bool(x) for x in categories])
+    mismatch = ((c @ c.T) <= 0) & known[:, None] & known[None, :]
+    sim[mismatch] *= CATEGORY_MISMATCH
+    return sim
+
+
+# =========================================================
+# 중복 직무 합치기 / 이름 -> 직무 찾기
+# =========================================================
+def dedupe_jobs(jobs: List[Dict[str, Any]], threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    거의 같은 직무를 하나로 합친다 (예: "콘텐츠 마케터" / "콘텐츠 마케팅 담당자").
+    순서대로 보며 앞에서 남긴 직무와 threshold 이상이고 역할 단어가 맞으면(same_role) 그 직무에 합친다
+    (리스트 순서 = 추천 순위이므로 더 앞선 카드가 남음). 합쳐진 이름은 남은 직무의
+    aliases에 모아 affects_jobs가 사라진 이름을 가리켜도 찾을 수 있게 한다.
+    """
+    if len(jobs) < 2:
+        return jobs
+    threshold = DEDUP_THRESHOLD if threshold is None else threshold
+    sim = _job_similarity(jobs)
+    np.fill_diagonal(sim, 0.0)
+    close = sim >= threshold
+    if not close.any():
+        return jobs
+    close_rows = close.tolist()
+
+    kept: List[int] = []
+    merged: Dict[int, List[str]] = {}
+    titles = [j["job_title"] for j in jobs]
+    for i in range(len(jobs)):
+        # 유사도 행렬로 후보를 좁힌 뒤 (대부분 없음) 역할 단어만 문자열로 확인
+        leader = next((k for k in kept if close_rows[i][k] and same_role(titles[i], titles[k])), None)
+        if leader is None:
+            kept.append(i)
+        else:
+            merged.setdefault(leader, []).append(jobs[i]["job_title"])
+
+    out = []
+    for k in kept:
+        job = jobs[k]
+        if k in merged:
+            aliases = [*job.get("aliases", []), *merged[k]]
+            job = {**job, "aliases": list(dict.fromkeys(aliases))}
+        out.append(job)
+    return out
+
+
+def is_near_duplicate(title: str, others: Sequence[str], threshold: Optional[float] = None) -> bool:
+    """
+    스트리밍처럼 직무가 하나씩 도착할 때: 이미 보여준 이름들 중 거의 같은 것이 있는지.
+    """
+    threshold = DEDUP_THRESHOLD if threshold is None else threshold
+    if not others:
+        return False
+    sim = similarity([title], others)[0]
+    return any(same_role(title, others[i]) for i in np.flatnonzero(sim >= threshold))
+
+
+def resolve_titles(
+    names: Sequence[str],
+    jobs: List[Dict[str, Any]],
+    threshold: Optional[float] = None,
+    margin: Optional[float] = None,
+) -> List[Optional[int]]:
+    """
+    names(예: 필터 질문의 affects_jobs) 각각이 가리키는 jobs의 인덱스 (못 찾으면 None).
+    1) 정규화한 이름이 job_title/aliases와 같으면 그 직무 (같은 이름이 여럿이면 첫 번째)
+    2) 남은 이름만 유사도 행렬로 비교해, 역할 단어가 맞는 직무 중 가장 비슷한 것이
+       threshold 이상이고 두 번째보다 margin 이상 높을 때만 그 직무. 애매하면 None
+       (가장 가까운 직무를 고르지 않는다: 틀리면 거절하지 않은 직무가 필터링됨)
+    """
+    threshold = MATCH_THRESHOLD if threshold is None else threshold
+    margin = MATCH_MARGIN if margin is None else margin
+    by_key: Dict[str, int] = {}
+    for i, j in enumerate(jobs):
+        by_key.setdefault(normalize_title(j["job_title"]), i)
+        for alias in j.get("aliases") or ():
+            by_key.setdefault(normalize_title(alias), i)
+
+    resolved: List[Optional[int]] = []
+    unmatched: List[int] = []
+    for n, name in enumerate(names):
+        idx = by_key.get(normalize_title(name))
+        if idx is None and "(" in name:
+            # "의사(내과)" -> "의사"
+            idx = next((by_key[k] for k in title_keys(name)[1:] if k in by_key), None)
+        resolved.append(idx)
+        if idx is None:
+            unmatched.append(n)
+
+    if unmatched and jobs:
+        titles = [j["job_title"] for j in jobs]
+        sim = similarity([names[n] for n in unmatched], titles)
+        for row, n in enumerate(unmatched):
+            scores = sim[row]
+            candidates = [i for i in np.flatnonzero(scores >= threshold) if same_role(names[n], titles[i])]
+            if not candidates:
+                continue
+            best = max(candidates, key=lambda i: scores[i])
+            runner_up = max((scores[i] for i in range(len(titles)) if i != best), default=0.0)
+            if scores[best] - runner_up >= margin:
+                resolved[n] = int(best)
+    return resolved
@@ -0,0 +1,135 @@
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+
+# 어떤 경로로 JSON을 찾았는지 (계측/디버그용)
+PATH_DIRECT = "direct"          # 응답 전체가 JSON
+PATH_FENCED = "fenced"          # ```json ... ``` 블록 안
+PATH_EMBEDDED = "embedded"      # 앞뒤 설명 사이에 섞여 있음
+PATH_REPAIRED = "repaired"      # 잘린 JSON의 괄호/따옴표를 닫아서 복구
+PATH_FAILED = "failed"
+
+_decoder = json.JSONDecoder()
+# 완결된 문자열 | 괄호 | (닫히지 않은 문자열의) 여는 따옴표
+_TOKENS = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]|"', re.DOTALL)
+# '{' 다음이 키("...) 또는 '}' 이면 JSON 객체의 시작으로 본다
+_OBJECT_START = re.compile(r'\{\s*["}]')
+
+
+def _close_fragment(fragment: str) -> str:
+    """
+    열린 문자열을 닫고, 끝의 쉼표/콜론을 지운 뒤, 열린 괄호를 역순으로 닫는다.
+    """
+    stack: List[str] = []
+    in_string = False
+    for m in _TOKENS.finditer(fragment):
+        c = m.group()
+        if c == '"':
+            # 닫히지 않은 문자열 -> 끝까지 문자열
+            in_string = True
+            break
+        if c in "{[":
+            stack.append("}" if c == "{" else "]")
+        elif c in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        trailing = len(fragment) - len(fragment.rstrip("\\"))
+        if trailing % 2 == 1:
+            # 이스케이프(\\) 직후에 잘림
+            fragment = fragment[:-1]
+        fragment += '"'
+    fragment = fragment.rstrip().rstrip(",:").rstrip()
+    return fragment + "".join(reversed(stack))
+
+
+def _repair_truncated(fragment: str, attempts: int = 3) -> Dict[str, Any]:
+    """
+    max_tokens 등으로 중간에 잘린 JSON을 최소한으로 닫아서 파싱.
+    안 되면 마지막 쉼표 이전까지 잘라내고 다시 시도 (최대 attempts번).
+    """
+    for _ in range(attempts):
+        try:
+            obj = json.loads(_close_fragment(fragment))
+            if isinstance(obj, dict):
+                return obj
+        except (ValueError, RecursionError):
+            pass
+        cut = fragment.rfind(",")
+        if cut <= 0:
+            break
+        fragment = fragment[:cut]
+    return {}
+
+
+def _find_object_end(text: str, start: int) -> int:
+    """
+    text[start] == '{' 에서 시작하는 객체의 짝이 맞는 '}' 다음 위치.
+    문자열 토큰은 정규식이 통째로 건너뛰므로 괄호만 세면 된다 (백트래킹 없음).
+    닫히지 않으면 -1.
+    """
+    depth = 0
+    for m in _TOKENS.finditer(text, start):
+        c = m.group()
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return m.end()
+        elif c == '"':
+            # 닫히지 않은 문자열
+            return -1
+    return -1
+
+
+def extract_json_object(text: str) -> Tuple[Dict[str, Any], str]:
+    """
+    텍스트에서 첫 번째로 완성된 최상위 JSON 객체를 선형 시간(O(n))에 찾는다.
+
+    - 각 '{' 후보에서 JSONDecoder.raw_decode로 그 자리에서 바로 파싱
+    - JSON처럼 시작했는데 깨진 객체는 문자열을 고려해 짝이 맞는 '}'까지 건너뜀
+      (안쪽 객체를 결과로 잘못 고르지 않고, 각 구간은 한 번만 본다)
+    - 설명 속 {예시} 같은 중괄호는 바로 다음 '{'로 넘어감
+    - 끝까지 닫히지 않으면 잘린 응답으로 보고 복구를 시도
+      (설명 속 짝 없는 따옴표 때문일 수 있으므로 다음 '{'에서 한 번만 더 시도)
+
+    반환: (dict, 경로 이름). 실패하면 ({}, "failed")
+    """
+    retried = False
+    i = text.find("{")
+    while i >= 0:
+        try:
+            obj, end = _decoder.raw_decode(text, i)
+        except (ValueError, RecursionError):
+            obj, end = None, -1
+
+        if isinstance(obj, dict):
+            if text[:i].isspace() or i == 0:
+                if end == len(text) or text[end:].isspace():
+                    return obj, PATH_DIRECT
+            if text[:i].rstrip().endswith("```json") or text[:i].rstrip().endswith("```"):
+                return obj, PATH_FENCED
+            return obj, PATH_EMBEDDED
+
+        if not _OBJECT_START.match(text, i):
+            # 설명 속 {예시} 같은 중괄호: 바로 다음 '{'로
+            i = text.find("{", i + 1)
+            continue
+
+        end = _find_object_end(text, i)
+        if end < 0:
+            # 끝까지 닫히지 않음 -> 잘린 응답일 가능성
+            obj = _repair_truncated(text[i:])
+            if obj:
+                return obj, PATH_REPAIRED
+            if retried:
+                return {}, PATH_FAILED
+            retried = True
+            i = text.find("{", i + 1)
+            continue
+
+        i = text.find("{", end)
+
+    return {}, PATH_FAILED
@@ -0,0 +1,289 @@
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+# 요청에 싣는 response_format
+# - json_schema: 단계별 스키마를 strict 모드로 보냄 (지원하지 않는 모델/백엔드는 llm_router가 빼고 다시 보냄)
+# - json_object: JSON 모드만 켬 (형식은 로컬 검증기가 확인)
+# - off:         보내지 않음
+RESPONSE_FORMAT = os.environ.get("LLM_RESPONSE_FORMAT", "json_schema")
+
+# 요청에 싣지 않고 로컬 검증에서만 쓰는 키워드 (strict 모드가 받지 않는 것들)
+LOCAL_KEYWORDS = ("minItems", "maxItems", "default")
+
+# 검증 결과
+OUTCOME_VALID = "valid"         # 스키마 그대로
+OUTCOME_REPAIRED = "repaired"   # 타입 변환/잘못된 항목 제거/기본값 채움으로 맞춤
+OUTCOME_INVALID = "invalid"     # 필수 값이 빠져 있음 (missing 참고)
+
+_INVALID = object()
+
+Path = Tuple[Any, ...]
+Checker = Callable[[Any, Path, "ValidationResult"], Any]
+
+
+class ValidationResult:
+    """
+    value:   고친 값 (모르는 키/잘못된 배열 원소는 빠지고, 숫자->문자열 같은 변환이 적용됨)
+    missing: 채우지 못한 필수 값의 경로 (예: "jobs", "timeline")
+    repairs: 고친 횟수
+    """
+
+    __slots__ = ("value", "missing", "repairs")
+
+    def __init__(self):
+        self.value: Any = None
+        self.missing: List[str] = []
+        self.repairs = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing
+
+    @property
+    def outcome(self) -> str:
+        if self.missing:
+            return OUTCOME_INVALID
+        return OUTCOME_REPAIRED if self.repairs else OUTCOME_VALID
+
+    def fail(self, path: Path):
+        self.missing.append(".".join(str(p) for p in path) or "$")
+
+
+# =========================================================
+# 스키마 -> 검증 함수 (한 번만 컴파일)
+# 지원: type(object/array/string/integer/number/boolean), properties, required,
+#       additionalProperties(false 또는 스키마), items, enum, minItems, maxItems, default
+# =========================================================
+def _compile(schema: Dict[str, Any]) -> Checker:
+    kind = schema.get("type")
+    if kind == "object":
+        return _compile_object(schema)
+    if kind == "array":
+        return _compile_array(schema)
+    if kind == "string":
+        return _compile_string(schema)
+    if kind in ("integer", "number"):
+        return _compile_number(kind)
+    if kind == "boolean":
+        return lambda value, path, result: value if isinstance(value, bool) else _INVALID
+    return lambda value, path, result: value
+
+
+def _compile_string(schema: Dict[str, Any]) -> Checker:
+    enum = frozenset(schema["enum"]) if "enum" in schema else None
+
+    def check(value: Any, path: Path, result: ValidationResult) -> Any:
+        if not isinstance(value, str):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return _INVALID
+            value = str(value)
+            result.repairs += 1
+        text = value.strip()
+        if not text or (enum is not None and text not in enum):
+            return _INVALID
+        return text
+
+    return check
+
+
+def _compile_number(kind: str) -> Checker:
+    def check(value: Any, path: Path, result: ValidationResult) -> Any:
+        if isinstance(value, bool):
+            return _INVALID
+        if isinstance(value, (int, float)):
+            return int(value) if kind == "integer" else value
+        try:
+            parsed = int(value) if kind == "integer" else float(value)
+        except (TypeError, ValueError):
+            return _INVALID
+        result.repairs += 1
+        return parsed
+
+    return check
+
+
+def _compile_array(schema: Dict[str, Any]) -> Checker:
+    item = _compile(schema.get("items", {}))
+    wraps_strings = schema.get("items", {}).get("type") == "string"
+    plain = wraps_strings and "enum" not in schema["items"]
+    min_items = schema.get("minItems", 0)
+    max_items = schema.get("maxItems")
+
+    def check(value: Any, path: Path, result: ValidationResult) -> Any:
+        if not isinstance(value, list):
+            # 원소 하나를 배열 대신 문자열로 준 경우 ("milestones": "...")
+            if not (wraps_strings and isinstance(value, str)):
+                return _INVALID
+            value = [value]
+            result.repairs += 1
+        out = []
+        for i, v in enumerate(value):
+            if plain and v.__class__ is str:
+                v = v.strip() or _INVALID
+            else:
+                v = item(v, path + (i,), result)
+            if v is _INVALID:
+                result.repairs += 1
+            else:
+                out.append(v)
+        if max_items is not None and len(out) > max_items:
+            del out[max_items:]
+            result.repairs += 1
+        if len(out) < min_items:
+            if len(path) > 1:
+                return _INVALID
+            # 최상위 필드면 있는 원소는 살려 두고 부족하다고만 표시 (부족한 만큼만 다시 요청할 수 있도록)
+            result.fail(path)
+        return out
+
+    return check
+
+
+def _compile_object(schema: Dict[str, Any]) -> Checker:
+    required = set(schema.get("required", ()))
+    # plain: enum 없는 문자열 필드 (가장 흔한 경우) -> 함수 호출 없이 바로 검사
+    props = [
+        (
+            key,
+            _compile(sub),
+            sub.get("type") == "string" and "enum" not in sub,
+            key in required,
+            "default" in sub,
+            sub.get("default"),
+        )
+        for key, sub in schema.get("properties", {}).items()
+    ]
+    known = {key for key, *_ in props}
+    extra = schema.get("additionalProperties", True)
+    extra_check = _compile(extra) if isinstance(extra, dict) else None
+
+    def check(value: Any, path: Path, result: ValidationResult) -> Any:
+        if not isinstance(value, dict):
+            return _INVALID
+        out: Dict[str, Any] = {}
+        valid = True
+        seen = 0
+        for key, prop, plain, is_required, has_default, default in props:
+            v = value.get(key)
+            if v is not None:
+                seen += 1
+                if plain and v.__class__ is str:
+                    v = v.strip() or _INVALID
+                else:
+                    v = prop(v, path + (key,), result)
+            if v is None or v is _INVALID:
+                if has_default:
+                    out[key] = list(default) if isinstance(default, list) else default
+                    result.repairs += 1
+                elif is_required:
+                    valid = False
+                    if not path:
+                        # 최상위의 빠진 필드는 경로를 남긴다 (그 부분만 다시 요청)
+                        result.fail((key,))
+                elif v is _INVALID:
+                    result.repairs += 1
+                continue
+            out[key] = v
+        if seen < len(value):
+            # 선언되지 않은 키 (또는 값이 null인 키)가 있을 때만
+            for key, v in value.items():
+                if key in known or v is None:
+                    continue
+                if extra_check is not None:
+                    v = extra_check(v, path + (key,), result)
+                    if v is not _INVALID:
+                        out[key] = v
+                        continue
+                elif extra is True:
+                    out[key] = v
+                    continue
+                result.repairs += 1
+        if not valid and path:
+            # 배열 원소/하위 객체면 부모가 버린다
+            return _INVALID
+        return out
+
+    return check
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], ValidationResult]:
+    """
+    validate(data) -> ValidationResult. 스키마 해석은 여기서 한 번만 한다.
+    최상위 객체는 필수 필드가 빠져도 버리지 않고 나머지를 살려서 돌려준다.
+    """
+    check = _compile(schema)
+
+    def validate(data: Any) -> ValidationResult:
+        result = ValidationResult()
+        value = check(data, (), result)
+        if value is _INVALID:
+            result.fail(())
+            value = {} if schema.get("type") == "object" else None
+        result.value = value
+        return result
+
+    return validate
+
+
+def _for_request(schema: Any) -> Any:
+    """
+    요청에 싣는 사본: 로컬 전용 키워드를 빼고, strict 모드 규칙대로 객체의 모든 필드를 required로,
+    additionalProperties는 false로 둔다. (로컬 검증은 원래 스키마의 required만 필수로 본다.
+    예: 필터 질문의 reject_options는 모델에게는 항상 쓰라고 하되, 빠져도 질문을 버리지 않음)
+    """
+    if isinstance(schema, list):
+        return [_for_request(v) for v in schema]
+    if not isinstance(schema, dict):
+        return schema
+    out = {k: _for_request(v) for k, v in schema.items() if k not in LOCAL_KEYWORDS}
+    if schema.get("type") == "object" and "properties" in schema:
+        out["properties"] = {k: _for_request(v) for k, v in schema["properties"].items()}
+        out["required"] = list(schema["properties"])
+        out["additionalProperties"] = False
+    return out
+
+
+# =========================================================
+# 단계별 응답 스키마
+# =========================================================
+class Schema:
+    """
+    name:    response_format에 싣는 스키마 이름
+    strict:  json_schema(strict)로 보낼 수 있는 스키마인지. 키가 정해지지 않은 객체
+             (why_fit의 직무명 -> 문장)는 strict로 표현할 수 없으므로 False로 두고 JSON 모드만 켠다.
+    prepare: 검증 전에 원본에 적용할 함수 (표기 정규화 등, 없으면 그대로)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        schema: Dict[str, Any],
+        strict: bool = True,
+        prepare: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.name = name
+        self.schema = schema
+        self.strict = strict
+        self.prepare = prepare
+        self._validate = compile_schema(schema)
+        self._request_schema = _for_request(schema)
+
+    def validate(self, data: Any) -> ValidationResult:
+        if self.prepare is not None:
+            data = self.prepare(data)
+        return self._validate(data)
+
+    def response_format(self, mode: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        mode = mode or RESPONSE_FORMAT
+        if mode == "json_schema" and self.strict:
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": self.name, "strict": True, "schema": self._request_schema},
+            }
+        if mode in ("json_schema", "json_object"):
+            return {"type": "json_object"}
+        return None
@@ -0,0 +1,160 @@
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+Path = Tuple[Any, ...]
+
+
+def path_matches(path: Path, pattern: Sequence[Any]) -> bool:
+    """
+    pattern의 "*"는 배열 인덱스/객체 키 아무거나와 매칭.
+    예: ("jobs", "*") -> jobs 배열의 각 원소
+    """
+    if len(path) != len(pattern):
+        return False
+    for p, q in zip(path, pattern):
+        if q != "*" and p != q:
+            return False
+    return True
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "state")
+
+    def __init__(self, kind: str):
+        self.kind = kind            # "obj" | "arr"
+        self.key: Any = 0 if kind == "arr" else None
+        self.state = "value" if kind == "arr" else "key"
+
+
+# =========================================================
+# 스트리밍 토큰용 증분 JSON 파서
+# =========================================================
+class IncrementalJSONParser:
+    """
+    토큰 조각을 feed()로 넣으면, patterns 경로에 해당하는 값이
+    문법적으로 완성되는 즉시 (path, value)로 돌려준다.
+
+    - 첫 '{' 또는 '[' 이전의 설명/```json 펜스 등은 무시
+    - 문자열 안의 중괄호/따옴표 이스케이프를 고려
+    - 지금까지 받은 전체 텍스트는 text 로 확인 가능
+    """
+
+    def __init__(self, patterns: Sequence[Sequence[Any]]):
+        self.patterns = [tuple(p) for p in patterns]
+        self.text = ""
+        self.done = False
+
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._scalar_start: Optional[int] = None
+        # (깊이, 시작 위치, 경로) : 패턴에 걸린 값이 끝나길 기다리는 중
+        self._captures: List[Tuple[int, int, Path]] = []
+
+    # -----------------------------------------------------
+    # 내부: 값 시작/끝 처리
+    # -----------------------------------------------------
+    def _current_path(self) -> Path:
+        return tuple(f.key for f in self._stack)
+
+    def _begin_value(self, i: int):
+        path = self._current_path()
+        for pattern in self.patterns:
+            if path_matches(path, pattern):
+                self._captures.append((len(self._stack), i, path))
+                break
+
+    def _end_value(self, end: int, events: List[Tuple[Path, Any]]):
+        depth = len(self._stack)
+        if self._captures and self._captures[-1][0] == depth:
+            _, start, path = self._captures.pop()
+            try:
+                events.append((path, json.loads(self.text[start:end])))
+            except ValueError:
+                pass
+        if self._stack and self._stack[-1].kind == "obj":
+            self._stack[-1].state = "comma"
+
+    # -----------------------------------------------------
+    # 공개 API
+    # -----------------------------------------------------
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        self.text += chunk
+        events: List[Tuple[Path, Any]] = []
+        text = self.text
+        i = self._pos
+        n = len(text)
+
+        while i < n and not self.done:
+            c = text[i]
+
+            if not self._started:
+                if c in "{[":
+                    self._started = True
+                    self._begin_value(i)
+                    self._stack.append(_Frame("obj" if c == "{" else "arr"))
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    frame = self._stack[-1]
+                    if frame.kind == "obj" and frame.state == "key":
+                        try:
+                            frame.key = json.loads(text[self._string_start:i + 1])
+                        except ValueError:
+                            frame.key = text[self._string_start + 1:i]
+                        frame.state = "colon"
+                    else:
+                        self._end_value(i + 1, events)
+                i += 1
+                continue
+
+            if self._scalar_start is not None:
+                if c not in ",}] \t\r\n":
+                    i += 1
+                    continue
+                self._end_value(i, events)
+                self._scalar_start = None
+                # 종료 문자(, } ])는 아래에서 다시 처리
+
+            if c in " \t\r\n":
+                pass
+            elif c == '"':
+                frame = self._stack[-1]
+                if not (frame.kind == "obj" and frame.state == "key"):
+                    self._begin_value(i)
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                self._begin_value(i)
+                self._stack.append(_Frame("obj" if c == "{" else "arr"))
+            elif c in "}]":
+                self._stack.pop()
+                self._end_value(i + 1, events)
+                if not self._stack:
+                    self.done = True
+            elif c == ":":
+                self._stack[-1].state = "value"
+            elif c == ",":
+                frame = self._stack[-1]
+                if frame.kind == "obj":
+                    frame.state = "key"
+                else:
+                    frame.key += 1
+            else:
+                self._begin_value(i)
+                self._scalar_start = i
+            i += 1
+
+        self._pos = i
+        return events
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+CACHE_DB_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "512"))
+CACHE_MEMORY_TTL = float(os.environ.get("LLM_CACHE_MEMORY_TTL", str(60 * 60)))
+CACHE_DISK_TTL = float(os.environ.get("LLM_CACHE_DISK_TTL", str(60 * 60 * 24 * 7)))
+# 디스크 단 정리: 만료 행 삭제 주기(초)와 최대 행 수(0이면 개수 제한 없음)
+CACHE_DISK_PURGE_INTERVAL = float(os.environ.get("LLM_CACHE_DISK_PURGE_INTERVAL", str(60 * 60)))
+CACHE_DISK_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_DISK_MAX_ENTRIES", "0"))
+CACHE_DISABLED = os.environ.get("LLM_CACHE_DISABLED", "") in ("1", "true", "yes")
+
+
+def make_cache_key(system: str, user: str, model: str, temperature: float) -> str:
+    """
+    (system, user, model, temperature) 내용 기반 키.
+    같은 프롬프트면 세션/프로세스가 달라도 같은 키가 나온다.
+    """
+    raw = json.dumps([system, user, model, temperature], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# =========================================================
+# 2단 캐시: 메모리 LRU(TTL) + SQLite 파일
+# =========================================================
+class ResponseCache:
+    """
+    1단: 프로세스 메모리 LRU (최대 개수 + TTL)
+    2단: SQLite 파일 (재시작 후에도 유지, 별도 TTL)
+         저장할 때 주기적으로 만료 행을 지우고, 최대 행 수를 넘으면 오래된 것부터 지운다.
+
+    Streamlit 세션 스레드 여러 개가 동시에 접근하므로 lock으로 보호한다.
+    메모리에도 JSON 문자열로 두고 get()마다 새로 파싱해 돌려준다
+    (호출한 쪽이 결과를 고쳐도 캐시/다른 세션이 받는 값은 바뀌지 않음).
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = CACHE_DB_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        memory_ttl: float = CACHE_MEMORY_TTL,
+        disk_ttl: float = CACHE_DISK_TTL,
+        disk_max_entries: int = CACHE_DISK_MAX_ENTRIES,
+        disk_purge_interval: float = CACHE_DISK_PURGE_INTERVAL,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.memory_ttl = memory_ttl
+        self.disk_ttl = disk_ttl
+        self.disk_max_entries = disk_max_entries
+        self.disk_purge_interval = disk_purge_interval
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_purge = 0.0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.write_errors = 0
+        self.disk_purged = 0
+
+    # -----------------------------------------------------
+    # SQLite 연결 (최초 사용 시 생성)
+    # -----------------------------------------------------
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path:
+            return None
+        if self._conn is None:
+            folder = os.path.dirname(self.db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " created_at REAL NOT NULL,"
+                " payload TEXT NOT NULL)"
+            )
+            # 만료/개수 정리가 전체 스캔이 되지 않도록
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def open(self):
+        """
+        SQLite 연결을 미리 만든다 (서버 예열용. 부르지 않으면 첫 조회 때 만들어짐).
+        """
+        with self._lock:
+            self._db()
+
+    def _remember(self, key: str, created_at: float, payload: str):
+        self._memory[key] = (created_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    # -----------------------------------------------------
+    # 조회 / 저장
+    # -----------------------------------------------------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                created_at, payload = item
+                if now - created_at <= self.memory_ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return json.loads(payload)
+                del self._memory[key]
+
+            conn = self._db()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT created_at, payload FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    created_at, payload = row
+                    if now - created_at <= self.disk_ttl:
+                        # 메모리 TTL은 디스크에서 다시 올라온 시점부터 센다.
+                        self._remember(key, now, payload)
+                        self.disk_hits += 1
+                        return json.loads(payload)
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        # 저장 시점의 내용으로 고정 (이후 호출한 쪽이 value를 고쳐도 캐시에는 반영되지 않음)
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, now, payload)
+            # 디스크 단은 있으면 좋은 것: 잠김/디스크 가득 참 같은 오류로 요청 자체를 실패시키지 않는다
+            try:
+                conn = self._db()
+                if conn is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, created_at, payload) VALUES (?, ?, ?)",
+                        (key, now, payload),
+                    )
+                    conn.commit()
+                    if now - self._last_purge > self.disk_purge_interval:
+                        self._last_purge = now
+                        self._purge_disk(conn, now)
+            except (sqlite3.Error, OSError):
+                self.write_errors += 1
+
+    def _purge_disk(self, conn: sqlite3.Connection, now: float):
+        # lock 안에서만 호출. 한 번도 다시 읽히지 않은 만료 행도 여기서 지워진다.
+        purged = conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.disk_ttl,)
+        ).rowcount
+        if self.disk_max_entries > 0:
+            purged += conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,),
+            ).rowcount
+        conn.commit()
+        self.disk_purged += purged
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            conn = self._db()
+            if conn is not None:
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "hits": hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "write_errors": self.write_errors,
+                "disk_purged": self.disk_purged,
+                "memory_entries": len(self._memory),
+            }
+
+
+# 프로세스 전역 캐시 (app.py는 rerun마다 다시 실행되지만 이 모듈은 한 번만 로드됨)
+response_cache = ResponseCache()
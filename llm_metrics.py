@@ -0,0 +1,388 @@
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+# Prometheus 텍스트 포맷 파일 (node_exporter textfile collector 등). 빈 값이면 파일로 쓰지 않음
+METRICS_PATH = os.environ.get("LLM_METRICS_PATH", "")
+# 0보다 크면 http://0.0.0.0:<port>/metrics 로 노출
+METRICS_PORT = int(os.environ.get("LLM_METRICS_PORT", "0"))
+# 디버그 사이드바에 보여줄 최근 호출 수
+RECENT_CALLS = int(os.environ.get("LLM_METRICS_RECENT", "50"))
+
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+# 모델별 100만 토큰당 USD (입력, 캐시된 입력, 출력). 없는 모델은 비용 0으로 집계
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+METRIC_HELP: Dict[str, Tuple[str, str]] = {
+    "llm_requests_total": ("counter", "LLM 호출 수 (status: ok/error/cancelled, source: api/cache/shared)"),
+    "llm_request_duration_seconds": ("histogram", "LLM 호출 전체 시간(초)"),
+    "llm_time_to_first_token_seconds": ("histogram", "스트리밍 호출의 첫 토큰까지 시간(초)"),
+    "llm_tokens_total": ("counter", "토큰 수 (kind: prompt/completion/cached)"),
+    "llm_retries_total": ("counter", "재시도 횟수 (스케줄러 + SDK)"),
+    "llm_parse_path_total": ("counter", "JSON 추출에 성공한 경로 (json_extract.PATH_*)"),
+    "llm_cost_usd_total": ("counter", "MODEL_PRICES 기준 추정 비용(USD)"),
+    "llm_singleflight_collapsed_total": ("counter", "진행 중인 같은 요청에 합쳐져 API를 부르지 않은 호출 수"),
+    "llm_hedges_total": ("counter", "헤지 요청 (outcome: fired/primary_won/hedge_won)"),
+    "llm_fallback_total": ("counter", "주 모델 실패로 대체 모델에 보낸 횟수 (model: 대체 모델)"),
+    "llm_schema_results_total": (
+        "counter",
+        "응답 스키마 검증 결과 (outcome: valid/repaired/invalid, json_schema.OUTCOME_*)",
+    ),
+    "llm_schema_followups_total": (
+        "counter",
+        "검증에서 빠진 부분만 다시 요청한 횟수 (kind: partial/full). 결과당 재요청 = 이 값 / valid+repaired",
+    ),
+    "llm_response_format_fallback_total": (
+        "counter",
+        "response_format을 거절해 한 단계 낮춰 다시 보낸 횟수 (model, format: 거절된 종류)",
+    ),
+    "llm_calls_outside_job_cap_total": (
+        "counter",
+        "백그라운드 작업 상한(BACKGROUND_JOB_WORKERS) 밖에서 시작한 LLM 호출 (source: prefetch/fanout/hedge)",
+    ),
+    "llm_scheduler_events_total": (
+        "counter",
+        "스케줄러 이벤트 (event: throttled/rate_limited/upstream_error/throttle_timeout/breaker_open/breaker_reject)",
+    ),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**kwargs: Any) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in kwargs.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    body = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in items)
+    return "{" + body + "}"
+
+
+# =========================================================
+# 호출 한 번의 기록
+# =========================================================
+class LLMCall:
+    """
+    track()이 돌려주는 객체. 호출 코드가 알게 되는 값을 채워 넣는다.
+    """
+
+    def __init__(self, step: str, model: str, stream: bool):
+        self.step = step
+        self.model = model
+        self.stream = stream
+        self.source = "api"
+        self.status = "ok"
+        self.error = ""
+        self.started = time.perf_counter()
+        self.wall: Optional[float] = None
+        self.ttft: Optional[float] = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.retries = 0
+        self.parse_path = ""
+        self.schema = ""
+
+    def cache_hit(self):
+        self.source = "cache"
+
+    def shared(self):
+        # 다른 세션에서 진행 중이던 같은 요청의 결과를 받음 (single_flight)
+        self.source = "shared"
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+
+    def set_retries(self, raw_response: Any):
+        """
+        with_raw_response 응답에서 SDK가 붙인 재시도 횟수 헤더를 읽어
+        스케줄러(llm_scheduler)가 센 재시도 횟수에 더한다.
+        """
+        try:
+            self.retries += int(raw_response.http_request.headers.get("x-stainless-retry-count", 0))
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+    def set_usage(self, usage: Any):
+        if usage is None:
+            return
+        self.prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+        self.completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.cached_tokens = int(getattr(details, "cached_tokens", 0) or 0)
+
+    @property
+    def cost(self) -> float:
+        price = MODEL_PRICES.get(self.model)
+        if price is None:
+            return 0.0
+        fresh = max(self.prompt_tokens - self.cached_tokens, 0)
+        return (fresh * price[0] + self.cached_tokens * price[1] + self.completion_tokens * price[2]) / 1_000_000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step,
+            "model": self.model,
+            "stream": self.stream,
+            "source": self.source,
+            "status": self.status,
+            "wall_s": round(self.wall or 0.0, 3),
+            "ttft_s": None if self.ttft is None else round(self.ttft, 3),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "retries": self.retries,
+            "parse_path": self.parse_path,
+            "schema": self.schema,
+            "cost_usd": round(self.cost, 6),
+            "error": self.error,
+        }
+
+
+class _Track:
+    def __init__(self, registry: "LLMMetrics", call: LLMCall):
+        self.registry = registry
+        self.call = call
+
+    def __enter__(self) -> LLMCall:
+        return self.call
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is GeneratorExit:
+            # 스트림을 끝까지 읽지 않고 버린 경우 (페이지 이동 등)
+            self.call.status = "cancelled"
+        elif exc_type is not None:
+            self.call.status = "error"
+            self.call.error = exc_type.__name__
+        self.registry.record(self.call)
+        return False
+
+
+# =========================================================
+# 집계 + Prometheus 텍스트 포맷
+# =========================================================
+class LLMMetrics:
+    """
+    프로세스 전역 카운터/히스토그램. Streamlit 세션 스레드끼리 공유하므로 lock으로 보호.
+    """
+
+    def __init__(self, path: str = METRICS_PATH, recent: int = RECENT_CALLS):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        # (이름, 라벨) -> [버킷별 누적 개수..., 합계, 개수]
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=recent)
+
+    def track(self, step: str, model: str, stream: bool = False) -> _Track:
+        """
+        with llm_metrics.track("roadmap", model) as call:
+            ...
+        블록을 빠져나올 때 시간/상태를 기록한다 (예외는 그대로 전파).
+        """
+        return _Track(self, LLMCall(step, model, stream))
+
+    def _inc(self, name: str, labels: Labels, value: float = 1.0):
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0.0) + value
+
+    def _observe(self, name: str, labels: Labels, value: float):
+        hist = self._histograms.get((name, labels))
+        if hist is None:
+            hist = [0.0] * (len(DURATION_BUCKETS) + 2)
+            self._histograms[(name, labels)] = hist
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                hist[i] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+    def count(self, name: str, value: float = 1.0, **labels: Any):
+        """
+        호출 한 건에 묶이지 않는 카운터 (METRIC_HELP에 등록된 이름만 내보낸다).
+        """
+        with self._lock:
+            self._inc(name, _labels(**labels), value)
+
+    def record(self, call: LLMCall):
+        call.wall = time.perf_counter() - call.started
+        base = _labels(step=call.step, model=call.model)
+
+        with self._lock:
+            self._inc("llm_requests_total", _labels(step=call.step, model=call.model, status=call.status, source=call.source))
+            self._observe("llm_request_duration_seconds", _labels(step=call.step, model=call.model, source=call.source), call.wall)
+            if call.ttft is not None and call.source == "api":
+                self._observe("llm_time_to_first_token_seconds", base, call.ttft)
+            for kind, n in (("prompt", call.prompt_tokens), ("completion", call.completion_tokens), ("cached", call.cached_tokens)):
+                if n:
+                    self._inc("llm_tokens_total", _labels(step=call.step, model=call.model, kind=kind), n)
+            if call.retries:
+                self._inc("llm_retries_total", base, call.retries)
+            if call.parse_path:
+                self._inc("llm_parse_path_total", _labels(step=call.step, path=call.parse_path))
+            if call.schema:
+                self._inc("llm_schema_results_total", _labels(step=call.step, outcome=call.schema))
+            if call.cost:
+                self._inc("llm_cost_usd_total", base, call.cost)
+            if call.source == "shared":
+                self._inc("llm_singleflight_collapsed_total", base)
+            self._recent.append(call.as_dict())
+
+        if self.path:
+            self.write_file()
+
+    # -----------------------------------------------------
+    # 내보내기
+    # -----------------------------------------------------
+    def render(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+
+        lines: List[str] = []
+        for name, (kind, help_text) in METRIC_HELP.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+                continue
+            for (n, labels), hist in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, count in zip(DURATION_BUCKETS, hist):
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {count:g}")
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {hist[-1]:g}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {hist[-2]:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {hist[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self):
+        # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def request_counts(self) -> Dict[Tuple[str, str], int]:
+        """
+        (step, source) -> 호출 수. source는 api / cache / shared.
+        """
+        counts: Dict[Tuple[str, str], int] = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                if name == "llm_requests_total":
+                    label = dict(labels)
+                    key = (label["step"], label["source"])
+                    counts[key] = counts.get(key, 0) + int(value)
+        return counts
+
+    def counter_total(self, name: str, **labels: Any) -> float:
+        """
+        name 카운터 중 labels가 모두 일치하는 값의 합 (벤치마크 보고용).
+        """
+        want = set(_labels(**labels))
+        with self._lock:
+            return sum(v for (n, l), v in self._counters.items() if n == name and want <= set(l))
+
+    def recent_calls(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        최근 호출 기준 단계별 요약 (디버그 패널용).
+        """
+        by_step: Dict[str, List[Dict[str, Any]]] = {}
+        for c in self.recent_calls():
+            by_step.setdefault(c["step"], []).append(c)
+
+        rows = []
+        for step, calls in by_step.items():
+            walls = sorted(c["wall_s"] for c in calls if c["source"] == "api" and c["status"] == "ok")
+            rows.append({
+                "step": step,
+                "calls": len(calls),
+                "cache_hits": sum(1 for c in calls if c["source"] == "cache"),
+                "shared": sum(1 for c in calls if c["source"] == "shared"),
+                "errors": sum(1 for c in calls if c["status"] == "error"),
+                "schema_repaired": sum(1 for c in calls if c["schema"] == "repaired"),
+                "schema_invalid": sum(1 for c in calls if c["schema"] == "invalid"),
+                "p50_s": walls[len(walls) // 2] if walls else None,
+                "max_s": walls[-1] if walls else None,
+                "tokens": sum(c["prompt_tokens"] + c["completion_tokens"] for c in calls),
+                "cost_usd": round(sum(c["cost_usd"] for c in calls), 6),
+            })
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._recent.clear()
+
+
+# 프로세스 전역 집계기
+llm_metrics = LLMMetrics()
+
+
+# =========================================================
+# /metrics HTTP 엔드포인트 (선택)
+# =========================================================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = llm_metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """
+    프로세스당 한 번만 띄운다 (Streamlit 재실행마다 호출돼도 안전).
+    port가 0 이하이거나 포트가 이미 쓰이고 있으면 띄우지 않는다.
+    """
+    global _server
+    if port <= 0:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,416 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set
+
+from openai import NOT_GIVEN, APIConnectionError, BadRequestError, InternalServerError, OpenAI, RateLimitError
+
+from json_extract import extract_json_object
+from llm_metrics import llm_metrics
+from llm_scheduler import STEP_TIMEOUTS, UpstreamBusyError, llm_scheduler
+from prompt_compact import max_tokens_for
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+# 단계별 모델: LLM_MODEL_<STEP> > LLM_MODEL > gpt-4o-mini
+DEFAULT_MODEL = os.environ.get("LLM_MODEL", "gpt-4o-mini")
+# 주 모델이 한도/장애로 실패했을 때 한 번 더 보내 볼 모델: LLM_FALLBACK_MODEL_<STEP> > LLM_FALLBACK_MODEL
+DEFAULT_FALLBACK_MODEL = os.environ.get("LLM_FALLBACK_MODEL", "")
+
+# 헤지(중복 요청)를 쓰는 단계. 첫 토큰이 최근 지연의 HEDGE_PERCENTILE 분위수 안에 안 오면 한 번 더 보낸다.
+# 헤지는 작업 상한 밖에서 호출을 늘리므로 기본은 끔. 켜려면 쉼표로 단계 나열 (예: LLM_HEDGE_STEPS=roadmap)
+HEDGE_STEPS = {s.strip() for s in os.environ.get("LLM_HEDGE_STEPS", "").split(",") if s.strip()}
+HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", "95"))
+# 표본이 HEDGE_MIN_SAMPLES 개 모이기 전에는 고정 지연(초)을 쓴다
+HEDGE_MIN_SAMPLES = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_DEFAULT_DELAY = float(os.environ.get("LLM_HEDGE_DELAY", "3.0"))
+HEDGE_WINDOW = int(os.environ.get("LLM_HEDGE_WINDOW", "200"))
+
+# 대체 모델로 넘길 만한 실패 (요청 내용이 아니라 한도/업스트림 상태 때문)
+FALLBACK_ERRORS = (UpstreamBusyError, RateLimitError, InternalServerError, APIConnectionError)
+
+
+def _step_env(name: str, step: str, default: str) -> str:
+    return os.environ.get(f"{name}_{step.upper()}") or default
+
+
+class StepRoute:
+    """
+    단계 하나의 호출 설정: 모델, 전체 시간 한도(초), 대체 모델, 헤지 여부
+    """
+
+    def __init__(self, step: str, model: str, timeout: float, fallback: str = "", hedge: bool = False):
+        self.step = step
+        self.model = model
+        self.timeout = timeout
+        self.fallback = fallback if fallback != model else ""
+        self.hedge = hedge
+
+    def models(self) -> List[str]:
+        return [self.model] + ([self.fallback] if self.fallback else [])
+
+
+ROUTES: Dict[str, StepRoute] = {
+    step: StepRoute(
+        step,
+        model=_step_env("LLM_MODEL", step, DEFAULT_MODEL),
+        timeout=timeout,
+        fallback=_step_env("LLM_FALLBACK_MODEL", step, DEFAULT_FALLBACK_MODEL),
+        hedge=step in HEDGE_STEPS,
+    )
+    for step, timeout in STEP_TIMEOUTS.items()
+}
+
+
+def route_for(step: str) -> StepRoute:
+    return ROUTES.get(step) or ROUTES["other"]
+
+
+def estimate_tokens(messages: List[Dict[str, str]], step: str) -> int:
+    """
+    토큰 버킷에 미리 잡아 둘 양: 프롬프트(한글 기준 대략 2글자당 1토큰) + 출력 상한.
+    응답의 usage로 나중에 정산한다.
+    """
+    return sum(len(m["content"]) for m in messages) // 2 + (max_tokens_for(step) or 1000)
+
+
+# =========================================================
+# 단계별 최근 첫 토큰 지연 (헤지 시점 계산용)
+# =========================================================
+class FirstTokenLatency:
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, step: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(step, deque(maxlen=self.window)).append(seconds)
+
+    def hedge_delay(self, step: str) -> float:
+        with self._lock:
+            samples = sorted(self._samples.get(step, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        k = min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE / 100))
+        return samples[k]
+
+
+first_token_latency = FirstTokenLatency()
+
+
+# =========================================================
+# 요청 경주 (헤지): 스트림 하나당 스레드 하나
+# =========================================================
+class _Attempt:
+    def __init__(self, index: int, model: str):
+        self.index = index
+        self.model = model
+        self.started = time.perf_counter()
+        self.raw: Any = None
+        self.stream: Any = None
+        self.usage: Any = None
+        self.parts: List[str] = []
+        self.finished = False
+        self.cancelled = threading.Event()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def close(self):
+        # 진 쪽 스트림을 닫아 응답 읽기를 멈춘다 (읽던 스레드는 예외로 빠져나옴)
+        self.cancelled.set()
+        stream = self.stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+class _AttemptClosed(Exception):
+    """
+    경주가 끝나 닫힌 요청이 스케줄러 대기/백오프에서 깨어났을 때 보내지 않고 빠져나오는 용도.
+    """
+
+
+def _pump(attempt: _Attempt, open_stream: Callable[[_Attempt], Any], events: "queue.Queue"):
+    try:
+        attempt.raw = open_stream(attempt)
+        attempt.stream = attempt.raw.parse()
+        if attempt.cancelled.is_set():
+            attempt.close()
+            return
+        for chunk in attempt.stream:
+            if attempt.cancelled.is_set():
+                return
+            # include_usage: 마지막 청크는 choices 없이 usage만 담겨 온다
+            if chunk.usage is not None:
+                attempt.usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                events.put((attempt, "delta", chunk.choices[0].delta.content))
+        events.put((attempt, "done", None))
+    except Exception as e:
+        if not attempt.cancelled.is_set():
+            events.put((attempt, "error", e))
+
+
+def _race(
+    step: str,
+    model: str,
+    open_stream: Callable[[_Attempt], Any],
+    call: Any,
+    hedge: bool,
+    can_hedge: Callable[[], bool],
+    commit_on_first_token: bool,
+) -> Iterator[str]:
+    """
+    commit_on_first_token=True  (화면에 흘려보내는 스트림):
+        첫 토큰을 먼저 낸 요청이 이기고, 그 요청의 조각을 그대로 내보낸다.
+    commit_on_first_token=False (JSON 한 번에 받기):
+        먼저 끝난 요청 중 JSON이 유효한 것이 이기고, 전체 텍스트를 한 번에 내보낸다.
+    어느 쪽이든 이긴 요청이 정해지면 나머지는 닫는다.
+    """
+    events: "queue.Queue" = queue.Queue()
+    attempts: List[_Attempt] = []
+
+    def launch():
+        attempt = _Attempt(len(attempts), model)
+        attempts.append(attempt)
+        threading.Thread(
+            target=_pump, args=(attempt, open_stream, events), daemon=True, name=f"llm-{step}-{attempt.index}"
+        ).start()
+
+    launch()
+    hedge_at = time.perf_counter() + first_token_latency.hedge_delay(step) if hedge else None
+    winner: Optional[_Attempt] = None
+    errors: List[Exception] = []
+
+    def win(attempt: _Attempt):
+        nonlocal winner
+        winner = attempt
+        call.model = attempt.model
+        for other in attempts:
+            if other is not attempt:
+                other.close()
+        if len(attempts) > 1:
+            llm_metrics.count("llm_hedges_total", step=step, outcome="hedge_won" if attempt.index else "primary_won")
+
+    def finish(attempt: _Attempt):
+        call.set_retries(attempt.raw)
+        call.set_usage(attempt.usage)
+
+    try:
+        while True:
+            timeout = None if hedge_at is None else max(hedge_at - time.perf_counter(), 0.0)
+            try:
+                attempt, kind, value = events.get(timeout=timeout)
+            except queue.Empty:
+                hedge_at = None
+                if can_hedge():
+                    llm_metrics.count("llm_hedges_total", step=step, outcome="fired")
+                    llm_metrics.count("llm_calls_outside_job_cap_total", source="hedge")
+                    launch()
+                continue
+
+            if winner is not None and attempt is not winner:
+                continue
+
+            if kind == "delta":
+                if not attempt.parts:
+                    first_token_latency.observe(step, time.perf_counter() - attempt.started)
+                    call.first_token()
+                    # 첫 토큰이 왔으면 더 헤지하지 않는다
+                    hedge_at = None
+                attempt.parts.append(value)
+                if commit_on_first_token:
+                    if winner is None:
+                        win(attempt)
+                    yield value
+                continue
+
+            attempt.finished = True
+            if kind == "error":
+                if attempt is winner:
+                    raise value
+                errors.append(value)
+            elif commit_on_first_token or extract_json_object(attempt.text)[0]:
+                if winner is None:
+                    win(attempt)
+                finish(attempt)
+                if not commit_on_first_token:
+                    yield attempt.text
+                return
+
+            if all(a.finished for a in attempts):
+                # 모두 끝났는데 유효한 JSON이 없음: 텍스트가 있는 쪽을 돌려주고(호출 측에서 {} 처리), 없으면 첫 오류
+                done = [a for a in attempts if a.parts]
+                if done:
+                    win(done[0])
+                    finish(done[0])
+                    yield done[0].text
+                    return
+                raise errors[0]
+    finally:
+        for attempt in attempts:
+            if not attempt.finished or attempt is not winner:
+                attempt.close()
+
+
+# =========================================================
+# response_format (json_schema.Schema.response_format)
+# =========================================================
+# 모델별로 거절당한(400) response_format 종류. 프로세스가 도는 동안은 다시 싣지 않는다.
+_format_unsupported: Dict[str, Set[str]] = {}
+_format_lock = threading.Lock()
+
+
+def _create(client: OpenAI, response_format: Optional[Dict[str, Any]], **kwargs: Any) -> Any:
+    """
+    response_format을 실어 보내고, 백엔드/모델이 지원하지 않는다고 거절하면(400) 기억해 두고
+    json_schema -> json_object -> 없음 순으로 낮춰 다시 보낸다 (형식은 pipeline의 로컬 검증기가 어차피 확인한다).
+    """
+    create = client.chat.completions.with_raw_response.create
+    model = kwargs.get("model", "")
+    while response_format is not None:
+        kind = response_format["type"]
+        if kind not in _format_unsupported.get(model, ()):
+            try:
+                return create(response_format=response_format, **kwargs)
+            except BadRequestError as e:
+                if "response_format" not in str(e) and kind not in str(e):
+                    raise
+                with _format_lock:
+                    _format_unsupported.setdefault(model, set()).add(kind)
+                llm_metrics.count("llm_response_format_fallback_total", model=model, format=kind)
+        response_format = {"type": "json_object"} if kind == "json_schema" else None
+    return create(**kwargs)
+
+
+# =========================================================
+# 공개 API: 단계별 모델 + 대체 모델 + (선택) 헤지
+# =========================================================
+def stream_text(
+    client: OpenAI,
+    step: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    api_key: Optional[str],
+    call: Any,
+    model: Optional[str] = None,
+    commit_on_first_token: bool = True,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """
+    스트리밍으로 받은 텍스트 조각을 내보낸다.
+    아무것도 내보내기 전에 주 모델이 한도/장애로 실패하면 대체 모델로 한 번 더 보낸다.
+    """
+    route = route_for(step)
+    models = [model] if model and model not in route.models() else route.models()
+    estimated = estimate_tokens(messages, step)
+
+    for i, current in enumerate(models):
+        def open_stream(attempt: _Attempt) -> Any:
+            def send(timeout: float) -> Any:
+                # 진 쪽이 백오프 중이었다면 경주가 끝난 뒤에 보내지 않는다
+                if attempt.cancelled.is_set():
+                    raise _AttemptClosed()
+                return _create(
+                    client,
+                    response_format,
+                    model=attempt.model,
+                    temperature=temperature,
+                    max_tokens=max_tokens_for(step) or NOT_GIVEN,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    messages=messages,
+                    timeout=timeout,
+                )
+
+            return llm_scheduler.run(
+                step,
+                api_key,
+                send,
+                estimated,
+                call if attempt.index == 0 else None,
+                model=attempt.model,
+                timeout=route.timeout,
+            )
+
+        def can_hedge() -> bool:
+            # 한도가 빠듯할 때 헤지는 다른 사용자의 몫을 뺏으므로 바로 보낼 수 있을 때만
+            return llm_scheduler.has_capacity(api_key, current, estimated)
+
+        yielded = False
+        try:
+            for piece in _race(step, current, open_stream, call, route.hedge, can_hedge, commit_on_first_token):
+                yielded = True
+                yield piece
+        except FALLBACK_ERRORS:
+            if yielded or i == len(models) - 1:
+                raise
+            llm_metrics.count("llm_fallback_total", step=step, model=models[i + 1])
+            continue
+        llm_scheduler.settle(api_key, estimated, call.prompt_tokens + call.completion_tokens, model=call.model)
+        return
+
+
+def complete_text(
+    client: OpenAI,
+    step: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    api_key: Optional[str],
+    call: Any,
+    model: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    응답 전체 텍스트. 헤지 단계면 스트림 경주로, 아니면 일반 요청으로 받는다.
+    """
+    route = route_for(step)
+    if route.hedge:
+        return "".join(stream_text(
+            client, step, messages, temperature, api_key, call, model,
+            commit_on_first_token=False, response_format=response_format,
+        ))
+
+    models = [model] if model and model not in route.models() else route.models()
+    estimated = estimate_tokens(messages, step)
+    for i, current in enumerate(models):
+        try:
+            raw = llm_scheduler.run(
+                step,
+                api_key,
+                lambda timeout: _create(
+                    client,
+                    response_format,
+                    model=current,
+                    temperature=temperature,
+                    max_tokens=max_tokens_for(step) or NOT_GIVEN,
+                    messages=messages,
+                    timeout=timeout,
+                ),
+                estimated,
+                call,
+                model=current,
+                timeout=route.timeout,
+            )
+        except FALLBACK_ERRORS:
+            if i == len(models) - 1:
+                raise
+            llm_metrics.count("llm_fallback_total", step=step, model=models[i + 1])
+            continue
+
+        resp = raw.parse()
+        call.model = current
+        call.set_retries(raw)
+        call.set_usage(resp.usage)
+        llm_scheduler.settle(api_key, estimated, call.prompt_tokens + call.completion_tokens, model=current)
+        return resp.choices[0].message.content or ""
+    return ""
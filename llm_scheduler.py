@@ -0,0 +1,376 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from client_pool import hash_api_key
+from llm_metrics import llm_metrics
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+SCHEDULER_DISABLED = os.environ.get("LLM_SCHEDULER_DISABLED", "") in ("1", "true", "yes")
+# API 키 하나당 분당 요청 수 / 분당 토큰 수 (OpenAI 조직 한도보다 약간 낮게, 0이면 제한 없음)
+KEY_RPM = float(os.environ.get("LLM_KEY_RPM", "450"))
+KEY_TPM = float(os.environ.get("LLM_KEY_TPM", "180000"))
+MAX_ATTEMPTS = int(os.environ.get("LLM_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE = float(os.environ.get("LLM_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("LLM_BACKOFF_MAX", "20"))
+# 연속 실패(5xx/타임아웃/연결 오류)가 이만큼이면 차단, 쿨다운 뒤 한 건만 시험 통과
+BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("LLM_BREAKER_COOLDOWN", "30"))
+# 이 시간(초) 동안 안 쓰인 (API 키, 모델) 버킷은 버린다 (다시 오면 가득 찬 새 버킷 = 같은 상태)
+LIMITER_IDLE_TTL = float(os.environ.get("LLM_LIMITER_IDLE_TTL", str(10 * 60)))
+
+# 단계별 전체 시간 한도(초): 대기 + 재시도 + 응답을 모두 포함 (LLM_TIMEOUT_<STEP>)
+STEP_TIMEOUTS: Dict[str, float] = {
+    step: float(os.environ.get(f"LLM_TIMEOUT_{step.upper()}", default))
+    for step, default in {"recommend": 90, "why_fit": 45, "filter": 45, "roadmap": 90, "other": 60}.items()
+}
+
+
+class UpstreamBusyError(RuntimeError):
+    """
+    한도/장애 때문에 시간 안에 요청을 보내지 못함. retry_after: 다시 시도해 볼 만한 시점까지 초.
+    """
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(e: Exception) -> Optional[float]:
+    """
+    429 응답 헤더의 retry-after-ms / retry-after(초) 값.
+    """
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return max(float(headers.get(name)) * scale, 0.0)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+# =========================================================
+# 토큰 버킷
+# =========================================================
+class TokenBucket:
+    """
+    rate: 초당 채워지는 양, capacity: 최대 적립량 (= 한 번에 허용되는 버스트)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        # lock은 호출 측(KeyLimiter)이 잡는다
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class KeyLimiter:
+    """
+    API 키 하나의 요청/토큰 버킷 + 429로 받은 Retry-After 차단 시각.
+    같은 키를 쓰는 세션 모두가 함께 기다리므로 429 뒤에 한꺼번에 다시 몰리지 않는다.
+    """
+
+    def __init__(self, rpm: float, tpm: float):
+        # 0 이하이면 그 한도는 두지 않는다 (429 Retry-After 차단만 적용)
+        self.requests = TokenBucket(rpm / 60.0, max(rpm / 60.0 * 5, 1.0)) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm / 60.0, tpm / 60.0 * 5) if tpm > 0 else None
+        self.blocked_until = 0.0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float, deadline: float) -> bool:
+        """
+        요청 1건 + tokens 만큼을 받을 때까지 기다린다. deadline 안에 못 받으면 False.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                wait = max(
+                    self.blocked_until - now,
+                    self.requests.wait_time(1, now) if self.requests else 0.0,
+                    self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+                )
+                if wait <= 0:
+                    if self.requests:
+                        self.requests.take(1)
+                    if self.tokens:
+                        self.tokens.take(tokens)
+                    return True
+            if now + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def wait_time(self, tokens: float) -> float:
+        with self.lock:
+            now = time.monotonic()
+            return max(
+                self.blocked_until - now,
+                self.requests.wait_time(1, now) if self.requests else 0.0,
+                self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+            )
+
+    def block_for(self, seconds: float):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def settle(self, estimated: float, used: float):
+        # 추정보다 적게 썼으면 돌려주고, 많이 썼으면 더 뺀다
+        if self.tokens is None:
+            return
+        with self.lock:
+            if used < estimated:
+                self.tokens.give_back(estimated - used)
+            else:
+                self.tokens.take(used - estimated)
+
+
+# =========================================================
+# 서킷 브레이커 (모델별)
+# =========================================================
+class CircuitBreaker:
+    """
+    closed    : 정상
+    open      : 연속 실패가 한도를 넘음 -> cooldown 동안 바로 실패
+    half_open : cooldown이 지나 시험 요청 한 건만 통과, 성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.max_failures = failures
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> Tuple[bool, float]:
+        """
+        반환: (보내도 되는지, 안 되면 남은 쿨다운 초)
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True, 0.0
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                return False, remaining
+            if self.probing:
+                return False, 1.0
+            self.state = "half_open"
+            self.probing = True
+            return True, 0.0
+
+    def allow_peek(self) -> bool:
+        # allow()와 달리 상태를 바꾸지 않는다 (시험 요청 자리를 차지하지 않음)
+        with self._lock:
+            return self.state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == "half_open" or self.failures >= self.max_failures:
+                if self.state != "open":
+                    llm_metrics.count("llm_scheduler_events_total", event="breaker_open")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        # 시험 요청이 업스트림 상태와 무관하게 끝남 (400 등): 다음 요청이 다시 시험하도록
+        with self._lock:
+            if self.state == "half_open":
+                self.probing = False
+
+
+# =========================================================
+# 스케줄러: 모든 LLM 호출이 이곳을 지난다
+# =========================================================
+class LLMScheduler:
+    """
+    - API 키별 토큰 버킷(요청/토큰)으로 보내기 전에 속도 조절
+    - 429: Retry-After(없으면 지수 백오프+지터)만큼 그 키 전체를 잠시 멈춘 뒤 재시도
+    - 5xx/타임아웃/연결 오류: 지수 백오프+지터로 재시도, 서킷 브레이커에 실패로 기록
+    - 단계별 전체 시간 한도(STEP_TIMEOUTS) 안에서만 기다리고 재시도
+    - 그 밖의 오류(400/401 등)는 재시도 없이 그대로 전파
+    """
+
+    def __init__(
+        self,
+        rpm: float = KEY_RPM,
+        tpm: float = KEY_TPM,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        limiter_idle_ttl: float = LIMITER_IDLE_TTL,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter_idle_ttl = limiter_idle_ttl
+        self._lock = threading.Lock()
+        self._limiters: Dict[Tuple[str, str], KeyLimiter] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._last_sweep = time.monotonic()
+        self.limiters_evicted = 0
+
+    def limiter(self, api_key: Optional[str], model: str = "") -> KeyLimiter:
+        # OpenAI 한도는 키(조직) + 모델 단위
+        key = (hash_api_key(api_key), model)
+        now = time.monotonic()
+        with self._lock:
+            # 사용자가 각자 키를 넣으므로 키마다 버킷이 쌓인다 -> 가끔 한 번씩 안 쓰인 것을 정리
+            if now - self._last_sweep > min(self.limiter_idle_ttl, 60.0):
+                self._evict_idle(now)
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = KeyLimiter(self.rpm, self.tpm)
+                self._limiters[key] = limiter
+            limiter.last_used = now
+            return limiter
+
+    def _evict_idle(self, now: float):
+        # lock 안에서만 호출. 429 차단이 남아 있는 버킷은 남긴다
+        self._last_sweep = now
+        for key, limiter in list(self._limiters.items()):
+            if now - limiter.last_used > self.limiter_idle_ttl and limiter.blocked_until <= now:
+                del self._limiters[key]
+                self.limiters_evicted += 1
+
+    def breaker(self, model: str = "") -> CircuitBreaker:
+        # 장애는 모델별로 따로 온다 (한 모델이 나빠도 대체 모델은 보낼 수 있게)
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = CircuitBreaker()
+                self._breakers[model] = breaker
+            return breaker
+
+    def has_capacity(self, api_key: Optional[str], model: str, tokens: float) -> bool:
+        """
+        기다리지 않고 바로 보낼 수 있는지 (헤지 요청처럼 한도가 빠듯하면 보내지 않을 요청용).
+        """
+        if SCHEDULER_DISABLED:
+            return True
+        if not self.breaker(model).allow_peek():
+            return False
+        return self.limiter(api_key, model).wait_time(tokens) <= 0
+
+    def backoff(self, attempt: int) -> float:
+        # full jitter: 0 ~ base * 2^attempt
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def run(
+        self,
+        step: str,
+        api_key: Optional[str],
+        send: Callable[[float], Any],
+        est_tokens: float,
+        call: Any = None,
+        model: str = "",
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        send(timeout): 실제 요청 함수. 남은 시간 한도를 요청 timeout으로 받는다.
+        call: llm_metrics.LLMCall (재시도 횟수를 채워 넣음)
+        timeout: 전체 시간 한도 (없으면 STEP_TIMEOUTS[step])
+        """
+        # 요청을 보낼 때는 이미 SDK가 로드돼 있다 (app.py가 1페이지에서 SDK를 import하지 않도록 여기서 가져옴)
+        from openai import APIConnectionError, InternalServerError, RateLimitError
+
+        if timeout is None:
+            timeout = STEP_TIMEOUTS.get(step, STEP_TIMEOUTS["other"])
+        if SCHEDULER_DISABLED:
+            return send(timeout)
+
+        limiter = self.limiter(api_key, model)
+        breaker = self.breaker(model)
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            allowed, retry_in = breaker.allow()
+            if not allowed:
+                llm_metrics.count("llm_scheduler_events_total", event="breaker_reject", step=step)
+                raise UpstreamBusyError("OpenAI 응답이 불안정해 잠시 요청을 멈췄어요.", retry_in)
+
+            t0 = time.monotonic()
+            if not limiter.acquire(est_tokens, deadline):
+                breaker.release_probe()
+                llm_metrics.count("llm_scheduler_events_total", event="throttle_timeout", step=step)
+                raise UpstreamBusyError("요청이 몰려 순서를 기다리다 시간이 다 됐어요.", 5.0)
+            if time.monotonic() - t0 > 0.05:
+                llm_metrics.count("llm_scheduler_events_total", event="throttled", step=step)
+
+            try:
+                result = send(max(deadline - time.monotonic(), 1.0))
+            except RateLimitError as e:
+                wait = retry_after_seconds(e)
+                wait = self.backoff(attempt) if wait is None else wait + random.uniform(0, 0.25 * wait + 0.1)
+                limiter.block_for(wait)
+                breaker.release_probe()
+                event = "rate_limited"
+                error: Exception = e
+            except (InternalServerError, APIConnectionError) as e:
+                # APITimeoutError는 APIConnectionError의 하위 클래스
+                wait = self.backoff(attempt)
+                breaker.record_failure()
+                event = "upstream_error"
+                error = e
+            except BaseException:
+                breaker.release_probe()
+                raise
+            else:
+                breaker.record_success()
+                return result
+
+            attempt += 1
+            llm_metrics.count("llm_scheduler_events_total", event=event, step=step)
+            if attempt >= self.max_attempts or time.monotonic() + wait >= deadline:
+                raise error
+            if call is not None:
+                call.retries = attempt
+            time.sleep(wait)
+
+    def settle(self, api_key: Optional[str], estimated: float, used: float, model: str = ""):
+        if not SCHEDULER_DISABLED and used:
+            self.limiter(api_key, model).settle(estimated, used)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            keys = len(self._limiters)
+            breakers = {model: b.state for model, b in self._breakers.items()}
+            evicted = self.limiters_evicted
+        return {"limiters": keys, "limiters_evicted": evicted, "breakers": breakers}
+
+
+# 프로세스 전역 스케줄러
+llm_scheduler = LLMScheduler()
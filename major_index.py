@@ -0,0 +1,157 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
+
+
+# =========================================================
+# 전공 자유 입력 -> 표준 전공 (번들 사전 + 글자 n-gram 근사 매칭)
+# =========================================================
+MAJORS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "majors.json")
+
+# 근사 매칭으로 인정하는 최소 유사도 (글자 2-gram Dice 계수, 0~1)
+FUZZY_THRESHOLD = float(os.environ.get("MAJOR_FUZZY_THRESHOLD", "0.6"))
+
+_NON_WORD = re.compile(r"[\s()/·,.\-_&+]+")
+# "컴퓨터공학과" / "경영학부" / "경영학 전공" 처럼 붙는 꼬리 (하나만 뗀다)
+_SUFFIXES = ("학과", "학부", "전공", "계열", "과")
+
+
+def normalize_major(text: str) -> str:
+    """
+    비교용 키: 전각/반각 통일, 소문자, 공백/구두점 제거.
+    예) " Computer  Science " -> "computerscience"
+    """
+    text = unicodedata.normalize("NFKC", str(text or "")).lower()
+    return _NON_WORD.sub("", text)
+
+
+def major_keys(text: str) -> List[str]:
+    """
+    조회 키 후보: 정규화한 입력, 학과/학부/전공 같은 꼬리를 뗀 형태, 끝의 "학"을 뗀 형태.
+    사전의 이름/별칭도 같은 규칙으로 넣으므로 "산업디자인학과"와 "산업디자인"이 만난다.
+    """
+    key = normalize_major(text)
+    if not key:
+        return []
+    keys = [key]
+    for suffix in _SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix) + 1:
+            key = key[: -len(suffix)]
+            keys.append(key)
+            break
+    # "의학" -> "의" 처럼 너무 짧아지는 경우는 제외
+    if key.endswith("학") and len(key) > 2:
+        keys.append(key[:-1])
+    return keys
+
+
+def ngrams(key: str) -> Set[str]:
+    # 한 글자 입력("법")도 찾을 수 있도록 짧은 키는 그대로 쓴다
+    if len(key) < 2:
+        return {key} if key else set()
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+class MajorIndex:
+    """
+    majors:   전공 코드 -> {code, name, field, aliases}
+    _by_key:  정규화한 이름/별칭 -> 코드 (정확 매칭)
+    _postings: 2-gram -> 그 2-gram을 가진 키 목록 (근사 매칭 후보를 좁힘)
+    """
+
+    def __init__(self, data: Dict[str, Any], threshold: float = FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self.majors: Dict[str, Dict[str, Any]] = {}
+        self._by_key: Dict[str, str] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, List[str]] = {}
+
+        for major in data.get("majors", []):
+            self.majors[major["code"]] = major
+            for name in [major["name"], *major.get("aliases", [])]:
+                for key in major_keys(name):
+                    self._by_key.setdefault(key, major["code"])
+
+        for key in self._by_key:
+            grams = ngrams(key)
+            self._grams[key] = grams
+            for g in grams:
+                self._postings.setdefault(g, []).append(key)
+
+    def lookup(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        반환: {code, name, field, score, method: exact/fuzzy} 또는 못 찾으면 None.
+        """
+        keys = major_keys(text)
+        for key in keys:
+            code = self._by_key.get(key)
+            if code:
+                return self._result(code, 1.0, "exact")
+        if not keys:
+            return None
+
+        # 근사 매칭: 입력과 2-gram을 공유하는 키만 세어 Dice 계수가 가장 높은 것
+        grams = ngrams(keys[-1])
+        overlap: Counter = Counter()
+        for g in grams:
+            for key in self._postings.get(g, ()):
+                overlap[key] += 1
+        best_key, best_score = "", 0.0
+        for key, shared in overlap.items():
+            score = 2 * shared / (len(grams) + len(self._grams[key]))
+            if score > best_score or (score == best_score and len(key) < len(best_key)):
+                best_key, best_score = key, score
+        if best_score >= self.threshold:
+            return self._result(self._by_key[best_key], round(best_score, 3), "fuzzy")
+        return None
+
+    def _result(self, code: str, score: float, method: str) -> Dict[str, Any]:
+        major = self.majors[code]
+        return {"code": code, "name": major["name"], "field": major["field"], "score": score, "method": method}
+
+
+_index: Optional[MajorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_major_index() -> MajorIndex:
+    """
+    인덱스는 처음 쓸 때 한 번만 읽는다 (프로세스 전역).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                with open(MAJORS_PATH, encoding="utf-8") as f:
+                    _index = MajorIndex(json.load(f))
+    return _index
+
+
+@lru_cache(maxsize=4096)
+def match_major(text: str) -> Optional[Dict[str, Any]]:
+    return get_major_index().lookup(text)
+
+
+def canonical_major(text: str) -> str:
+    """
+    프롬프트/캐시 키에 쓰는 전공 이름. 사전에 있으면 표준 이름,
+    없으면 공백만 정리한 입력 그대로 (화면에는 항상 사용자가 쓴 원문을 보여준다).
+    """
+    match = match_major(str(text or "").strip())
+    if match is not None:
+        return match["name"]
+    return " ".join(str(text or "").split())
+
+
+def canonical_answers(user_answers: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    전공만 표준 이름으로 바꾼 답변 사본 (같은 전공의 다른 표기가 같은 키가 되도록).
+    """
+    if "major" not in user_answers:
+        return user_answers
+    return {**user_answers, "major": canonical_major(user_answers["major"])}
@@ -0,0 +1,944 @@
+import json
+import os
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence, Tuple
+
+# OpenAI (최신 SDK 기준)
+from openai import AuthenticationError, OpenAI, PermissionDeniedError
+
+from background_jobs import JobCancelled, bind_current_job, check_cancelled
+from client_pool import client_pool
+from json_extract import extract_json_object
+from json_schema import OUTCOME_REPAIRED, Schema, compile_schema
+from job_similarity import dedupe_jobs, is_near_duplicate, resolve_titles
+from json_stream import IncrementalJSONParser, Path
+from llm_cache import CACHE_DISABLED, make_cache_key, response_cache
+from llm_metrics import llm_metrics
+from llm_router import complete_text, route_for, stream_text
+from prompt_compact import compact_job_lines, encode_answers_compact
+from requirements_index import get_requirement_index
+from single_flight import SINGLE_FLIGHT_DISABLED, WaitTimeout, single_flight
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+# 로드맵을 기간별 + 리소스 요청으로 나눠 동시에 보냄 (전체 시간 ≈ 가장 느린 구간)
+# 요청 수가 1 -> 4개로 늘어나므로 키당 분당 요청 한도(LLM_KEY_RPM)가 빠듯하면 끈다.
+ROADMAP_FANOUT = os.environ.get("ROADMAP_FANOUT", "0") in ("1", "true", "yes")
+ROADMAP_FANOUT_WORKERS = int(os.environ.get("ROADMAP_FANOUT_WORKERS", "32"))
+# LLM 직무 추천에서 스키마를 통과한 직무가 이보다 적으면 모자란 만큼만 더 요청
+RECOMMEND_MIN_JOBS = int(os.environ.get("RECOMMEND_MIN_JOBS", "6"))
+
+
+# =========================================================
+# OpenAI 유틸
+# (Streamlit 세션 없이도 쓸 수 있도록 api_key는 항상 인자로 받음)
+# =========================================================
+def get_client(api_key: Optional[str] = None) -> OpenAI:
+    """
+    API 키별로 풀에 보관된 클라이언트를 재사용 (keep-alive 커넥션 공유).
+    api_key가 None이면 OpenAI SDK 기본값(OPENAI_API_KEY 환경변수)을 사용.
+    """
+    return client_pool.get(api_key)
+
+
+def safe_json_extract(text: str) -> dict:
+    """
+    모델이 JSON만 반환하라고 해도 가끔 설명이 섞임.
+    JSON 블록만 추출해서 파싱하려는 안전장치.
+    (어떤 복구 경로를 탔는지는 json_extract.extract_json_object 참고)
+    """
+    data, _ = extract_json_object(text)
+    return data
+
+
+def is_shared_error(e: Exception) -> bool:
+    """
+    같은 요청을 기다리던 다른 세션에도 넘겨도 되는 실패인지.
+    API 키 문제(401/403)는 leader의 키 탓이므로 follower는 자기 키로 다시 시도해야 한다.
+    """
+    return not isinstance(e, (AuthenticationError, PermissionDeniedError))
+
+
+def check_schema(
+    data: dict, schema: Optional[Schema], repair: Optional[Callable[[dict], dict]], call: Any
+) -> Tuple[dict, bool]:
+    """
+    스키마로 검증/교정하고, 필수 부분이 빠졌으면 repair로 그 부분만 다시 요청해 채운다.
+    반환: (결과, 완전한지). 결과(valid/repaired/invalid)는 call.schema로 계측된다.
+    """
+    if schema is None:
+        return data, True
+    result = schema.validate(data)
+    data = result.value
+    call.schema = result.outcome
+    if result.ok or repair is None:
+        return data, result.ok
+    try:
+        repaired = schema.validate(repair(data))
+    except JobCancelled:
+        raise
+    except Exception:
+        # 보충 요청이 실패하면 있는 부분만 돌려준다 (캐시하지 않으므로 다음 클릭에서 다시 시도)
+        return data, False
+    if repaired.ok:
+        call.schema = OUTCOME_REPAIRED
+        return repaired.value, True
+    return repaired.value, False
+
+
+def openai_chat_json(
+    system: str,
+    user: str,
+    model: Optional[str] = None,
+    temperature: float = 0.6,
+    use_cache: bool = True,
+    api_key: Optional[str] = None,
+    step: str = "other",
+    schema: Optional[Schema] = None,
+    repair: Optional[Callable[[dict], dict]] = None,
+) -> dict:
+    """
+    같은 (system, user, model, temperature)는 캐시에서 바로 반환.
+    use_cache=False 또는 LLM_CACHE_DISABLED=1 이면 캐시를 건너뛰고 항상 새로 호출.
+    캐시에 없고 같은 요청이 다른 세션에서 진행 중이면 새로 보내지 않고 그 결과를 기다린다 (single_flight).
+    step은 계측(llm_metrics) 라벨이자 단계별 설정 키:
+    recommend / why_fit / filter / roadmap
+    (모델/대체 모델/시간 한도/헤지는 llm_router.ROUTES, 출력 토큰 상한은 prompt_compact.OUTPUT_TOKEN_BUDGETS)
+    model을 주지 않으면 단계별 모델을 쓴다.
+    schema를 주면 response_format으로 싣고, 받은 결과를 검증/교정한다 (check_schema).
+    필수 부분이 빠졌으면 repair(data)로 그 부분만 채운다.
+    """
+    use_cache = use_cache and not CACHE_DISABLED
+    model = model or route_for(step).model
+    key = make_cache_key(system, user, model, temperature)
+
+    with llm_metrics.track(step, model) as call:
+        if use_cache:
+            cached = response_cache.get(key)
+            if cached is not None:
+                call.cache_hit()
+                return cached
+
+        def fetch() -> dict:
+            content = complete_text(
+                get_client(api_key),
+                step,
+                [{"role": "system", "content": system}, {"role": "user", "content": user}],
+                temperature,
+                api_key,
+                call,
+                model,
+                response_format=schema.response_format() if schema else None,
+            )
+            data, call.parse_path = extract_json_object(content)
+            data, complete = check_schema(data, schema, repair, call)
+
+            # 파싱 실패({})나 필수 부분이 빠진 결과는 캐시하지 않음 (다음 클릭에서 다시 시도되도록)
+            # 진행 중 목록에서 빠지기 전에 캐시에 넣어야 그 사이에 온 요청이 다시 호출하지 않는다.
+            # (대체 모델이 답한 결과도 같은 키로 캐시한다)
+            if use_cache and data and complete:
+                response_cache.set(key, data)
+            return data
+
+        if not use_cache or SINGLE_FLIGHT_DISABLED:
+            return fetch()
+
+        # 백그라운드 작업에서 기다리는 중이면 작업이 취소될 때 대기도 멈춘다
+        data, shared = single_flight.do(key, fetch, is_shared_error, check=check_cancelled)
+        if shared:
+            call.shared()
+
+    return data
+
+
+def openai_chat_json_stream(
+    system: str,
+    user: str,
+    patterns: Sequence[Sequence[Any]],
+    model: Optional[str] = None,
+    temperature: float = 0.6,
+    use_cache: bool = True,
+    api_key: Optional[str] = None,
+    step: str = "other",
+    schema: Optional[Schema] = None,
+    repair: Optional[Callable[[dict], dict]] = None,
+) -> Iterator[Tuple[Path, Any]]:
+    """
+    stream=True 버전.
+    patterns 경로의 값이 완성될 때마다 (path, value)를 내보내고,
+    마지막에 전체 결과를 ((), data)로 한 번 더 내보낸다.
+    캐시 히트면 캐시된 결과를 같은 순서로 재생한다.
+    중간 이벤트는 검증 전 값이고, 마지막 전체 결과는 검증/교정(repair 포함)을 거친 값이다.
+    """
+    use_cache = use_cache and not CACHE_DISABLED
+    model = model or route_for(step).model
+    key = make_cache_key(system, user, model, temperature)
+    parser = IncrementalJSONParser(patterns)
+
+    with llm_metrics.track(step, model, stream=True) as call:
+        if use_cache:
+            cached = response_cache.get(key)
+            if cached is not None:
+                call.cache_hit()
+                yield from parser.feed(json.dumps(cached, ensure_ascii=False))
+                yield (), cached
+                return
+
+        # 같은 요청이 진행 중이면 끝날 때까지 기다렸다가 캐시 히트처럼 재생한다.
+        flight = None
+        while use_cache and not SINGLE_FLIGHT_DISABLED:
+            flight, leader = single_flight.join(key)
+            if leader:
+                break
+            try:
+                shared = single_flight.wait(flight, check=check_cancelled)
+            except CancelledError:
+                continue
+            except WaitTimeout:
+                # leader가 멈춘 것으로 보고 직접 요청 (결과는 캐시에만 넣음)
+                flight = None
+                break
+            call.shared()
+            yield from parser.feed(json.dumps(shared, ensure_ascii=False))
+            yield (), shared
+            return
+
+        try:
+            # 재시도는 첫 응답(헤더)을 받기 전까지만: 429/5xx는 create에서 바로 예외로 나온다
+            # 헤지 단계면 첫 토큰이 늦을 때 같은 요청을 하나 더 보내 먼저 토큰을 낸 쪽을 쓴다 (llm_router)
+            for delta in stream_text(
+                get_client(api_key),
+                step,
+                [{"role": "system", "content": system}, {"role": "user", "content": user}],
+                temperature,
+                api_key,
+                call,
+                model,
+                response_format=schema.response_format() if schema else None,
+            ):
+                yield from parser.feed(delta)
+
+            data, call.parse_path = extract_json_object(parser.text)
+            data, complete = check_schema(data, schema, repair, call)
+            if use_cache and data and complete:
+                response_cache.set(key, data)
+        except BaseException as e:
+            # 스트림을 버리면(GeneratorExit) 기다리던 세션은 다시 시도, 그 밖의 오류는 그대로 전달
+            # (여기서 끝내지 않으면 같은 키의 follower가 계속 기다린다)
+            if flight is not None:
+                single_flight.fail(key, flight, e, shared=isinstance(e, Exception) and is_shared_error(e))
+            raise
+
+    if flight is not None:
+        single_flight.resolve(key, flight, data)
+
+    yield (), data
+
+
+# =========================================================
+# 2 -> 3: OpenAI로 추천 직무 리스트 생성
+# =========================================================
+def build_job_recommendation_prompt(user_answers: Dict[str, Any]) -> Tuple[str, str]:
+    system = """
+너는 취업/진로 상담 AI다.
+사용자의 성향/조건을 보고 '초기 취준생'에게 현실적인 추천 직무 리스트를 만든다.
+
+사용자 정보는 "키=코드" 한 줄로 주어진다 (괄호 안은 코드 뜻).
+
+반드시 아래 JSON 형식으로만 출력하라.
+"""
+
+    user = f"""
+사용자: {encode_answers_compact(user_answers, "recommend")}
+
+요구사항:
+- 추천 직무 10~12개, 한국 기준으로 현실적인 직무 (예: "CEO" 같은 거창한 것 금지)
+- job_title: 직무명
+- category: 마케팅/기획/교육/디자인/개발/공공/전문직/콘텐츠 등
+- why_fit: 왜 이 사용자에게 맞는지 1문장
+- requirements_hint: 일반적으로 필요한 조건(학력/자격/전공 등) 20자 이내
+
+출력 JSON 스키마:
+{{"jobs":[{{"job_title":"...","category":"...","why_fit":"...","requirements_hint":"..."}}]}}
+"""
+
+    return system, user
+
+
+# 직무명만 있으면 쓸 수 있다 (나머지는 빈 값으로 채움)
+JOB_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "job_title": {"type": "string"},
+        "category": {"type": "string", "default": "기타"},
+        "why_fit": {"type": "string", "default": ""},
+        "requirements_hint": {"type": "string", "default": ""},
+    },
+    "required": ["job_title"],
+    "additionalProperties": False,
+}
+
+
+
+def _jobs_schema(name: str, min_items: int) -> Schema:
+    return Schema(
+        name,
+        {
+            "type": "object",
+            "properties": {
+                "jobs": {"type": "array", "items": JOB_SCHEMA, "minItems": min_items, "maxItems": 12},
+            },
+            "required": ["jobs"],
+            "additionalProperties": False,
+        },
+    )
+
+
+RECOMMEND_SCHEMA = _jobs_schema("job_recommendations", RECOMMEND_MIN_JOBS)
+# 보충 요청은 몇 개든 받는다 (모자란 개수만 요청하므로)
+MORE_JOBS_SCHEMA = _jobs_schema("more_job_recommendations", 1)
+
+# 스트리밍으로 하나씩 도착하는 직무 카드 검증용
+validate_job = compile_schema(JOB_SCHEMA)
+
+
+def build_more_jobs_prompt(user_answers: Dict[str, Any], have: List[str], n: int) -> Tuple[str, str]:
+    """
+    스키마 검증 후 직무가 모자랄 때 모자란 만큼만 더 받는 프롬프트.
+    원래 프롬프트를 그대로 앞에 두고 끝에만 덧붙인다 (공급자 프롬프트 캐시가 접두부를 재사용).
+    """
+    system, user = build_job_recommendation_prompt(user_answers)
+    user += f"""
+이미 추천한 직무 (다시 쓰지 말 것): {json.dumps(have, ensure_ascii=False)}
+이번에는 위와 겹치지 않는 직무 {n}개만 같은 JSON 형식으로 출력하라.
+"""
+    return system, user
+
+
+def add_missing_jobs(data: dict, user_answers: Dict[str, Any], api_key: Optional[str]) -> dict:
+    """
+    RECOMMEND_SCHEMA의 repair: 통과한 직무는 그대로 두고 모자란 만큼만 한 번 더 요청해 붙인다.
+    """
+    jobs = list(data.get("jobs") or [])
+    have = [j["job_title"] for j in jobs]
+    n = max(RECOMMEND_MIN_JOBS, 10) - len(jobs)
+    llm_metrics.count("llm_schema_followups_total", step="recommend", kind="partial" if jobs else "full")
+
+    system, user = build_more_jobs_prompt(user_answers, have, n)
+    more = openai_chat_json(system=system, user=user, api_key=api_key, step="recommend", schema=MORE_JOBS_SCHEMA)
+    # "이미 추천한 직무"와 이름만 살짝 다른 직무가 다시 오는 경우가 많다 -> 유사도로 합침
+    jobs = dedupe_jobs(jobs + list(more.get("jobs") or []))
+    return {**data, "jobs": jobs[:12]}
+
+
+def generate_job_recommendations(user_answers: Dict[str, Any], api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+    system, user = build_job_recommendation_prompt(user_answers)
+    data = openai_chat_json(
+        system=system,
+        user=user,
+        api_key=api_key,
+        step="recommend",
+        schema=RECOMMEND_SCHEMA,
+        repair=lambda data: add_missing_jobs(data, user_answers, api_key),
+    )
+    # 캐시에는 응답 그대로 두고, 거의 같은 직무("콘텐츠 마케터" / "콘텐츠 마케팅 담당자")는 매번 합친다
+    return dedupe_jobs(data.get("jobs", []))
+
+
+def generate_job_recommendations_stream(
+    user_answers: Dict[str, Any], api_key: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    jobs[] 원소가 하나 완성될 때마다 바로 내보낸다 (카드 점진 렌더링용).
+    보충 요청(add_missing_jobs)으로 붙은 직무는 마지막 전체 결과에서 내보낸다.
+    이미 내보낸 카드와 거의 같은 직무는 건너뛴다 (generate_job_recommendations의 dedupe_jobs와 같은 기준).
+    """
+    system, user = build_job_recommendation_prompt(user_answers)
+    shown: List[str] = []
+    for path, value in openai_chat_json_stream(
+        system,
+        user,
+        patterns=[("jobs", "*")],
+        api_key=api_key,
+        step="recommend",
+        schema=RECOMMEND_SCHEMA,
+        repair=lambda data: add_missing_jobs(data, user_answers, api_key),
+    ):
+        if path:
+            result = validate_job(value)
+            jobs = [result.value] if result.ok else []
+        else:
+            jobs = value.get("jobs", [])
+        for j in jobs:
+            if j["job_title"] not in shown and not is_near_duplicate(j["job_title"], shown):
+                shown.append(j["job_title"])
+                yield j
+
+
+# =========================================================
+# 2 -> 3: 로컬 추천 엔진 + (선택) OpenAI는 why_fit 문구만
+# =========================================================
+def build_why_fit_prompt(user_answers: Dict[str, Any], jobs: List[Dict[str, Any]]) -> Tuple[str, str]:
+    system = """
+너는 취업/진로 상담 AI다.
+이미 정해진 추천 직무 각각에 대해, 왜 이 사용자에게 맞는지 설명만 쓴다.
+
+사용자 정보는 "키=코드" 한 줄로 주어진다 (괄호 안은 코드 뜻).
+
+반드시 JSON 형식으로만 출력하라.
+"""
+
+    user = f"""
+사용자: {encode_answers_compact(user_answers, "why_fit")}
+
+추천 직무: {json.dumps([j["job_title"] for j in jobs], ensure_ascii=False)}
+
+요구사항:
+- 직무마다 왜 이 사용자에게 맞는지 1문장
+- 직무명은 그대로 키로 사용
+
+출력 JSON 스키마:
+{{"why_fit":{{"직무명":"설명"}}}}
+"""
+    return system, user
+
+
+# 키가 직무명이라 strict json_schema로는 표현할 수 없다 -> JSON 모드 + 로컬 검증
+WHY_FIT_SCHEMA = Schema(
+    "why_fit",
+    {
+        "type": "object",
+        "properties": {
+            "why_fit": {"type": "object", "additionalProperties": {"type": "string"}},
+        },
+        "required": ["why_fit"],
+    },
+    strict=False,
+)
+
+
+def generate_job_recommendations_local(
+    user_answers: Dict[str, Any],
+    api_key: Optional[str] = None,
+    write_why_fit: bool = True,
+    top_k: int = 12,
+) -> List[Dict[str, Any]]:
+    """
+    번들 직무 카탈로그를 NumPy로 점수화해 후보를 고른다 (수 ms 이내).
+    write_why_fit=True 면 OpenAI는 why_fit 문구만 작성하고,
+    False(빠른 모드)면 점수 기여도로 만든 기본 문구를 그대로 쓴다.
+    """
+    # NumPy는 로컬 추천을 처음 쓸 때 로드 (startup.warm_up이 미리 불러 둠)
+    from job_scoring import recommend_jobs
+
+    jobs = recommend_jobs(user_answers, top_k=top_k)
+    if not write_why_fit or not jobs:
+        return jobs
+
+    system, user = build_why_fit_prompt(user_answers, jobs)
+    data = openai_chat_json(system=system, user=user, api_key=api_key, step="why_fit", schema=WHY_FIT_SCHEMA)
+    texts = data.get("why_fit", {})
+    for j in jobs:
+        if j["job_title"] in texts:
+            j["why_fit"] = texts[j["job_title"]]
+    return jobs
+
+
+# =========================================================
+# 3페이지: 필터링 질문 생성 (OpenAI)
+# =========================================================
+def build_filter_question_prompt(jobs: List[Dict[str, Any]]) -> Tuple[str, str]:
+    system = """
+너는 진로추천 앱의 '필터링 질문 생성기'다.
+
+입력으로 추천 직무 리스트가 주어진다.
+여기서 일부 직무는 특정 조건이 반드시 필요하다(예: 의사, 변호사, 약사, 교사 등).
+
+너의 목표는:
+- 사용자가 '해당 직무가 현실적으로 가능한지' 판단하기 위한 질문을 자동 생성하는 것.
+
+반드시 JSON 형식으로만 출력하라.
+"""
+
+    user = f"""
+추천 직무 리스트 (직무명 | 필요 조건):
+{compact_job_lines(jobs)}
+
+요구사항:
+- 질문은 조건이 꼭 필요한 직무에 대해서만, 최대 5개 (필요 없으면 빈 리스트)
+- 질문은 직무 리스트에 기반해서만 생성
+- 질문마다 아래 정보를 포함:
+  - id: 짧은 식별자(영문)
+  - question: 질문 문장
+  - type: "yesno" 또는 "choice"
+  - options: type이 choice면 선택지 리스트, yesno면 ["예","아니오"]
+  - reject_options: 이 답을 고르면 affects_jobs가 불가능해지는 선택지 리스트 (yesno면 ["아니오"])
+  - affects_jobs: 이 질문이 영향을 주는 직무명 리스트 (위 직무명 그대로)
+
+출력 JSON 스키마 (예: 의사가 있으면):
+{{"questions":[{{"id":"medical_school","question":"의대 졸업(또는 재학) 여부가 있나요?","type":"yesno","options":["예","아니오"],"reject_options":["아니오"],"affects_jobs":["의사"]}}]}}
+"""
+
+    return system, user
+
+
+_STRINGS = {"type": "array", "items": {"type": "string"}}
+
+# 질문 하나가 잘못되면 그 질문만 버린다. reject_options는 빠져도 apply_filtering이 기본값을 쓴다
+FILTER_SCHEMA = Schema(
+    "filter_questions",
+    {
+        "type": "object",
+        "properties": {
+            "questions": {
+                "type": "array",
+                "maxItems": 5,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "question": {"type": "string"},
+                        "type": {"type": "string", "enum": ["yesno", "choice"]},
+                        "options": {**_STRINGS, "minItems": 1},
+                        "reject_options": _STRINGS,
+                        "affects_jobs": {**_STRINGS, "minItems": 1},
+                    },
+                    "required": ["id", "question", "type", "options", "affects_jobs"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["questions"],
+        "additionalProperties": False,
+    },
+)
+
+
+def generate_filter_questions_llm(jobs: List[Dict[str, Any]], api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+    system, user = build_filter_question_prompt(jobs)
+    data = openai_chat_json(system=system, user=user, api_key=api_key, step="filter", schema=FILTER_SCHEMA)
+    return data.get("questions", [])
+
+
+def generate_filter_questions(jobs: List[Dict[str, Any]], api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    번들 요구조건 인덱스(requirements_index)에 있는 직무는 로컬에서 질문을 만들고,
+    인덱스에 없는 직무가 있을 때만 그 직무들만 넣어 OpenAI에 질문 생성을 맡긴다.
+    """
+    questions, unknown = get_requirement_index().build_questions(jobs)
+    if not unknown:
+        return questions
+
+    used_ids = {q["id"] for q in questions}
+    for q in generate_filter_questions_llm(unknown, api_key=api_key):
+        if q["id"] in used_ids:
+            # 응답 dict는 single-flight로 다른 세션과 공유될 수 있으므로 고치지 않고 사본에 새 id
+            q = {**q, "id": f"llm_{q['id']}"}
+        if q["id"] in used_ids:
+            continue
+        used_ids.add(q["id"])
+        questions.append(q)
+
+    return questions
+
+
+# =========================================================
+# 3페이지: 필터링 적용
+# =========================================================
+def apply_filtering(
+    jobs: List[Dict[str, Any]],
+    filter_questions: List[Dict[str, Any]],
+    filter_answers: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    필터링 규칙:
+    - 답이 질문의 reject_options 중 하나면 affects_jobs에 포함된 직무를 제거
+      (reject_options가 없으면 yesno는 "아니오", choice는 제거하지 않음)
+    - affects_jobs 이름은 resolve_titles로 추천 리스트의 직무에 대응시킨다
+      (정규화한 이름이 같으면 그 직무, 아니면 역할 단어가 맞고 글자 n-gram 유사도가 충분히 높으면서
+       다른 직무보다 확실히 가까운 직무. "콘텐츠 마케팅 담당자"는 "콘텐츠 마케터" 카드를 지우지만
+       "간호조무사"는 "간호사"를 지우지 않음. 애매하면 아무것도 지우지 않는다)
+    """
+    rejected: List[str] = []
+
+    for q in filter_questions:
+        qid = q["id"]
+        ans = filter_answers.get(qid)
+
+        default_reject = ["아니오"] if q["type"] == "yesno" else []
+        if ans in q.get("reject_options", default_reject):
+            rejected.extend(q["affects_jobs"])
+
+    removed = set(resolve_titles(list(dict.fromkeys(rejected)), jobs)) if rejected else set()
+
+    final = []
+    for i, j in enumerate(jobs):
+        if i not in removed:
+            final.append(j)
+
+    return final
+
+
+# =========================================================
+# 4페이지: 로드맵 생성 (OpenAI 기반, 웹검색 없이)
+# =========================================================
+ROADMAP_PERIODS = ["지금~3개월", "3~12개월", "1~2년"]
+
+def build_roadmap_prompt(job_title: str, user_answers: Dict[str, Any]) -> Tuple[str, str]:
+    system = """
+너는 커리어 로드맵 설계 AI다.
+사용자가 선택한 직무를 기준으로,
+한국 취업 시장에서 현실적인 2년 로드맵을 만든다.
+
+주의:
+- 웹 검색을 하지 않는다.
+- 대신 일반적으로 알려진 업계 상식 수준에서 현실적인 계획을 제시한다.
+- 너무 단정하지 말고, "예시"임을 분명히 한다.
+
+사용자 정보는 "키=코드" 한 줄로 주어진다 (괄호 안은 코드 뜻).
+
+반드시 JSON으로만 출력하라.
+"""
+
+    user = f"""
+사용자가 선택한 직무: {job_title}
+사용자: {encode_answers_compact(user_answers, "roadmap")}
+
+요구사항:
+- 시간축 3구간: "지금~3개월", "3~12개월", "1~2년"
+- 각 구간마다 해야 할 행동 4~6개 (현실적으로, 각 40자 이내)
+- disclaimer는 1문장, recommended_resources는 3개
+
+출력 JSON 스키마:
+{{"headline":"예비 OO의 이제뭐하지","disclaimer":"이 로드맵은 예시이며 ...","timeline":[{{"period":"지금~3개월","milestones":["...","..."]}},{{"period":"3~12개월","milestones":["..."]}},{{"period":"1~2년","milestones":["..."]}}],"recommended_resources":["...","...","..."]}}
+"""
+
+    return system, user
+
+
+def _normalize_periods(data: Any) -> Any:
+    # "지금 ~ 3개월" 같은 띄어쓰기 차이는 enum 검사 전에 맞춘다
+    if isinstance(data, dict) and isinstance(data.get("timeline"), list):
+        data = {**data, "timeline": [
+            {**t, "period": "".join(t["period"].split())}
+            if isinstance(t, dict) and isinstance(t.get("period"), str) else t
+            for t in data["timeline"]
+        ]}
+    return data
+
+
+_MILESTONES = {"type": "array", "items": {"type": "string"}, "minItems": 1}
+
+_ROADMAP_RESOURCES_PROPERTIES: Dict[str, Any] = {
+    "headline": {"type": "string"},
+    "disclaimer": {"type": "string"},
+    "recommended_resources": {"type": "array", "items": {"type": "string"}, "minItems": 1},
+}
+
+ROADMAP_SCHEMA = Schema(
+    "roadmap",
+    {
+        "type": "object",
+        "properties": {
+            **_ROADMAP_RESOURCES_PROPERTIES,
+            "timeline": {
+                "type": "array",
+                "minItems": len(ROADMAP_PERIODS),
+                "maxItems": len(ROADMAP_PERIODS),
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "period": {"type": "string", "enum": ROADMAP_PERIODS},
+                        "milestones": _MILESTONES,
+                    },
+                    "required": ["period", "milestones"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["headline", "disclaimer", "timeline", "recommended_resources"],
+        "additionalProperties": False,
+    },
+    prepare=_normalize_periods,
+)
+
+# ROADMAP_FANOUT의 구간 요청 (기간 구간 / 리소스)
+ROADMAP_PERIOD_SCHEMA = Schema(
+    "roadmap_period",
+    {
+        "type": "object",
+        "properties": {"milestones": _MILESTONES},
+        "required": ["milestones"],
+        "additionalProperties": False,
+    },
+)
+ROADMAP_RESOURCES_SCHEMA = Schema(
+    "roadmap_resources",
+    {
+        "type": "object",
+        "properties": _ROADMAP_RESOURCES_PROPERTIES,
+        "required": list(_ROADMAP_RESOURCES_PROPERTIES),
+        "additionalProperties": False,
+    },
+)
+
+
+def roadmap_missing_sections(data: Dict[str, Any]) -> List[str]:
+    """
+    검증을 거친 (일부가 빠졌을 수 있는) 로드맵에서 다시 받아야 하는 구간 (ROADMAP_PERIODS 또는 "resources").
+    """
+    have = {t["period"] for t in data.get("timeline") or []}
+    missing = [period for period in ROADMAP_PERIODS if period not in have]
+    if any(key not in data for key in _ROADMAP_RESOURCES_PROPERTIES):
+        missing.append("resources")
+    return missing
+
+
+def repair_roadmap(data: Dict[str, Any], job_title: str, user_answers: Dict[str, Any], api_key: Optional[str]) -> Dict[str, Any]:
+    """
+    ROADMAP_SCHEMA의 repair: 빠진 구간만 구간 요청(generate_roadmap_fanout)으로 받아 채운다.
+    """
+    merged: Dict[str, Any] = {}
+    for path, value in generate_roadmap_fanout(job_title, user_answers, api_key=api_key, base=data):
+        if not path:
+            merged = value
+    return merged
+
+
+ROADMAP_STREAM_PATTERNS = [
+    ("headline",),
+    ("disclaimer",),
+    ("timeline", "*", "period"),
+    ("timeline", "*", "milestones", "*"),
+    ("recommended_resources", "*"),
+]
+
+
+def generate_roadmap(job_title: str, user_answers: Dict[str, Any], api_key: Optional[str] = None) -> Dict[str, Any]:
+    if ROADMAP_FANOUT:
+        data: Dict[str, Any] = {}
+        for path, value in generate_roadmap_fanout(job_title, user_answers, api_key=api_key):
+            if not path:
+                data = value
+        return data
+
+    system, user = build_roadmap_prompt(job_title, user_answers)
+    data = openai_chat_json(
+        system=system,
+        user=user,
+        api_key=api_key,
+        step="roadmap",
+        schema=ROADMAP_SCHEMA,
+        repair=lambda data: repair_roadmap(data, job_title, user_answers, api_key),
+    )
+    return data
+
+
+def generate_roadmap_stream(
+    job_title: str, user_answers: Dict[str, Any], api_key: Optional[str] = None
+) -> Iterator[Tuple[Path, Any]]:
+    """
+    기간명(period)과 마일스톤이 완성될 때마다 (path, value)로 내보낸다.
+    예: (("timeline", 0, "milestones", 2), "포트폴리오 정리")
+    마지막 이벤트는 ((), 전체 로드맵 dict).
+    ROADMAP_FANOUT=1 이면 구간 요청이 끝나는 대로 그 구간의 이벤트를 한꺼번에 내보낸다.
+    """
+    if ROADMAP_FANOUT:
+        yield from generate_roadmap_fanout(job_title, user_answers, api_key=api_key)
+        return
+
+    system, user = build_roadmap_prompt(job_title, user_answers)
+    yield from openai_chat_json_stream(
+        system,
+        user,
+        patterns=ROADMAP_STREAM_PATTERNS,
+        api_key=api_key,
+        step="roadmap",
+        schema=ROADMAP_SCHEMA,
+        repair=lambda data: repair_roadmap(data, job_title, user_answers, api_key),
+    )
+
+
+# =========================================================
+# 4페이지: 로드맵 구간별 동시 생성 (ROADMAP_FANOUT=1)
+# =========================================================
+# 구간 요청 (기간 3개 + 리소스)은 프로세스 전역 풀 하나에서 돈다
+_fanout_pool = ThreadPoolExecutor(max_workers=ROADMAP_FANOUT_WORKERS, thread_name_prefix="roadmap-fanout")
+
+
+def build_roadmap_section_prompt(job_title: str, user_answers: Dict[str, Any], section: str) -> Tuple[str, str]:
+    """
+    section: 기간명(ROADMAP_PERIODS) 또는 "resources".
+    system과 user 앞부분(직무/사용자/전체 구간 안내)은 모든 구간이 글자 하나 다르지 않게 같아서
+    공급자 쪽 프롬프트 캐시가 공통 접두부를 재사용할 수 있다. 구간별 요구사항은 맨 끝에만 붙인다.
+    """
+    system = """
+너는 커리어 로드맵 설계 AI다.
+사용자가 선택한 직무를 기준으로,
+한국 취업 시장에서 현실적인 2년 로드맵의 일부분을 만든다.
+
+주의:
+- 웹 검색을 하지 않는다.
+- 대신 일반적으로 알려진 업계 상식 수준에서 현실적인 계획을 제시한다.
+- 너무 단정하지 말고, "예시"임을 분명히 한다.
+
+사용자 정보는 "키=코드" 한 줄로 주어진다 (괄호 안은 코드 뜻).
+
+반드시 JSON으로만 출력하라.
+"""
+
+    prefix = f"""
+사용자가 선택한 직무: {job_title}
+사용자: {encode_answers_compact(user_answers, "roadmap")}
+
+전체 로드맵은 시간축 3구간 "{'", "'.join(ROADMAP_PERIODS)}" + 추천 리소스로 나뉘고, 이번에는 그중 한 부분만 쓴다.
+"""
+
+    if section == "resources":
+        task = """
+이번 부분: 로드맵 전체 요약과 추천 리소스
+- headline은 "예비 OO의 이제뭐하지" 형식, disclaimer는 1문장, recommended_resources는 3개
+
+출력 JSON 스키마:
+{"headline":"예비 OO의 이제뭐하지","disclaimer":"이 로드맵은 예시이며 ...","recommended_resources":["...","...","..."]}
+"""
+    else:
+        task = f"""
+이번 부분: "{section}" 구간
+- 이 구간에 해야 할 행동 4~6개 (현실적으로, 각 40자 이내, 다른 구간과 겹치지 않게)
+
+출력 JSON 스키마:
+{{"milestones":["...","..."]}}
+"""
+
+    return system, prefix + task
+
+
+def _roadmap_section(job_title: str, user_answers: Dict[str, Any], section: str, api_key: Optional[str]) -> Dict[str, Any]:
+    system, user = build_roadmap_section_prompt(job_title, user_answers, section)
+    schema = ROADMAP_RESOURCES_SCHEMA if section == "resources" else ROADMAP_PERIOD_SCHEMA
+    return openai_chat_json(system=system, user=user, api_key=api_key, step="roadmap", schema=schema)
+
+
+def _as_strings(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [v for v in value if isinstance(v, str) and v.strip()]
+
+
+def generate_roadmap_fanout(
+    job_title: str,
+    user_answers: Dict[str, Any],
+    api_key: Optional[str] = None,
+    base: Optional[Dict[str, Any]] = None,
+) -> Iterator[Tuple[Path, Any]]:
+    """
+    기간별 요청 3개 + 리소스 요청 1개를 동시에 보내고, 끝나는 순서대로
+    generate_roadmap_stream과 같은 (path, value) 이벤트를 내보낸 뒤 ((), 병합 결과)로 끝낸다.
+    기간명은 모델 출력이 아니라 ROADMAP_PERIODS를 그대로 쓴다 (순서/표기 고정).
+    각 구간은 openai_chat_json을 거치므로 캐시/single-flight/스케줄러/헤지가 구간 단위로 적용된다.
+    base(검증을 통과한 일부 로드맵)를 주면 거기 빠진 구간만 요청하고, 있는 구간은 base 값을 쓴다.
+    """
+    sections = ROADMAP_PERIODS + ["resources"]
+    parts: Dict[str, Dict[str, Any]] = {}
+    if base is not None:
+        sections = roadmap_missing_sections(base)
+        llm_metrics.count(
+            "llm_schema_followups_total", step="roadmap", kind="partial" if len(sections) < 4 else "full"
+        )
+        parts["resources"] = {k: base[k] for k in _ROADMAP_RESOURCES_PROPERTIES if k in base}
+        for t in base.get("timeline") or []:
+            parts[t["period"]] = t
+    # 구간 스레드에도 작업을 걸어 두어 취소하면 대기/백오프 중인 구간도 멈추게 한다
+    section_fn = bind_current_job(_roadmap_section)
+    futures = {
+        _fanout_pool.submit(section_fn, job_title, user_answers, section, api_key): section
+        for section in sections
+    }
+    # 작업 하나가 구간 수만큼 동시에 호출한다 (첫 호출 외에는 작업 상한 밖)
+    if len(sections) > 1:
+        llm_metrics.count("llm_calls_outside_job_cap_total", len(sections) - 1, source="fanout")
+    try:
+        for fut in as_completed(futures):
+            section = futures[fut]
+            part = fut.result()
+            parts[section] = {**part, **parts.get(section, {})}
+
+            if section == "resources":
+                for key in ("headline", "disclaimer"):
+                    if isinstance(part.get(key), str):
+                        yield (key,), part[key]
+                for i, r in enumerate(_as_strings(part.get("recommended_resources"))):
+                    yield ("recommended_resources", i), r
+            else:
+                idx = ROADMAP_PERIODS.index(section)
+                yield ("timeline", idx, "period"), section
+                for i, m in enumerate(_as_strings(part.get("milestones"))):
+                    yield ("timeline", idx, "milestones", i), m
+    finally:
+        # 소비자가 중간에 멈추면(작업 취소 등) 아직 시작 안 한 구간은 보내지 않는다
+        for fut in futures:
+            fut.cancel()
+
+    resources = parts.get("resources", {})
+    yield (), {
+        "headline": resources.get("headline") or f"예비 {job_title}의 이제뭐하지",
+        "disclaimer": resources.get("disclaimer") or "이 로드맵은 예시입니다.",
+        "timeline": [
+            {"period": period, "milestones": _as_strings(parts.get(period, {}).get("milestones"))}
+            for period in ROADMAP_PERIODS
+        ],
+        "recommended_resources": _as_strings(resources.get("recommended_resources")),
+    }
+
+
+# =========================================================
+# 헤드리스 실행: Streamlit 세션 없이 2 -> 4페이지 (일괄 실행/캐시 예열용)
+# =========================================================
+RECO_MODES = ("hybrid", "fast", "llm")
+
+
+def generate_jobs(user_answers: Dict[str, Any], mode: str = "hybrid", api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    RECO_MODE별 추천 (앱의 run_recommend_job 비스트리밍 경로와 같은 호출).
+    hybrid: 로컬 점수 + LLM why_fit / fast: 로컬만 / llm: LLM이 직무까지 생성
+    """
+    if mode == "llm":
+        return generate_job_recommendations(user_answers, api_key=api_key)
+    return generate_job_recommendations_local(user_answers, api_key=api_key, write_why_fit=(mode == "hybrid"))
+
+
+def default_filter_answers(questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # 3페이지에서 아무것도 바꾸지 않았을 때의 선택 (질문마다 첫 선택지)
+    return {q["id"]: q["options"][0] for q in questions if q["options"]}
+
+
+def run_profile(
+    user_answers: Dict[str, Any],
+    mode: str = "hybrid",
+    filter_answers: Optional[Dict[str, Any]] = None,
+    roadmaps: int = 1,
+    api_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    추천 -> 필터 질문 -> 필터링 -> 최종 리스트 상위 roadmaps개의 로드맵.
+    filter_answers가 없으면 질문마다 첫 선택지로 답한 것으로 본다.
+    반환: {"jobs", "filter_questions", "filter_answers", "final_jobs", "roadmaps": {직무명: 로드맵}}
+    """
+    jobs = generate_jobs(user_answers, mode, api_key=api_key)
+    questions = generate_filter_questions(jobs, api_key=api_key)
+    if filter_answers is None:
+        filter_answers = default_filter_answers(questions)
+    final = apply_filtering(jobs, questions, filter_answers)
+    return {
+        "jobs": jobs,
+        "filter_questions": questions,
+        "filter_answers": filter_answers,
+        "final_jobs": final,
+        "roadmaps": {
+            j["job_title"]: generate_roadmap(j["job_title"], user_answers, api_key=api_key)
+            for j in final[:roadmaps]
+        },
+    }
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from llm_metrics import llm_metrics
+from roadmap_prefetch import answers_fingerprint
+
+
+# =========================================================
+# 2페이지 답변 프로필 기록 (캐시 예열 대상 선정용)
+# =========================================================
+# 비어 있으면 기록하지 않음. 예: .cache/profiles.jsonl
+PROFILE_LOG_PATH = os.environ.get("PROFILE_LOG_PATH", "")
+
+_lock = threading.Lock()
+
+
+def log_profile(user_answers: Dict[str, Any], path: str = PROFILE_LOG_PATH):
+    """
+    한 줄에 한 번의 추천 요청: {"ts": ..., "answers": {...}}
+    API 키나 세션 id는 남기지 않는다.
+    """
+    if not path:
+        return
+    line = json.dumps({"ts": round(time.time(), 3), "answers": user_answers}, ensure_ascii=False)
+    with _lock:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def read_profiles(path: str) -> List[Tuple[Dict[str, Any], int]]:
+    """
+    기록된 프로필을 같은 답변끼리 묶어 (답변, 횟수)를 많은 순으로 반환.
+    깨진 줄은 건너뛴다.
+    """
+    counts: Counter = Counter()
+    first: Dict[str, Dict[str, Any]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                answers = json.loads(line)["answers"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if not isinstance(answers, dict):
+                continue
+            fp = answers_fingerprint(answers)
+            counts[fp] += 1
+            first.setdefault(fp, answers)
+    return [(first[fp], n) for fp, n in counts.most_common()]
+
+
+def print_request_counts():
+    """
+    일괄 실행/예열이 끝난 뒤 단계별 호출 출처(api / cache / shared) 표를 출력한다.
+    """
+    counts = llm_metrics.request_counts()
+    if not counts:
+        return
+    print(f"\n{'step':<12}{'api':>8}{'cache':>8}{'shared':>8}")
+    for step in sorted({s for s, _ in counts}):
+        print(
+            f"{step:<12}{counts.get((step, 'api'), 0):>8}{counts.get((step, 'cache'), 0):>8}"
+            f"{counts.get((step, 'shared'), 0):>8}"
+        )
@@ -0,0 +1,97 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from major_index import canonical_major
+from questions import option_code
+
+
+# =========================================================
+# 프롬프트 압축: 답변을 짧은 코드로, 단계별로 필요한 필드만
+# =========================================================
+# 답변 키 -> 프롬프트에 쓰는 키 (설명 없이도 뜻이 통하는 영문)
+SHORT_KEYS: Dict[str, str] = {
+    "money": "pay",
+    "location": "region",
+    "job_type": "work_type",
+    "commute": "max_commute",
+    "culture": "culture",
+    "gender_ratio": "gender_ratio",
+    "health": "health_issues",
+    "must_have": "must_have",
+    "cant_do": "weak_subjects",
+    "preferred_action": "likes_to",
+    "education": "education",
+    "major": "major",
+}
+
+# 영문 코드만으로는 뜻이 모호한 코드의 풀이. 사용자 답에 실제로 나온 코드만 프롬프트에 붙인다.
+CODE_LEGEND: Dict[str, Dict[str, str]] = {
+    "location": {"metro": "수도권", "metro_city": "지방 광역시", "rural": "농어촌"},
+    "culture": {
+        "creative": "지시 모호+창의적",
+        "hierarchy": "상명하복",
+        "bond": "텃세 후 단단한 결속",
+        "individual": "개인주의",
+        "together": "회식 등 함께",
+    },
+    "must_have": {"body": "몸 상하지 않기", "worklife": "칼퇴/개인 시간", "fun": "재미/자아실현", "stable": "안정 고용"},
+    "preferred_action": {"critique": "지적/평가하기"},
+    "education": {"hs": "고졸 이하", "college": "대학 재학"},
+}
+
+# 단계별로 프롬프트에 넣는 답변 필드
+STEP_FIELDS: Dict[str, Sequence[str]] = {
+    "recommend": list(SHORT_KEYS),
+    "why_fit": ["money", "location", "job_type", "culture", "must_have", "preferred_action", "education", "major"],
+    "roadmap": ["education", "major", "location", "job_type", "must_have", "cant_do", "preferred_action"],
+}
+
+# 단계별 출력 토큰 상한 (LLM_MAX_TOKENS_<STEP> 환경변수로 조정)
+OUTPUT_TOKEN_BUDGETS: Dict[str, int] = {
+    step: int(os.environ.get(f"LLM_MAX_TOKENS_{step.upper()}", default))
+    for step, default in {"recommend": 1600, "why_fit": 900, "filter": 700, "roadmap": 1100}.items()
+}
+
+
+def max_tokens_for(step: str) -> Optional[int]:
+    """
+    0 이하이면 상한 없음 (None).
+    """
+    budget = OUTPUT_TOKEN_BUDGETS.get(step, 0)
+    return budget if budget > 0 else None
+
+
+def _code(key: str, value: Any) -> str:
+    # 선택지 문구는 코드로, 자유 입력(전공)이나 모르는 값은 그대로
+    if isinstance(value, list):
+        return ",".join(_code(key, v) for v in value) or "-"
+    text = str(value).strip()
+    return option_code(key, text) or text or "-"
+
+
+def encode_answers_compact(answers: Dict[str, Any], step: str) -> str:
+    """
+    예) "pay=high region=rural ... culture=bond major=경영학 (bond=텃세 후 단단한 결속, rural=농어촌)"
+    괄호 안 범례는 이 사용자의 답에 나온 모호한 코드만 담는다.
+    """
+    parts = []
+    legend = []
+    for key in STEP_FIELDS[step]:
+        if key not in answers:
+            continue
+        # 전공은 자유 입력이라 표기가 제각각이므로 표준 전공명으로 바꿔 보낸다 (major_index)
+        value = _code(key, canonical_major(answers[key]) if key == "major" else answers[key])
+        parts.append(f"{SHORT_KEYS[key]}={value}")
+        for code in value.split(","):
+            if code in CODE_LEGEND.get(key, {}):
+                legend.append(f"{code}={CODE_LEGEND[key][code]}")
+
+    line = " ".join(parts)
+    return f"{line} ({', '.join(legend)})" if legend else line
+
+
+def compact_job_lines(jobs: List[Dict[str, Any]], fields: Sequence[str] = ("job_title", "requirements_hint")) -> str:
+    """
+    직무 리스트를 "직무명 | 조건" 한 줄씩으로 (why_fit 같은 설명 문장은 빼고 보낸다).
+    """
+    return "\n".join(" | ".join(str(j.get(f, "")).strip() for f in fields) for j in jobs)
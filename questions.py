@@ -0,0 +1,131 @@
+from typing import Any, Dict, List, Tuple
+
+
+# =========================================================
+# 2페이지 질문 선택지: (화면 표시 문구, 짧은 코드)
+# 코드는 로컬 추천 엔진의 특징 이름으로 쓰인다.
+# =========================================================
+QUESTION_OPTIONS: Dict[str, List[Tuple[str, str]]] = {
+    "money": [
+        ("상관없음", "any"),
+        ("평균 정도면 만족", "avg"),
+        ("많이 벌고 싶음", "high"),
+        ("최대한 많이 벌고 싶음", "max"),
+    ],
+    "location": [
+        ("서울", "seoul"),
+        ("수도권", "metro"),
+        ("지방 광역시", "metro_city"),
+        ("세종", "sejong"),
+        ("농어촌", "rural"),
+    ],
+    "job_type": [
+        ("직장인", "employee"),
+        ("프리랜서", "freelancer"),
+        ("전문직", "professional"),
+    ],
+    "commute": [
+        ("30분", "30m"),
+        ("1시간", "60m"),
+        ("1시간 반", "90m"),
+        ("2시간", "120m"),
+        ("2시간 반", "150m"),
+    ],
+    "culture": [
+        ("명확하지 않은 지시사항+창의적 분위기", "creative"),
+        ("상명하복의 권위적 분위기", "hierarchy"),
+        ("처음엔 텃세가 있을 수 있으나 친해지면 단단한 결속", "bond"),
+        ("개인주의의 차가운 분위기", "individual"),
+        ("회식, 술자리 등 뭐든지 함께 분위기", "together"),
+    ],
+    "gender_ratio": [
+        ("남 다수", "male"),
+        ("여 다수", "female"),
+        ("반반", "even"),
+        ("상관없음", "any"),
+    ],
+    "health": [
+        ("없음", "none"),
+        ("눈의 피로", "eye"),
+        ("허리, 목", "back"),
+        ("호흡기", "breath"),
+        ("근육 및 운동능력", "muscle"),
+        ("두통", "headache"),
+        ("스트레스 취약", "stress"),
+    ],
+    "must_have": [
+        ("따박따박 나오는 월급", "salary"),
+        ("세상의 인정", "recognition"),
+        ("몸 상하지 않는 것", "body"),
+        ("칼퇴 등 개인 시간 확보", "worklife"),
+        ("일의 재미 및 자아실현", "fun"),
+        ("안정된 고용", "stable"),
+    ],
+    "cant_do": [
+        ("음악", "music"),
+        ("미술", "art"),
+        ("체육", "pe"),
+        ("국어", "korean"),
+        ("외국어", "foreign"),
+        ("일반사회", "social"),
+        ("수학", "math"),
+        ("과학", "science"),
+        ("공학", "engineering"),
+    ],
+    "preferred_action": [
+        ("~를 가르치기", "teach"),
+        ("~를 고치기", "fix"),
+        ("~를 지적하기", "critique"),
+        ("~를 연구하기", "research"),
+    ],
+    "education": [
+        ("고졸 이하", "hs"),
+        ("대학 재학", "college"),
+        ("대학 졸업", "bachelor"),
+        ("대학원 재학/졸업", "graduate"),
+    ],
+}
+
+# 표시 문구 -> 코드
+OPTION_CODES: Dict[str, Dict[str, str]] = {
+    key: {label: code for label, code in options} for key, options in QUESTION_OPTIONS.items()
+}
+
+
+def option_code(key: str, label: str) -> str:
+    """
+    모르는 값(이전 버전 세션 등)은 빈 문자열.
+    """
+    return OPTION_CODES.get(key, {}).get(label, "")
+
+
+# 선택지 문구 목록 / 문구 -> 위치 (재실행마다 리스트를 새로 만들고 .index() 하지 않도록 미리 계산)
+OPTION_LABELS: Dict[str, List[str]] = {
+    key: [label for label, _ in options] for key, options in QUESTION_OPTIONS.items()
+}
+OPTION_INDEX: Dict[str, Dict[str, int]] = {
+    key: {label: i for i, label in enumerate(labels)} for key, labels in OPTION_LABELS.items()
+}
+
+# 2페이지 질문 화면 구성: (답변 키, 제목, 위젯, 가로 배치, 기본값)
+# 기본값은 radio면 선택지 위치, multiselect면 기본 선택 문구 리스트
+FORM_QUESTIONS: List[Tuple[str, str, str, bool, Any]] = [
+    ("money", "돈은 얼마나 벌고 싶나요?", "radio", True, 0),
+    ("location", "어디에서 일하고 싶나요?", "radio", True, 0),
+    ("job_type", "직업의 형태는 무엇이 좋나요?", "radio", True, 0),
+    ("commute", "통근시간은 최대 얼마 이하였으면 좋겠나요?", "radio", True, 1),
+    ("culture", "조직 문화는 어땠으면 좋겠나요?", "radio", False, 0),
+    ("gender_ratio", "조직 성비는 어땠으면 좋겠나요?", "radio", True, 3),
+    ("health", "건강상 약점이 있나요?", "multiselect", False, ["없음"]),
+    ("must_have", "무조건 지켜져야 하는 것은?", "radio", False, 0),
+    ("cant_do", "내가 절대 못하겠는 것은? (복수응답)", "multiselect", False, []),
+    ("preferred_action", "내가 잘하는 것에 결합될 수 있는 행동 중 끌리는 것은?", "radio", True, 0),
+]
+EDUCATION_DEFAULT_INDEX = 1
+
+
+def option_index(key: str, label: Any, default: int) -> int:
+    """
+    저장된 답의 선택지 위치. 모르는 값이면 default.
+    """
+    return OPTION_INDEX[key].get(label, default)
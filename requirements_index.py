@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# =========================================================
+# 면허/자격이 필요한 직무의 관문 질문 인덱스 (번들 데이터)
+# =========================================================
+REQUIREMENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "job_requirements.json")
+
+_PAREN = re.compile(r"\([^)]*\)")
+_NON_WORD = re.compile(r"[\s()/·,.\-_&+]+")
+
+
+def normalize_title(title: str) -> str:
+    """
+    직무명 비교용 키: 전각/반각 통일, 소문자, 공백/구두점 제거.
+    예) "UX / UI 디자이너" -> "uxui디자이너"
+    """
+    text = unicodedata.normalize("NFKC", str(title or "")).lower()
+    return _NON_WORD.sub("", text)
+
+
+def title_keys(title: str) -> List[str]:
+    """
+    조회에 쓸 키 후보. "의사(내과)" 처럼 괄호 부연이 붙은 이름은 괄호를 뺀 이름으로도 찾는다.
+    """
+    keys = [normalize_title(title)]
+    base = normalize_title(_PAREN.sub("", str(title or "")))
+    if base and base not in keys:
+        keys.append(base)
+    return [k for k in keys if k]
+
+
+class RequirementIndex:
+    """
+    questions: 질문 id -> {question, type, options, reject_options}
+    jobs:      직무 id -> {id, title, aliases, questions}
+    직무명/별칭을 정규화한 키로 직무 id를 찾는다.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.questions: Dict[str, Dict[str, Any]] = data.get("questions", {})
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._by_key: Dict[str, str] = {}
+
+        for job in data.get("jobs", []):
+            self.jobs[job["id"]] = job
+            for name in [job["title"], *job.get("aliases", [])]:
+                self._by_key.setdefault(normalize_title(name), job["id"])
+
+    def lookup(self, title: str) -> Optional[Dict[str, Any]]:
+        for key in title_keys(title):
+            job_id = self._by_key.get(key)
+            if job_id:
+                return self.jobs[job_id]
+        return None
+
+    def build_questions(self, jobs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        반환: (아는 직무에 대한 필터 질문 목록, 인덱스에 없는 직무 목록)
+        같은 질문이 여러 직무에 걸리면 질문 하나로 합치고 affects_jobs에 모은다.
+        affects_jobs에는 추천 리스트의 직무명을 그대로 넣는다.
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        unknown: List[Dict[str, Any]] = []
+
+        for j in jobs:
+            entry = self.lookup(j.get("job_title", ""))
+            if entry is None:
+                unknown.append(j)
+                continue
+            for qid in entry.get("questions", []):
+                if qid not in merged:
+                    merged[qid] = {"id": qid, **self.questions[qid], "affects_jobs": []}
+                if j["job_title"] not in merged[qid]["affects_jobs"]:
+                    merged[qid]["affects_jobs"].append(j["job_title"])
+
+        return list(merged.values()), unknown
+
+
+_index: Optional[RequirementIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_requirement_index() -> RequirementIndex:
+    """
+    인덱스는 처음 쓸 때 한 번만 읽는다 (프로세스 전역).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                with open(REQUIREMENTS_PATH, encoding="utf-8") as f:
+                    _index = RequirementIndex(json.load(f))
+    return _index
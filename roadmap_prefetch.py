@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from llm_metrics import llm_metrics
+from major_index import canonical_answers
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+PREFETCH_ENABLED = os.environ.get("ROADMAP_PREFETCH", "1") not in ("0", "false", "no")
+PREFETCH_WORKERS = int(os.environ.get("ROADMAP_PREFETCH_WORKERS", "4"))
+PREFETCH_TOP_N = int(os.environ.get("ROADMAP_PREFETCH_TOP_N", "0"))
+PREFETCH_SESSION_CAP = int(os.environ.get("ROADMAP_PREFETCH_SESSION_CAP", "3"))
+# 끝난 결과를 보관하는 시간(초). 4페이지로 넘어오지 않은(닫힌) 세션의 결과도 이 시간이 지나면 버린다
+PREFETCH_RESULT_TTL = float(os.environ.get("ROADMAP_PREFETCH_RESULT_TTL", str(10 * 60)))
+
+
+def answers_fingerprint(user_answers: Dict[str, Any]) -> str:
+    # "컴공" / "컴퓨터공학과" 처럼 같은 전공의 다른 표기는 같은 지문이 된다
+    raw = json.dumps(canonical_answers(user_answers), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def prefetch_key(job_title: str, user_answers: Dict[str, Any]) -> Tuple[str, str]:
+    return (job_title, answers_fingerprint(user_answers))
+
+
+# =========================================================
+# 로드맵 선행 생성기
+# =========================================================
+class RoadmapPrefetcher:
+    """
+    3페이지에서 사용자가 고민하는 동안 로드맵을 미리 만들어 둔다.
+
+    - (job_title, user_answers) 키로 결과(Future)를 보관
+    - 세션별 동시 진행 상한(cap)으로 쿼터 낭비 방지 (끝난 작업은 세지 않음)
+    - 선택이 바뀌면 아직 시작 안 한 작업은 취소
+    - 끝난 결과는 result_ttl 동안만 보관, 실패한 작업은 바로 버려 다음에 다시 시도
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PREFETCH_WORKERS,
+        session_cap: int = PREFETCH_SESSION_CAP,
+        result_ttl: float = PREFETCH_RESULT_TTL,
+    ):
+        self.session_cap = session_cap
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="roadmap-prefetch")
+        self._lock = threading.Lock()
+        self._futures: Dict[Tuple[str, str], Future] = {}
+        self._by_session: Dict[str, List[Tuple[str, str]]] = {}
+        # 키 -> 끝난 것을 처음 본 시각 (TTL 기준)
+        self._done_at: Dict[Tuple[str, str], float] = {}
+
+        self.submitted = 0
+        self.cancelled = 0
+        self.capped = 0
+        self.failed = 0
+        self.expired = 0
+
+    def _sweep(self):
+        """
+        (lock 안에서) 실패한 작업과 TTL이 지난 결과를 버린다.
+        Future 콜백 대신 호출 때마다 훑는다 (이미 끝난 Future의 콜백은 제출한 스레드에서
+        바로 불려 lock을 다시 잡으려 하므로).
+        """
+        now = time.monotonic()
+        drop = []
+        for key, fut in self._futures.items():
+            if not fut.done():
+                continue
+            if fut.cancelled() or fut.exception() is not None:
+                if not fut.cancelled():
+                    self.failed += 1
+                drop.append(key)
+                continue
+            done_at = self._done_at.setdefault(key, now)
+            if now - done_at > self.result_ttl:
+                self.expired += 1
+                drop.append(key)
+        if not drop:
+            return
+        for key in drop:
+            del self._futures[key]
+            self._done_at.pop(key, None)
+        dropped = set(drop)
+        for session_id in list(self._by_session):
+            owned = [k for k in self._by_session[session_id] if k not in dropped]
+            if owned:
+                self._by_session[session_id] = owned
+            else:
+                del self._by_session[session_id]
+
+    def prefetch(
+        self,
+        session_id: str,
+        job_title: str,
+        user_answers: Dict[str, Any],
+        fn: Callable[[], Dict[str, Any]],
+    ) -> Optional[Future]:
+        """
+        fn: 실제 로드맵 생성 함수 (인자 없이 호출 가능하게 묶어서 전달)
+        이미 같은 키 작업이 있으면 그것을 그대로 반환한다.
+        """
+        key = prefetch_key(job_title, user_answers)
+        with self._lock:
+            self._sweep()
+            fut = self._futures.get(key)
+            if fut is not None:
+                return fut
+
+            owned = self._by_session.setdefault(session_id, [])
+            # 상한은 아직 진행 중인 작업에만 적용 (끝난 결과는 세션당 요청 수를 늘리지 않음)
+            running = sum(1 for k in owned if k in self._futures and not self._futures[k].done())
+            if running >= self.session_cap:
+                self.capped += 1
+                return None
+
+            fut = self._executor.submit(fn)
+            self._futures[key] = fut
+            owned.append(key)
+            self.submitted += 1
+        # 선행 생성은 작업 실행기(background_jobs)의 상한 밖에서 돈다
+        llm_metrics.count("llm_calls_outside_job_cap_total", source="prefetch")
+        return fut
+
+    def lookup(self, job_title: str, user_answers: Dict[str, Any]) -> Optional[Future]:
+        with self._lock:
+            self._sweep()
+            fut = self._futures.get(prefetch_key(job_title, user_answers))
+        if fut is None or fut.cancelled():
+            return None
+        return fut
+
+    def result_if_ready(self, job_title: str, user_answers: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        fut = self.lookup(job_title, user_answers)
+        if fut is None or not fut.done() or fut.exception() is not None:
+            return None
+        return fut.result()
+
+    def cancel_except(self, session_id: str, keep: Iterable[Tuple[str, str]] = ()):
+        """
+        세션이 더 이상 필요 없는 작업 중 아직 대기 중인 것을 취소.
+        취소된 작업은 세션 cap에서도 빠진다.
+        """
+        keep = set(keep)
+        with self._lock:
+            owned = self._by_session.get(session_id, [])
+            remaining = []
+            for key in owned:
+                fut = self._futures.get(key)
+                if key not in keep and fut is not None and fut.cancel():
+                    del self._futures[key]
+                    self.cancelled += 1
+                    continue
+                remaining.append(key)
+            if remaining:
+                self._by_session[session_id] = remaining
+            else:
+                self._by_session.pop(session_id, None)
+
+    def reset_session(self, session_id: str):
+        self.cancel_except(session_id)
+        with self._lock:
+            for key in self._by_session.pop(session_id, []):
+                self._futures.pop(key, None)
+                self._done_at.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "cancelled": self.cancelled,
+                "capped": self.capped,
+                "failed": self.failed,
+                "expired": self.expired,
+                "tracked": len(self._futures),
+                "sessions": len(self._by_session),
+            }
+
+
+# 프로세스 전역 인스턴스
+roadmap_prefetcher = RoadmapPrefetcher()
@@ -0,0 +1,307 @@
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+# sqlite(기본) / file / memory(프로세스 메모리만, 재시작하면 사라짐)
+SESSION_STORE = os.environ.get("SESSION_STORE", "sqlite")
+SESSION_STORE_PATH = os.environ.get(
+    "SESSION_STORE_PATH",
+    os.path.join(".cache", "sessions" if SESSION_STORE == "file" else "sessions.sqlite3"),
+)
+# 마지막 저장 후 이 시간(초)이 지난 스냅샷은 복원하지 않고 지운다
+SESSION_TTL = float(os.environ.get("SESSION_TTL", str(60 * 60 * 24 * 7)))
+# 이 시간(초) 동안 쓰이지 않은 세션은 메모리에서 내리고, 다시 필요하면 저장소에서 읽는다
+SESSION_IDLE_TTL = float(os.environ.get("SESSION_IDLE_TTL", "600"))
+# 메모리에 올려 두는 세션 수 상한 (넘치면 오래 안 쓰인 것부터 내림)
+SESSION_MAX_LOADED = int(os.environ.get("SESSION_MAX_LOADED", "2000"))
+
+# 스냅샷에 남기는 세션 상태. API 키는 서버에 남기지 않는다 (1페이지 안내 문구와 같은 약속).
+SNAPSHOT_KEYS = (
+    "page",
+    "session_id",
+    "user_answers",
+    "job_reco",
+    "filter_questions",
+    "filter_answers",
+    "final_jobs",
+    "selected_job",
+    "roadmap",
+    "job_list_shown",
+    "reco_job_id",
+    "roadmap_job_id",
+)
+
+TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+PURGE_INTERVAL = 60 * 60
+
+
+def new_token() -> str:
+    # URL에 그대로 실리는 불투명 토큰 (세션 id와는 별개라 로그에 남는 id로 복원할 수 없음)
+    return secrets.token_urlsafe(16)
+
+
+def valid_token(token: Optional[str]) -> bool:
+    return bool(token) and bool(TOKEN_RE.match(token))
+
+
+# =========================================================
+# 압축 직렬화
+# =========================================================
+def encode_snapshot(state: Dict[str, Any]) -> bytes:
+    """
+    - final_jobs는 job_reco의 부분집합이므로 인덱스만 남긴다
+    - 공백 없는 JSON을 zlib으로 압축
+    """
+    snapshot = {k: state.get(k) for k in SNAPSHOT_KEYS}
+    jobs = snapshot.get("job_reco") or []
+    final = snapshot.get("final_jobs") or []
+    positions = {id(j): i for i, j in enumerate(jobs)}
+    if all(id(j) in positions for j in final):
+        snapshot["final_jobs"] = None
+        snapshot["final_idx"] = [positions[id(j)] for j in final]
+    raw = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"), 6)
+
+
+def decode_snapshot(payload: bytes) -> Dict[str, Any]:
+    snapshot = json.loads(zlib.decompress(payload).decode("utf-8"))
+    idx = snapshot.pop("final_idx", None)
+    if idx is not None:
+        jobs = snapshot.get("job_reco") or []
+        snapshot["final_jobs"] = [jobs[i] for i in idx if i < len(jobs)]
+    return snapshot
+
+
+# =========================================================
+# 저장소 백엔드
+# =========================================================
+class SqliteBackend:
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " token TEXT PRIMARY KEY,"
+                " updated_at REAL NOT NULL,"
+                " payload BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def load(self, token: str) -> Optional[Tuple[float, bytes]]:
+        row = self._db().execute(
+            "SELECT updated_at, payload FROM sessions WHERE token = ?", (token,)
+        ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def save(self, token: str, payload: bytes, now: float):
+        conn = self._db()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (token, updated_at, payload) VALUES (?, ?, ?)",
+            (token, now, payload),
+        )
+        conn.commit()
+
+    def delete(self, token: str):
+        conn = self._db()
+        conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+        conn.commit()
+
+    def purge(self, older_than: float) -> int:
+        conn = self._db()
+        deleted = conn.execute("DELETE FROM sessions WHERE updated_at < ?", (older_than,)).rowcount
+        conn.commit()
+        return deleted
+
+
+class FileBackend:
+    """
+    토큰마다 파일 하나 (<dir>/<token>.z), 수정 시각이 곧 마지막 저장 시각.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, token: str) -> str:
+        return os.path.join(self.directory, f"{token}.z")
+
+    def load(self, token: str) -> Optional[Tuple[float, bytes]]:
+        path = self._path(token)
+        try:
+            with open(path, "rb") as f:
+                return os.path.getmtime(path), f.read()
+        except FileNotFoundError:
+            return None
+
+    def save(self, token: str, payload: bytes, now: float):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(token)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        os.utime(path, (now, now))
+
+    def delete(self, token: str):
+        try:
+            os.remove(self._path(token))
+        except FileNotFoundError:
+            pass
+
+    def purge(self, older_than: float) -> int:
+        deleted = 0
+        if not os.path.isdir(self.directory):
+            return 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith(".z") and os.path.getmtime(path) < older_than:
+                    os.remove(path)
+                    deleted += 1
+            except FileNotFoundError:
+                continue
+        return deleted
+
+
+def make_backend(kind: str, path: str) -> Optional[Any]:
+    if kind == "sqlite" and path:
+        return SqliteBackend(path)
+    if kind == "file" and path:
+        return FileBackend(path)
+    return None
+
+
+# =========================================================
+# 세션 저장소: 메모리(유휴 시 내림) + 백엔드(압축 스냅샷)
+# =========================================================
+class SessionStore:
+    """
+    URL의 복원 토큰 -> 세션 상태 스냅샷.
+
+    - save(): 스냅샷이 바뀐 경우에만 백엔드에 쓴다 (같은 내용이면 압축 결과 비교로 건너뜀)
+    - load(): 메모리에 있으면 그대로, 없으면 백엔드에서 읽어 올린다 (새로고침/재접속 복원)
+    - SESSION_IDLE_TTL 동안 안 쓰인 세션은 메모리에서 내린다. 스냅샷은 백엔드에 남아 있다
+    - 백엔드가 없으면(memory) 메모리에서 내리는 순간 사라진다
+
+    Streamlit 세션 스레드 여러 개가 동시에 접근하므로 lock으로 보호한다.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[Any] = None,
+        ttl: float = SESSION_TTL,
+        idle_ttl: float = SESSION_IDLE_TTL,
+        max_loaded: int = SESSION_MAX_LOADED,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.idle_ttl = idle_ttl
+        self.max_loaded = max_loaded
+
+        self._lock = threading.Lock()
+        # token -> (마지막 사용 시각, 압축 스냅샷)
+        self._loaded: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._last_purge = 0.0
+
+        self.saves = 0
+        self.skipped = 0
+        self.memory_hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not valid_token(token):
+            return None
+        now = time.time()
+        with self._lock:
+            item = self._loaded.get(token)
+            if item is not None:
+                self.memory_hits += 1
+                payload = item[1]
+            else:
+                row = self.backend.load(token) if self.backend is not None else None
+                if row is None or now - row[0] > self.ttl:
+                    self.misses += 1
+                    return None
+                self.backend_hits += 1
+                payload = row[1]
+            self._touch(token, now, payload)
+            self._sweep(now)
+        try:
+            return decode_snapshot(payload)
+        except (ValueError, zlib.error, IndexError, TypeError):
+            return None
+
+    def save(self, token: str, state: Dict[str, Any]):
+        payload = encode_snapshot(state)
+        now = time.time()
+        with self._lock:
+            item = self._loaded.get(token)
+            if item is not None and item[1] == payload:
+                self.skipped += 1
+                self._touch(token, now, payload)
+                return
+            self._touch(token, now, payload)
+            if self.backend is not None:
+                self.backend.save(token, payload, now)
+            self.saves += 1
+            self._sweep(now)
+
+    def delete(self, token: str):
+        with self._lock:
+            self._loaded.pop(token, None)
+            if self.backend is not None:
+                self.backend.delete(token)
+
+    def _touch(self, token: str, now: float, payload: bytes):
+        # lock 안에서만 호출
+        self._loaded[token] = (now, payload)
+        self._loaded.move_to_end(token)
+
+    def _sweep(self, now: float):
+        # lock 안에서만 호출. 가장 오래 안 쓰인 것이 앞쪽에 있다.
+        while self._loaded:
+            token, (last_used, _) = next(iter(self._loaded.items()))
+            if now - last_used <= self.idle_ttl and len(self._loaded) <= self.max_loaded:
+                break
+            del self._loaded[token]
+            self.evictions += 1
+        if self.backend is not None and now - self._last_purge > PURGE_INTERVAL:
+            self._last_purge = now
+            self.backend.purge(now - self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "saves": self.saves,
+                "skipped": self.skipped,
+                "memory_hits": self.memory_hits,
+                "backend_hits": self.backend_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "loaded": len(self._loaded),
+                "loaded_bytes": sum(len(p) for _, p in self._loaded.values()),
+            }
+
+
+# 프로세스 전역 저장소 (app.py는 rerun마다 다시 실행되지만 이 모듈은 한 번만 로드됨)
+session_store = SessionStore(make_backend(SESSION_STORE, SESSION_STORE_PATH))
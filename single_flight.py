@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+SINGLE_FLIGHT_DISABLED = os.environ.get("LLM_SINGLE_FLIGHT_DISABLED", "") in ("1", "true", "yes")
+# follower가 leader의 결과를 기다리는 최대 시간(초). 넘으면 더 기다리지 않고 직접 호출한다
+WAIT_TIMEOUT = float(os.environ.get("LLM_SINGLE_FLIGHT_WAIT_TIMEOUT", "120"))
+# 기다리는 동안 취소 여부(check)를 확인하는 간격(초)
+WAIT_POLL_INTERVAL = 0.25
+
+
+class WaitTimeout(TimeoutError):
+    """
+    follower가 WAIT_TIMEOUT 안에 leader의 결과를 받지 못함 (호출 측은 직접 요청).
+    """
+
+
+# =========================================================
+# 진행 중인 같은 요청 합치기 (single-flight)
+# =========================================================
+class SingleFlight:
+    """
+    같은 키의 요청이 이미 진행 중이면 새로 보내지 않고 그 결과(Future)를 같이 기다린다.
+    (한 반 학생들이 같은 답변/같은 직무로 몇 초 사이에 몰릴 때 중복 호출 방지)
+
+    - 먼저 온 호출(leader)만 실제로 실행하고, 뒤에 온 호출(follower)은 결과를 공유
+    - leader의 예외(Exception)는 기다리던 follower 모두에게 그대로 전파
+    - leader가 도중에 취소되면(스트림을 버림, 중단 등 Exception이 아닌 BaseException)
+      또는 leader 자신의 API 키 문제처럼 요청 내용과 무관한 실패면
+      follower는 결과를 받지 않고 다시 시도한다 (그중 하나가 새 leader가 됨)
+    - follower는 무한정 기다리지 않는다: WAIT_TIMEOUT이 지나면 직접 호출하고,
+      기다리는 동안 check()로 자기 작업이 취소됐는지 확인한다
+    - 끝난 요청은 바로 목록에서 빠진다. 결과 보관은 응답 캐시(llm_cache)의 몫
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+        self.leaders = 0
+        self.collapsed = 0
+        self.retried = 0
+        self.timed_out = 0
+
+    def join(self, key: str) -> Tuple[Future, bool]:
+        """
+        반환: (Future, leader 여부)
+        leader이면 반드시 resolve() 또는 fail() 중 하나를 불러야 한다.
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.collapsed += 1
+                return flight, False
+            flight = Future()
+            self._inflight[key] = flight
+            self.leaders += 1
+            return flight, True
+
+    def _release(self, key: str, flight: Future):
+        with self._lock:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+
+    def resolve(self, key: str, flight: Future, value: Any):
+        self._release(key, flight)
+        flight.set_result(value)
+
+    def fail(self, key: str, flight: Future, exc: BaseException, shared: bool = True):
+        """
+        shared=False 또는 취소성 예외면 follower에게 예외를 넘기지 않고 다시 시도하게 한다.
+        """
+        self._release(key, flight)
+        if shared and isinstance(exc, Exception):
+            flight.set_exception(exc)
+        else:
+            flight.cancel()
+
+    def wait(
+        self,
+        flight: Future,
+        check: Optional[Callable[[], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        follower 쪽 대기. leader가 취소됐으면 CancelledError (호출 측에서 다시 join),
+        timeout(기본 WAIT_TIMEOUT)이 지나면 WaitTimeout.
+        check: 기다리는 동안 WAIT_POLL_INTERVAL마다 부르는 함수 (취소됐으면 예외를 던지게 해 대기를 멈춤)
+        """
+        deadline = time.monotonic() + (WAIT_TIMEOUT if timeout is None else timeout)
+        while True:
+            if check is not None:
+                check()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    self.timed_out += 1
+                raise WaitTimeout("single-flight 대기 시간 초과")
+            try:
+                return flight.result(timeout=min(WAIT_POLL_INTERVAL, remaining))
+            except CancelledError:
+                with self._lock:
+                    self.retried += 1
+                raise
+            except TimeoutError:
+                # leader가 TimeoutError로 실패한 경우와 구분
+                if flight.done():
+                    raise
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        is_shared_error: Callable[[Exception], bool] = lambda e: True,
+        check: Optional[Callable[[], None]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        fn을 같은 key끼리 한 번만 실행. 반환: (결과, 다른 호출의 결과를 받았는지)
+        """
+        while True:
+            flight, leader = self.join(key)
+            if not leader:
+                try:
+                    return self.wait(flight, check), True
+                except CancelledError:
+                    continue
+                except WaitTimeout:
+                    # leader가 멈춘 것으로 보고 직접 호출 (목록에는 올리지 않음)
+                    return fn(), False
+            try:
+                value = fn()
+            except BaseException as e:
+                self.fail(key, flight, e, shared=isinstance(e, Exception) and is_shared_error(e))
+                raise
+            self.resolve(key, flight, value)
+            return value, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "collapsed": self.collapsed,
+                "retried": self.retried,
+                "timed_out": self.timed_out,
+                "inflight": len(self._inflight),
+            }
+
+
+# 프로세스 전역 인스턴스 (모든 Streamlit 세션 스레드가 공유)
+single_flight = SingleFlight()
@@ -0,0 +1,168 @@
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# =========================================================
+# 기본 설정 (환경변수로 조정 가능)
+# =========================================================
+# 프로세스의 첫 화면을 보낸 직후 무거운 모듈/인덱스/클라이언트를 백그라운드에서 미리 로드
+# (사용자가 1~2페이지를 읽고 입력하는 동안 끝나므로 "추천 받기"에서 기다리지 않음)
+WARMUP_ENABLED = os.environ.get("APP_WARMUP", "1") not in ("0", "false", "no")
+# 시작 단계별 시간(app import / 첫 렌더링 / 예열)을 표준 에러로 출력
+STARTUP_PROFILE = os.environ.get("STARTUP_PROFILE", "0") in ("1", "true", "yes")
+
+
+# =========================================================
+# 시작 프로파일러
+# =========================================================
+class StartupProfiler:
+    """
+    프로세스에서 한 번만 일어나는 일들의 소요 시간.
+
+    - 첫 스크립트 실행: mark(phase)마다 직전 mark(처음엔 이 모듈 import 시점)부터의 시간.
+      Streamlit은 세션마다 app.py를 다시 실행하므로 처음 mark를 부른 스레드의 첫 실행만 기록한다.
+    - 예열: phase(name) 블록의 시간 (백그라운드 스레드)
+
+    이 모듈은 app.py가 streamlit 다음으로 가장 먼저 import하므로
+    생성 시각이 곧 첫 스크립트 실행의 시작이다.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases: List[Tuple[str, float]] = []
+        self._owner: Optional[int] = None
+        self._last_mark = self.started
+        self.first_run_done = False
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        with self._lock:
+            if self.first_run_done:
+                return
+            if self._owner is None:
+                self._owner = threading.get_ident()
+            if self._owner != threading.get_ident():
+                return
+            self._phases.append((f"첫 실행: {phase}", now - self._last_mark))
+            self._last_mark = now
+
+    def finish_run(self):
+        """
+        첫 실행의 마지막 mark 뒤에 호출. 이후 mark는 무시된다.
+        """
+        with self._lock:
+            if self.first_run_done or self._owner != threading.get_ident():
+                return
+            self.first_run_done = True
+            self._phases.append(("첫 실행: 합계", self._last_mark - self.started))
+        if STARTUP_PROFILE:
+            self.print_report("첫 실행")
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases.append((name, time.perf_counter() - t0))
+
+    def report(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"phase": name, "ms": round(seconds * 1000, 1)} for name, seconds in self._phases]
+
+    def print_report(self, title: str):
+        lines = [f"[startup] {title}"]
+        lines += [f"  {row['ms']:>9.1f} ms  {row['phase']}" for row in self.report()]
+        print("\n".join(lines), file=sys.stderr, flush=True)
+
+
+# =========================================================
+# 예열
+# =========================================================
+def _warm_client():
+    # 서버 기본 키(OPENAI_API_KEY)가 있을 때만. 사용자 키 클라이언트는 키를 받은 뒤 만들어진다
+    if os.environ.get("OPENAI_API_KEY"):
+        from client_pool import client_pool
+
+        client_pool.get(None)
+
+
+def _warm_major_index():
+    from major_index import get_major_index
+
+    get_major_index()
+
+
+def _warm_requirement_index():
+    from requirements_index import get_requirement_index
+
+    get_requirement_index()
+
+
+def _warm_job_index():
+    from job_scoring import get_job_index
+
+    get_job_index()
+
+
+def _warm_response_cache():
+    from llm_cache import response_cache
+
+    response_cache.open()
+
+
+# (단계 이름, 함수). import는 무거운 것부터 따로 재서 어디에 시간이 드는지 보이게 한다
+WARMUP_STEPS: List[Tuple[str, Callable[[], Any]]] = [
+    ("import openai", lambda: importlib.import_module("openai")),
+    ("import numpy", lambda: importlib.import_module("numpy")),
+    ("import pipeline", lambda: importlib.import_module("pipeline")),
+    ("전공 인덱스", _warm_major_index),
+    ("직무 요건 인덱스", _warm_requirement_index),
+    ("직무 점수 카탈로그", _warm_job_index),
+    ("응답 캐시 연결", _warm_response_cache),
+    ("기본 키 클라이언트", _warm_client),
+]
+
+_warmup_thread: Optional[threading.Thread] = None
+_warmup_lock = threading.Lock()
+
+
+def warm_up(profiler: "StartupProfiler"):
+    """
+    WARMUP_STEPS를 차례로 실행한다. 실패한 단계는 건너뛴다 (실제 요청에서 다시 시도됨).
+    """
+    for name, fn in WARMUP_STEPS:
+        try:
+            with profiler.phase(f"예열: {name}"):
+                fn()
+        except Exception as e:
+            print(f"[startup] 예열 실패 ({name}): {e!r}", file=sys.stderr, flush=True)
+    if STARTUP_PROFILE:
+        profiler.print_report("예열 포함")
+
+
+def start_warmup(enabled: bool = WARMUP_ENABLED) -> Optional[threading.Thread]:
+    """
+    프로세스당 한 번만 백그라운드 스레드로 예열한다 (Streamlit 재실행마다 호출돼도 안전).
+    """
+    global _warmup_thread
+    if not enabled:
+        return None
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=warm_up, args=(startup_profiler,), name="warmup", daemon=True
+            )
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+# 프로세스 전역 프로파일러 (app.py는 rerun마다 다시 실행되지만 이 모듈은 한 번만 로드됨)
+startup_profiler = StartupProfiler()
@@ -0,0 +1,79 @@
+import pytest
+
+from job_similarity import dedupe_jobs, is_near_duplicate, resolve_titles, same_role
+from pipeline import apply_filtering
+
+
+def make_jobs(*titles, category=""):
+    return [{"job_title": t, "category": category} for t in titles]
+
+
+# 앞부분(게임/간호/서비스)이 같아 글자 유사도는 높지만 역할이 다른 직무
+DISTINCT = [
+    ("게임 개발자", "게임 기획자", "게임"),
+    ("간호사", "간호조무사", "의료"),
+    ("서비스 기획자", "서비스 운영자", "기획"),
+    ("데이터 분석가", "데이터 엔지니어", "개발"),
+    ("백엔드 개발자", "프론트엔드 개발자", "개발"),
+]
+
+SAME = [
+    ("콘텐츠 마케터", "콘텐츠 마케팅 담당자", "마케팅"),
+    ("웹 개발자", "웹개발자", "개발"),
+    ("사회복지사", "사회 복지사", "공공"),
+]
+
+
+@pytest.mark.parametrize("first,second,category", DISTINCT)
+def test_distinct_jobs_are_kept(first, second, category):
+    jobs = make_jobs(first, second, category=category)
+    assert [j["job_title"] for j in dedupe_jobs(jobs)] == [first, second]
+    assert not is_near_duplicate(second, [first])
+
+
+@pytest.mark.parametrize("first,second,category", SAME)
+def test_near_duplicates_are_merged_into_first(first, second, category):
+    jobs = make_jobs(first, second, category=category)
+    merged = dedupe_jobs(jobs)
+    assert [j["job_title"] for j in merged] == [first]
+    assert merged[0]["aliases"] == [second]
+    assert is_near_duplicate(second, [first])
+
+
+def test_dedupe_does_not_modify_input():
+    jobs = make_jobs("콘텐츠 마케터", "콘텐츠 마케팅 담당자", category="마케팅")
+    dedupe_jobs(jobs)
+    assert "aliases" not in jobs[0]
+
+
+def test_same_role():
+    assert same_role("9급 공무원", "9급 공무원(행정직)")
+    assert same_role("백엔드 개발자", "백엔드 엔지니어")
+    assert not same_role("간호사", "간호조무사")
+    assert not same_role("게임개발자", "모바일 개발자")
+
+
+def test_resolve_exact_names_and_aliases():
+    jobs = make_jobs("콘텐츠 마케터", "의사")
+    jobs[0]["aliases"] = ["콘텐츠 마케팅 담당자"]
+    assert resolve_titles(["콘텐츠 마케팅 담당자", "의사(내과)", " 의사 "], jobs) == [0, 1, 1]
+
+
+def test_resolve_does_not_fall_back_to_nearest_job():
+    jobs = make_jobs("데이터 엔지니어", "간호사")
+    assert resolve_titles(["데이터 분석가", "간호조무사"], jobs) == [None, None]
+
+
+def test_resolve_by_similarity():
+    jobs = make_jobs("콘텐츠 마케터", "데이터 엔지니어", "웹 개발자")
+    assert resolve_titles(["콘텐츠 마케팅 담당자", "웹개발자"], jobs) == [0, 2]
+
+
+def test_filtering_removes_only_rejected_jobs():
+    jobs = make_jobs("간호사", "데이터 엔지니어", "콘텐츠 마케터")
+    questions = [
+        {"id": "q1", "type": "yesno", "options": ["예", "아니오"], "affects_jobs": ["간호조무사", "데이터 분석가"]},
+        {"id": "q2", "type": "yesno", "options": ["예", "아니오"], "affects_jobs": ["콘텐츠 마케팅 담당자"]},
+    ]
+    final = apply_filtering(jobs, questions, {"q1": "아니오", "q2": "아니오"})
+    assert [j["job_title"] for j in final] == ["간호사", "데이터 엔지니어"]
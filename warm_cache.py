@@ -0,0 +1,197 @@
+"""
+응답 캐시 예열 배치
+
+자주 나오는 2페이지 답변 프로필에 대해 추천 -> 필터 질문 -> 로드맵을 미리 돌려
+결과를 앱과 같은 응답 캐시(LLM_CACHE_PATH SQLite)에 채워 둔다.
+피크 시간대 사용자는 OpenAI 호출 대신 캐시 히트를 받게 된다.
+
+대상 프로필:
+  --log 가 있으면  앱이 남긴 프로필 기록(PROFILE_LOG_PATH)에서 많이 나온 순서대로
+  없으면           기본 답변 + 한 문항만 바꾼 변형들을 전공 목록별로 열거
+
+진행 상황은 --progress 파일에 프로필마다 한 줄씩 남기므로, 중간에 끊겨도
+다시 실행하면 끝난 프로필은 건너뛴다. 마지막에 커버리지를 보고한다.
+
+사용법 (프로젝트 루트에서, 앱과 같은 LLM_CACHE_PATH / OPENAI_* 환경변수로):
+    python warm_cache.py --log .cache/profiles.jsonl --top 300 --concurrency 8
+    python warm_cache.py --majors 경영학 컴퓨터공학 --limit 200
+    python warm_cache.py --log .cache/profiles.jsonl --report
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from llm_cache import CACHE_DISABLED, CACHE_DISK_TTL, response_cache
+from pipeline import RECO_MODES, run_profile
+from profile_log import print_request_counts, read_profiles
+from questions import EDUCATION_DEFAULT_INDEX, FORM_QUESTIONS, OPTION_LABELS
+from roadmap_prefetch import answers_fingerprint
+
+DEFAULT_PROGRESS_PATH = os.path.join(".cache", "warm_progress.jsonl")
+DEFAULT_MAJORS = ["", "경영학", "컴퓨터공학", "국어국문학", "시각디자인", "간호학", "교육학"]
+
+
+# =========================================================
+# 대상 프로필
+# =========================================================
+def default_answers(major: str = "") -> Dict[str, Any]:
+    """
+    2페이지를 아무것도 바꾸지 않고 제출했을 때의 답변.
+    """
+    answers: Dict[str, Any] = {}
+    for key, _, widget, _, default in FORM_QUESTIONS:
+        answers[key] = list(default) if widget == "multiselect" else OPTION_LABELS[key][default]
+    answers["education"] = OPTION_LABELS["education"][EDUCATION_DEFAULT_INDEX]
+    answers["major"] = major
+    return answers
+
+
+def enumerate_profiles(majors: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    전공마다: 기본 답변, 그리고 한 문항만 다른 선택지로 바꾼 변형 전부.
+    (multiselect는 기본값 대신 한 항목만 고른 경우)
+    """
+    keys = [q[0] for q in FORM_QUESTIONS] + ["education"]
+    widgets = {q[0]: q[2] for q in FORM_QUESTIONS}
+    for major in majors:
+        base = default_answers(major)
+        yield base
+        for key in keys:
+            for label in OPTION_LABELS[key]:
+                value: Any = [label] if widgets.get(key) == "multiselect" else label
+                if value != base[key]:
+                    yield {**base, key: value}
+
+
+def select_profiles(args: argparse.Namespace) -> List[Tuple[Dict[str, Any], int]]:
+    """
+    반환: [(답변, 기록상 빈도)] — 열거한 프로필은 빈도 1.
+    """
+    if args.log:
+        return read_profiles(args.log)[: args.top]
+    profiles = [(answers, 1) for answers in enumerate_profiles(args.majors)]
+    return profiles[: args.limit] if args.limit else profiles
+
+
+# =========================================================
+# 진행 파일 (재시작 가능)
+# =========================================================
+class Progress:
+    """
+    한 줄에 프로필 하나: {"fp", "mode", "status": ok/error, "ts", "error"}
+    같은 (fp, mode)가 여러 줄이면 마지막 줄이 유효.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.records: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self.records[(record["fp"], record["mode"])] = record
+                    except (ValueError, KeyError, TypeError):
+                        continue
+
+    def is_fresh(self, fp: str, mode: str, now: float) -> bool:
+        # 추천 방식이 다르면 프롬프트가 다르고, 디스크 캐시 TTL이 지난 기록은 다시 예열해야 한다.
+        record = self.records.get((fp, mode))
+        return bool(record) and record["status"] == "ok" and now - record["ts"] <= CACHE_DISK_TTL
+
+    def write(self, fp: str, mode: str, status: str, error: str = ""):
+        record = {"fp": fp, "mode": mode, "status": status, "ts": round(time.time(), 3), "error": error}
+        with self._lock:
+            self.records[(fp, mode)] = record
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# =========================================================
+# 프로필 하나 예열 (앱의 2 -> 4페이지 흐름과 같은 호출)
+# =========================================================
+def warm_profile(answers: Dict[str, Any], mode: str, roadmaps: int):
+    # 필터 질문의 기본 선택(첫 선택지)으로 남는 직무 = 3페이지에서 처음 보이는 최종 리스트
+    run_profile(answers, mode, roadmaps=roadmaps)
+
+
+def report(targets: List[Tuple[Dict[str, Any], int]], progress: Progress, mode: str, weighted: bool):
+    now = time.time()
+    covered = [(a, n) for a, n in targets if progress.is_fresh(answers_fingerprint(a), mode, now)]
+    failed = sum(
+        1 for a, _ in targets
+        if progress.records.get((answers_fingerprint(a), mode), {}).get("status") == "error"
+    )
+    total_weight = sum(n for _, n in targets) or 1
+    print(f"대상 프로필 {len(targets)}개 중 예열됨 {len(covered)}개, 실패 {failed}개")
+    print(f"프로필 커버리지: {len(covered) / max(len(targets), 1) * 100:.1f}%")
+    if weighted:
+        print(f"트래픽 가중 커버리지(기록된 요청 기준): {sum(n for _, n in covered) / total_weight * 100:.1f}%")
+
+    print_request_counts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=None, help="앱이 남긴 프로필 기록 파일 (PROFILE_LOG_PATH)")
+    parser.add_argument("--top", type=int, default=300, help="--log 사용 시 상위 몇 개 프로필")
+    parser.add_argument("--majors", nargs="*", default=DEFAULT_MAJORS, help="열거 모드에서 쓸 전공 목록")
+    parser.add_argument("--limit", type=int, default=0, help="열거 모드 최대 프로필 수 (0: 전부)")
+    parser.add_argument("--mode", choices=RECO_MODES, default=os.environ.get("RECO_MODE", "hybrid"))
+    parser.add_argument("--roadmaps", type=int, default=3, help="프로필마다 미리 만들 로드맵 수 (최종 리스트 상위)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--progress", default=DEFAULT_PROGRESS_PATH)
+    parser.add_argument("--report", action="store_true", help="호출 없이 커버리지만 보고")
+    args = parser.parse_args()
+
+    if CACHE_DISABLED or not response_cache.db_path:
+        print("LLM_CACHE_DISABLED 이거나 LLM_CACHE_PATH 가 비어 있으면 예열 결과를 앱과 공유할 수 없습니다.")
+        sys.exit(2)
+
+    targets = select_profiles(args)
+    progress = Progress(args.progress)
+    if args.report:
+        report(targets, progress, args.mode, weighted=bool(args.log))
+        return
+
+    now = time.time()
+    todo = [a for a, _ in targets if not progress.is_fresh(answers_fingerprint(a), args.mode, now)]
+    print(f"대상 {len(targets)}개, 이미 예열됨 {len(targets) - len(todo)}개, 이번에 실행 {len(todo)}개 (mode={args.mode})")
+
+    def run(answers: Dict[str, Any]) -> Optional[str]:
+        fp = answers_fingerprint(answers)
+        try:
+            warm_profile(answers, args.mode, args.roadmaps)
+        except Exception as e:
+            progress.write(fp, args.mode, "error", f"{type(e).__name__}: {e}")
+            return f"{type(e).__name__}: {e}"
+        progress.write(fp, args.mode, "ok")
+        return None
+
+    t0 = time.perf_counter()
+    done = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(run, a) for a in todo]
+        for f in as_completed(futures):
+            done += 1
+            error = f.result()
+            if error:
+                print(f"  실패: {error}")
+            if done % 20 == 0 or done == len(todo):
+                print(f"  {done}/{len(todo)} ({time.perf_counter() - t0:.1f}s)")
+
+    print()
+    report(targets, progress, args.mode, weighted=bool(args.log))
+
+
+if __name__ == "__main__":
+    main()